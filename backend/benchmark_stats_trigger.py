@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark do trigger de estatísticas: FOR EACH ROW x FOR EACH STATEMENT
+
+Insere N respostas em `user_question_history` (padrão 100k) com cada versão
+do trigger, mede o tempo e compara os totais de `user_stats`. Cada rodada é
+feita numa transação desfeita com ROLLBACK, então o banco não é alterado.
+Requer DATABASE_URL, a migração 005 aplicada e ao menos um perfil e uma
+questão cadastrados.
+
+Uso: python benchmark_stats_trigger.py [linhas] [usuarios]
+"""
+
+import os
+import sys
+import time
+
+from run_migration import load_environment
+
+# Versão original, por linha (recriada apenas dentro da transação do benchmark)
+ROW_LEVEL_SETUP = """
+CREATE OR REPLACE FUNCTION benchmark_row_level_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.user_stats (user_id, total_questions_answered, correct_answers, last_activity_at)
+    VALUES (NEW.user_id, 1, CASE WHEN NEW.is_correct THEN 1 ELSE 0 END, NOW())
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_questions_answered = user_stats.total_questions_answered + 1,
+        correct_answers = user_stats.correct_answers + CASE WHEN NEW.is_correct THEN 1 ELSE 0 END,
+        experience_points = user_stats.experience_points + CASE WHEN NEW.is_correct THEN 10 ELSE 2 END,
+        level = calculate_user_level(user_stats.experience_points + CASE WHEN NEW.is_correct THEN 10 ELSE 2 END),
+        last_activity_at = NOW(),
+        updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_stats_after_answers ON public.user_question_history;
+CREATE TRIGGER benchmark_row_level_stats
+    AFTER INSERT ON public.user_question_history
+    FOR EACH ROW EXECUTE FUNCTION benchmark_row_level_stats();
+"""
+
+# Um único INSERT de N linhas, distribuídas entre os usuários e questões amostrados
+BULK_INSERT = """
+WITH users AS (
+    SELECT array_agg(id) AS ids FROM (SELECT id FROM public.profiles ORDER BY id LIMIT %(users)s) u
+), questions AS (
+    SELECT array_agg(id) AS ids FROM (SELECT id FROM public.questions ORDER BY id LIMIT 1000) q
+)
+INSERT INTO public.user_question_history (user_id, question_id, selected_answer, is_correct, time_taken_seconds)
+SELECT users.ids[1 + g %% cardinality(users.ids)],
+       questions.ids[1 + (g * 7919) %% cardinality(questions.ids)],
+       'A',
+       g %% 3 <> 0,
+       30 + g %% 90
+FROM generate_series(1, %(rows)s) AS g, users, questions
+"""
+
+STATS_TOTALS = """
+SELECT COALESCE(SUM(total_questions_answered), 0), COALESCE(SUM(correct_answers), 0), COUNT(*)
+FROM public.user_stats
+"""
+
+
+def run_variant(conn, name: str, rows: int, users: int):
+    """Insere as linhas com uma versão do trigger e desfaz tudo ao final"""
+    with conn.cursor() as cursor:
+        try:
+            if name == "row":
+                cursor.execute(ROW_LEVEL_SETUP)
+            started = time.perf_counter()
+            cursor.execute(BULK_INSERT, {"rows": rows, "users": users})
+            elapsed = time.perf_counter() - started
+            cursor.execute(STATS_TOTALS)
+            totals = cursor.fetchone()
+        finally:
+            conn.rollback()
+    return elapsed, totals
+
+
+def main():
+    import psycopg2
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    load_environment()
+    database_url = os.getenv("DATABASE_URL", "").strip('"')
+    if not database_url:
+        print("❌ DATABASE_URL não encontrada")
+        sys.exit(1)
+
+    with psycopg2.connect(database_url) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT (SELECT COUNT(*) FROM public.profiles), (SELECT COUNT(*) FROM public.questions)")
+            profiles, questions = cursor.fetchone()
+        conn.rollback()
+        if not profiles or not questions:
+            print("❌ O benchmark precisa de ao menos um perfil e uma questão cadastrados")
+            sys.exit(1)
+
+        print(f"🏁 Inserindo {rows} respostas para até {min(users, profiles)} usuários")
+        results = {}
+        for name in ("row", "statement"):
+            elapsed, totals = run_variant(conn, name, rows, users)
+            results[name] = (elapsed, totals)
+            print(f"  - FOR EACH {name.upper():<9}: {elapsed:8.2f}s ({rows / elapsed:,.0f} linhas/s)")
+
+    (row_time, row_totals), (statement_time, statement_totals) = results["row"], results["statement"]
+    print(f"\n📊 Speedup: {row_time / statement_time:.1f}x")
+    if row_totals[:2] == statement_totals[:2]:
+        print("✓ Totais de respostas e acertos em user_stats idênticos nas duas versões")
+    else:
+        print(f"⚠️  Totais diferentes: row={row_totals} statement={statement_totals}")
+
+
+if __name__ == "__main__":
+    main()
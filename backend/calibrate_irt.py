@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Calibração noturna dos parâmetros TRI (2PL) das questões
+
+Carrega `user_question_history` por COPY numa matriz esparsa usuário ×
+questão, ajusta (a, b) por EM (services/irt.py) e grava os parâmetros em
+`question_stats` e o nível em `questions.difficulty_level`.
+
+Incremental: só são reajustadas as questões com respostas novas desde a
+última marca d'água (created_at); entram no ajuste apenas os usuários que
+responderam essas questões, e as demais questões ficam com os parâmetros
+já calibrados. A marca d'água fica `WATERMARK_LAG` atrás do relógio do
+banco: created_at é o início da transação que gravou a linha, então uma
+transação longa pode tornar visível, depois da execução, uma linha com
+created_at anterior ao MAX lido. Respostas dentro da folga são reajustadas
+de novo na execução seguinte, o que não altera o resultado.
+
+Uso: python calibrate_irt.py [--full]
+"""
+
+import io
+import os
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from run_migration import load_environment
+from services.irt import calibrate_2pl, difficulty_level, initial_difficulty, response_matrices
+
+JOB_NAME = "irt_2pl"
+
+# Maior duração esperada de uma transação que grava em user_question_history
+WATERMARK_LAG = "15 minutes"
+
+CHANGED_QUESTIONS = """
+SELECT DISTINCT question_id FROM public.user_question_history WHERE created_at > %s
+"""
+
+# Todas as respostas dos usuários que responderam alguma questão alterada
+RESPONSES_SQL = """
+COPY (
+    SELECT h.user_id, h.question_id, h.is_correct
+    FROM public.user_question_history h
+    WHERE h.user_id IN (
+        SELECT DISTINCT user_id FROM public.user_question_history
+        WHERE question_id IN (
+            SELECT DISTINCT question_id FROM public.user_question_history WHERE created_at > %s
+        )
+    )
+) TO STDOUT
+"""
+
+
+class ResponseSink(io.TextIOBase):
+    """Destino do COPY TO STDOUT: converte as linhas em arrays de índices"""
+
+    def __init__(self):
+        self.users: Dict[str, int] = {}
+        self.items: Dict[str, int] = {}
+        self.user_index = array("i")
+        self.item_index = array("i")
+        self.correct = array("b")
+        self._partial = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        lines = (self._partial + data).split("\n")
+        self._partial = lines.pop()
+        users, items = self.users, self.items
+        for line in lines:
+            user_id, question_id, is_correct = line.split("\t")
+            self.user_index.append(users.setdefault(user_id, len(users)))
+            self.item_index.append(items.setdefault(question_id, len(items)))
+            self.correct.append(is_correct == "t")
+        return len(data)
+
+
+def load_watermark(cursor) -> Optional[str]:
+    cursor.execute("SELECT watermark FROM public.calibration_watermarks WHERE job = %s", (JOB_NAME,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def load_parameters(cursor, items: Dict[str, int]):
+    """Parâmetros já calibrados, alinhados aos índices da matriz"""
+    discrimination = np.full(len(items), np.nan)
+    difficulty = np.full(len(items), np.nan)
+    cursor.execute("""
+        SELECT question_id, irt_discrimination, irt_difficulty
+        FROM public.question_stats
+        WHERE irt_difficulty IS NOT NULL
+    """)
+    for question_id, a, b in cursor:
+        index = items.get(str(question_id))
+        if index is not None:
+            discrimination[index], difficulty[index] = a, b
+    return discrimination, difficulty
+
+
+def write_parameters(cursor, question_ids: List[str], a, b, responses):
+    from psycopg2.extras import execute_values
+
+    rows = [
+        (qid, float(a_i), float(b_i), int(n), difficulty_level(b_i))
+        for qid, a_i, b_i, n in zip(question_ids, a, b, responses)
+    ]
+    execute_values(cursor, """
+        INSERT INTO public.question_stats
+            (question_id, irt_discrimination, irt_difficulty, irt_responses, irt_calibrated_at)
+        SELECT v.question_id::UUID, v.a, v.b, v.n, NOW()
+        FROM (VALUES %s) AS v(question_id, a, b, n, level)
+        ON CONFLICT (question_id) DO UPDATE SET
+            irt_discrimination = EXCLUDED.irt_discrimination,
+            irt_difficulty = EXCLUDED.irt_difficulty,
+            irt_responses = EXCLUDED.irt_responses,
+            irt_calibrated_at = EXCLUDED.irt_calibrated_at
+    """, rows, page_size=1000)
+    execute_values(cursor, """
+        UPDATE public.questions q SET difficulty_level = v.level
+        FROM (VALUES %s) AS v(question_id, a, b, n, level)
+        WHERE q.id = v.question_id::UUID AND q.difficulty_level IS DISTINCT FROM v.level
+    """, rows, page_size=1000)
+
+
+def calibrate(conn, full: bool = False) -> int:
+    started = time.perf_counter()
+    with conn.cursor() as cursor:
+        watermark = None if full else load_watermark(cursor)
+        cursor.execute("""
+            SELECT LEAST(COALESCE(MAX(created_at), 'infinity'), NOW() - %s::INTERVAL)
+            FROM public.user_question_history
+        """, (WATERMARK_LAG,))
+        new_watermark = cursor.fetchone()[0]
+        since = watermark or "-infinity"
+
+        cursor.execute(CHANGED_QUESTIONS, (since,))
+        changed = {str(row[0]) for row in cursor}
+        if not changed:
+            print("✓ Nenhuma resposta nova desde a última calibração")
+            return 0
+
+        sink = ResponseSink()
+        cursor.copy_expert(cursor.mogrify(RESPONSES_SQL, (since,)).decode(), sink)
+        n_users, n_items = len(sink.users), len(sink.items)
+        print(f"📥 {len(sink.correct)} respostas de {n_users} usuários sobre {n_items} questões "
+              f"({time.perf_counter() - started:.1f}s)")
+
+        right, wrong = response_matrices(
+            np.frombuffer(sink.user_index, dtype=np.int32),
+            np.frombuffer(sink.item_index, dtype=np.int32),
+            np.frombuffer(sink.correct, dtype=np.int8).astype(bool),
+            n_users, n_items,
+        )
+        question_ids = [None] * n_items
+        for question_id, index in sink.items.items():
+            question_ids[index] = question_id
+
+        # Reajusta as questões alteradas e as que nunca foram calibradas
+        discrimination, difficulty = load_parameters(cursor, sink.items)
+        fit = np.isnan(difficulty) | np.array([qid in changed for qid in question_ids])
+        discrimination = np.where(np.isnan(discrimination), 1.0, discrimination)
+        difficulty = np.where(np.isnan(difficulty), initial_difficulty(right, wrong), difficulty)
+
+        result = calibrate_2pl(right, wrong, discrimination, difficulty, fit=fit)
+        print(f"🧮 EM: {result.iterations} iterações, convergiu={result.converged}, "
+              f"log-verossimilhança={result.log_likelihood:.1f}")
+
+        responses = np.asarray((right + wrong).sum(axis=0)).ravel()
+        selected = np.flatnonzero(fit)
+        write_parameters(
+            cursor,
+            [question_ids[i] for i in selected],
+            result.discrimination[selected],
+            result.difficulty[selected],
+            responses[selected],
+        )
+        cursor.execute("""
+            INSERT INTO public.calibration_watermarks (job, watermark) VALUES (%s, %s)
+            ON CONFLICT (job) DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = NOW()
+        """, (JOB_NAME, new_watermark))
+    conn.commit()
+
+    print(f"✓ {len(selected)} questões calibradas em {time.perf_counter() - started:.1f}s")
+    return len(selected)
+
+
+def main():
+    import psycopg2
+
+    load_environment()
+    database_url = os.getenv("DATABASE_URL", "").strip('"')
+    if not database_url:
+        print("❌ DATABASE_URL não encontrada")
+        sys.exit(1)
+
+    with psycopg2.connect(database_url) as conn:
+        calibrate(conn, full="--full" in sys.argv)
+
+
+if __name__ == "__main__":
+    main()
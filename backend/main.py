@@ -7,10 +7,101 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
 
 # Importar rotas
-from routes import simulados_router
+from routes import simulados_router, questions_router, flashcards_router, analytics_router, cache_router
+from services import (
+    get_supabase_client,
+    question_bank,
+    ranking_service,
+    search_index,
+    answer_buffer,
+    question_stats_aggregator,
+    adaptive_selector,
+    calibration_refresher,
+    user_history,
+    flashcard_scheduler,
+    achievement_engine,
+    analytics_service,
+    response_cache
+)
+from services.user_history import SharedHistoryLoader, supabase_history_loader
+from services.achievements import supabase_unlock_writer, supabase_unlocked_loader
+from services.analytics import supabase_bucket_loader
+from services.flashcards import supabase_deck_loader, supabase_review_writer
+from services.answer_ingestion import AnswerJournal, supabase_answer_writer
+from services.calibration import supabase_calibration_loader
+from services.question_stats import supabase_stats_writer
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load in-memory indexes at startup and run the answer flusher"""
+    client = get_supabase_client()
+    if client is not None:
+        loaded = question_bank.load_from_supabase(client)
+        print(f"✓ Question bank loaded: {loaded} questions")
+        indexed = search_index.build_from_supabase(client)
+        print(f"✓ Search index built: {indexed} questions")
+        # Listings cached before a reload would describe the previous bank
+        response_cache.invalidate("questions")
+        ranked = await ranking_service.refresh_from_supabase(client)
+        print(f"✓ Rankings rebuilt: {ranked} completed attempts")
+        answer_buffer.configure(
+            supabase_answer_writer(client),
+            AnswerJournal(os.getenv("ANSWER_JOURNAL_DIR", "data/answer_journal"), sync=True)
+        )
+        tracked = question_stats_aggregator.load_from_supabase(
+            client, levels=question_bank.difficulty_levels()
+        )
+        question_stats_aggregator.configure(supabase_stats_writer(client), question_bank)
+        print(f"✓ Question stats loaded: {tracked} questions")
+        # One history read per cold user, shared by the three caches below;
+        # a cache that re-reads a user gets a fresh read
+        history_loader = SharedHistoryLoader(supabase_history_loader(client))
+        calibrated = adaptive_selector.load_from_supabase(client)
+        adaptive_selector.configure(history_loader.consumer("adaptive"))
+        print(f"✓ Adaptive selector ready: {calibrated} calibrated questions")
+        # Picks up the nightly IRT calibration without a restart
+        calibration_refresher.configure(supabase_calibration_loader(client))
+        user_history.configure(history_loader.consumer("user_history"))
+        flashcard_scheduler.configure(supabase_deck_loader(client), supabase_review_writer(client))
+        rules = achievement_engine.load_from_supabase(client)
+        achievement_engine.configure(
+            history_loader.consumer("achievements"),
+            supabase_unlocked_loader(client), supabase_unlock_writer(client)
+        )
+        print(f"✓ Achievement rules compiled: {rules}")
+        analytics_service.configure(supabase_bucket_loader(client))
+    # Per-question stats only count answers that reached the database
+    answer_buffer.subscribe(question_stats_aggregator.observe_answer, persisted=True)
+    answer_buffer.subscribe(adaptive_selector.observe_answer)
+    answer_buffer.subscribe(user_history.observe_answer)
+    answer_buffer.subscribe(achievement_engine.observe_answer)
+    if client is not None:
+        recovered = answer_buffer.recover()
+        print(f"✓ Answer buffer ready: {recovered} answers recovered from journal")
+    flushers = [
+        asyncio.create_task(answer_buffer.run()),
+        asyncio.create_task(question_stats_aggregator.run()),
+        asyncio.create_task(achievement_engine.run()),
+        asyncio.create_task(calibration_refresher.run()),
+    ]
+    yield
+    for flusher in flushers:
+        flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await flusher
+    # Flush whatever is still buffered before shutting down
+    with suppress(Exception):
+        answer_buffer.flush()
+    with suppress(Exception):
+        question_stats_aggregator.flush()
+    with suppress(Exception):
+        achievement_engine.flush()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -18,7 +109,8 @@ app = FastAPI(
     description="Backend API for OAB exam preparation platform with AI",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -58,13 +150,12 @@ async def api_status():
 
 # Incluir rotas
 app.include_router(simulados_router)
+app.include_router(questions_router)
+app.include_router(flashcards_router)
+app.include_router(analytics_router)
+app.include_router(cache_router)
 
 # Placeholder endpoints para outras funcionalidades
-@app.get("/api/v1/questions")
-async def get_questions():
-    """Get questions from the bank"""
-    return {"message": "Questions endpoint - Coming soon!"}
-
 @app.post("/api/v1/auth/login")
 async def login():
     """User login"""
@@ -5,17 +5,69 @@ Simulai OAB - Models Package
 from .simulados import (
     SimuladoDisponivel,
     SimuladoRealizado,
+    RankingSimulado,
     SimuladoCreate,
+    SimuladoMontado,
     SimuladoSubmit,
     PaginationMeta,
-    PaginatedResponse
+    PaginatedResponse,
+    CursorPaginationMeta,
+    CursorPaginatedResponse
+)
+from .questions import (
+    QuestionSummary,
+    QuestionSearchHit,
+    QuestionSearchResponse,
+    QuestionAnswerCreate,
+    QuestionAnswerResult,
+    AbilityEstimate,
+    NextQuestion,
+    CategoryProgress,
+    ProgressResponse
+)
+from .flashcards import (
+    FlashcardSchedule,
+    FlashcardDueResponse,
+    FlashcardReviewCreate
+)
+from .analytics import (
+    SubjectPerformance,
+    ActivityData,
+    AnalyticsData
+)
+from .cache import (
+    CacheStatsResponse,
+    CacheInvalidate,
+    CacheInvalidateResult
 )
 
 __all__ = [
     'SimuladoDisponivel',
     'SimuladoRealizado',
+    'RankingSimulado',
     'SimuladoCreate',
+    'SimuladoMontado',
     'SimuladoSubmit',
     'PaginationMeta',
-    'PaginatedResponse'
+    'PaginatedResponse',
+    'CursorPaginationMeta',
+    'CursorPaginatedResponse',
+    'QuestionSummary',
+    'QuestionSearchHit',
+    'QuestionSearchResponse',
+    'QuestionAnswerCreate',
+    'QuestionAnswerResult',
+    'AbilityEstimate',
+    'NextQuestion',
+    'CategoryProgress',
+    'ProgressResponse',
+    'FlashcardSchedule',
+    'FlashcardDueResponse',
+    'FlashcardReviewCreate',
+    'SubjectPerformance',
+    'ActivityData',
+    'AnalyticsData',
+    'CacheStatsResponse',
+    'CacheInvalidate',
+    'CacheInvalidateResult'
 ]
@@ -0,0 +1,34 @@
+"""
+Simulai OAB - Modelos para Analytics
+Define os modelos Pydantic das estatísticas de estudo (campos no formato
+de `frontend/src/types/api.ts`)
+"""
+
+from typing import List
+from pydantic import BaseModel
+
+class SubjectPerformance(BaseModel):
+    """Respostas e acertos numa disciplina no período"""
+    subject: str
+    total: int
+    correct: int
+    accuracy: int
+    timeSpentSeconds: int
+
+class ActivityData(BaseModel):
+    """Respostas de um dia"""
+    date: str
+    questionsAnswered: int
+    correctAnswers: int
+    accuracy: int
+    timeSpentSeconds: int
+
+class AnalyticsData(BaseModel):
+    """Visão geral das estatísticas do usuário no período"""
+    totalQuestions: int
+    answeredQuestions: int
+    correctAnswers: int
+    accuracyRate: int
+    timeSpentSeconds: int
+    subjectPerformance: List[SubjectPerformance]
+    recentActivity: List[ActivityData]
@@ -0,0 +1,31 @@
+"""
+Simulai OAB - Modelos para o Cache de Respostas
+Define os modelos Pydantic dos contadores e da invalidação do cache
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class CacheStatsResponse(BaseModel):
+    """Contadores do cache de respostas"""
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+    invalidations: int
+    coalesced: int
+    coalesce_timeouts: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+class CacheInvalidate(BaseModel):
+    """Tags cujas respostas devem sair do cache (ex.: simulados, questions)"""
+    tags: List[str] = Field(..., min_length=1)
+
+class CacheInvalidateResult(BaseModel):
+    """Quantas respostas foram removidas (e questões recarregadas, para a tag questions)"""
+    tags: List[str]
+    invalidated: int
+    reloaded_questions: Optional[int] = None
@@ -0,0 +1,30 @@
+"""
+Simulai OAB - Modelos para Flashcards
+Define os modelos Pydantic da revisão espaçada
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class FlashcardSchedule(BaseModel):
+    """Estado de agendamento de um flashcard"""
+    id: str
+    category: Optional[str] = None
+    next_review_at: Optional[datetime] = None
+    interval_days: float
+    ease_factor: float
+    repetitions: int
+    lapses: int
+    review_count: int
+
+class FlashcardDueResponse(BaseModel):
+    """Flashcards vencidos e previsão de revisões por dia"""
+    due_now: int
+    data: List[FlashcardSchedule]
+    forecast: Dict[str, int]
+
+class FlashcardReviewCreate(BaseModel):
+    """Resultado de uma revisão (0 = esqueceu, 5 = lembrou com facilidade)"""
+    user_id: str
+    grade: int = Field(..., ge=0, le=5)
@@ -0,0 +1,71 @@
+"""
+Simulai OAB - Modelos para Questões
+Define os modelos Pydantic do banco de questões
+"""
+
+from typing import Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+class QuestionSummary(BaseModel):
+    """Modelo resumido de questão para listagens"""
+    id: str
+    category: Optional[str] = None
+    exam_year: Optional[int] = None
+    difficulty_level: str
+    tags: List[str]
+    is_active: bool
+
+class QuestionSearchHit(BaseModel):
+    """Modelo de resultado da busca textual"""
+    id: str
+    score: float
+    category: Optional[str] = None
+    exam_year: Optional[int] = None
+
+class QuestionSearchResponse(BaseModel):
+    """Resposta da busca textual com facetas"""
+    data: List[QuestionSearchHit]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+class QuestionAnswerCreate(BaseModel):
+    """Resposta de um usuário a uma questão avulsa"""
+    user_id: UUID
+    selected_answer: str = Field(..., pattern="^[A-Ea-e]$")
+    time_taken_seconds: Optional[int] = Field(None, ge=0)
+    confidence_level: Optional[int] = Field(None, ge=1, le=5)
+    simulation_id: Optional[UUID] = None
+
+class QuestionAnswerResult(BaseModel):
+    """Correção imediata da resposta (a gravação é feita em lote)"""
+    id: str
+    question_id: str
+    is_correct: bool
+    correct_answer: str
+
+class AbilityEstimate(BaseModel):
+    """Habilidade estimada (TRI) do usuário numa disciplina"""
+    theta: float
+    standard_error: float
+    answered: int
+
+class NextQuestion(BaseModel):
+    """Próxima questão do treino adaptativo"""
+    question: QuestionSummary
+    information: float
+    ability: AbilityEstimate
+
+class CategoryProgress(BaseModel):
+    """Questões respondidas e erradas pelo usuário numa disciplina"""
+    category: str
+    total: int
+    answered: int
+    wrong: int
+
+class ProgressResponse(BaseModel):
+    """Progresso do usuário por disciplina"""
+    user_id: str
+    answered: int
+    wrong: int
+    categories: List[CategoryProgress]
@@ -3,7 +3,7 @@ Simulai OAB - Modelos para Simulados
 Define os modelos Pydantic para simulados e respostas paginadas
 """
 
-from typing import List, Optional, Generic, TypeVar
+from typing import Dict, List, Optional, Generic, TypeVar
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -35,6 +35,14 @@ class SimuladoRealizado(BaseModel):
     posicao: int
     totalParticipantes: int
 
+class RankingSimulado(BaseModel):
+    """Modelo para a posição de uma nota no ranking do simulado"""
+    simulado_id: int
+    nota: float
+    posicao: int
+    totalParticipantes: int
+    percentil: float
+
 class SimuladoCreate(BaseModel):
     """Modelo para criação de simulados"""
     titulo: str
@@ -45,9 +53,16 @@ class SimuladoCreate(BaseModel):
     dificuldade: str
     descricao: str
 
+class SimuladoMontado(BaseModel):
+    """Modelo para simulado montado a partir das cotas de disciplinas"""
+    titulo: str
+    questoes: List[str]
+    faltantes: Dict[str, int]
+
 class SimuladoSubmit(BaseModel):
     """Modelo para submissão de respostas de simulado"""
     simulado_id: int
+    user_id: Optional[str] = None
     respostas: dict
     tempo_gasto: int
 
@@ -64,3 +79,16 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """Resposta paginada genérica"""
     data: List[T]
     meta: PaginationMeta
+
+class CursorPaginationMeta(BaseModel):
+    """Metadados de paginação por cursor (keyset)"""
+    itemsPerPage: int
+    nextCursor: Optional[str] = None
+    hasNextPage: bool
+    hasPrevPage: bool
+    approximateTotal: Optional[int] = None
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    """Resposta paginada por cursor genérica"""
+    data: List[T]
+    meta: CursorPaginationMeta
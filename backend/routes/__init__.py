@@ -3,7 +3,15 @@ Simulai OAB - Routes Package
 """
 
 from .simulados import router as simulados_router
+from .questions import router as questions_router
+from .flashcards import router as flashcards_router
+from .analytics import router as analytics_router
+from .cache import router as cache_router
 
 __all__ = [
-    'simulados_router'
+    'simulados_router',
+    'questions_router',
+    'flashcards_router',
+    'analytics_router',
+    'cache_router'
 ]
@@ -0,0 +1,87 @@
+"""
+Simulai OAB - Rotas para Analytics
+Estatísticas de estudo servidas pelos agregados diários (migração 009)
+"""
+
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, Query
+
+from models.analytics import ActivityData, AnalyticsData, SubjectPerformance
+from services.analytics import Bucket, analytics_service
+
+router = APIRouter(
+    prefix="/api/v1/analytics",
+    tags=["analytics"],
+    responses={404: {"description": "Not found"}},
+)
+
+PERIOD_PATTERN = "^(7d|30d|90d|1y)$"
+
+def to_subject(bucket: Bucket) -> SubjectPerformance:
+    return SubjectPerformance(
+        subject=bucket.key,
+        total=bucket.answered,
+        correct=bucket.correct,
+        accuracy=bucket.accuracy,
+        timeSpentSeconds=bucket.time_spent_seconds
+    )
+
+def to_activity(bucket: Bucket) -> ActivityData:
+    return ActivityData(
+        date=bucket.key,
+        questionsAnswered=bucket.answered,
+        correctAnswers=bucket.correct,
+        accuracy=bucket.accuracy,
+        timeSpentSeconds=bucket.time_spent_seconds
+    )
+
+@router.get("/overview", response_model=AnalyticsData)
+async def analytics_overview(
+    user_id: str = Query(..., description="ID do usuário"),
+    period: str = Query("30d", pattern=PERIOD_PATTERN, description="Período: 7d, 30d, 90d ou 1y"),
+    subject: Optional[str] = Query(None, description="Restringe a uma disciplina")
+):
+    """
+    Visão geral das estatísticas do usuário no período
+
+    - **totalQuestions**: questões ativas no banco (na disciplina, se filtrada)
+    - **recentActivity**: um item por dia do período, inclusive dias sem respostas
+    """
+    # Os buckets são lidos do Supabase: fora do event loop
+    overview = await asyncio.to_thread(analytics_service.overview, user_id, period, category=subject)
+    return AnalyticsData(
+        totalQuestions=overview.total_questions,
+        answeredQuestions=overview.totals.answered,
+        correctAnswers=overview.totals.correct,
+        accuracyRate=overview.totals.accuracy,
+        timeSpentSeconds=overview.totals.time_spent_seconds,
+        subjectPerformance=[to_subject(b) for b in overview.categories],
+        recentActivity=[to_activity(b) for b in overview.activity]
+    )
+
+@router.get("/performance", response_model=List[SubjectPerformance])
+async def analytics_performance(
+    user_id: str = Query(..., description="ID do usuário"),
+    period: str = Query("30d", pattern=PERIOD_PATTERN, description="Período: 7d, 30d, 90d ou 1y")
+):
+    """Respostas, acertos e tempo por disciplina, das mais respondidas para as menos"""
+    buckets = await asyncio.to_thread(analytics_service.performance, user_id, period)
+    return [to_subject(b) for b in buckets]
+
+@router.get("/activity", response_model=List[ActivityData])
+async def analytics_activity(
+    user_id: str = Query(..., description="ID do usuário"),
+    period: str = Query("30d", pattern=PERIOD_PATTERN, description="Período: 7d, 30d, 90d ou 1y"),
+    limit: Optional[int] = Query(None, ge=1, le=366, description="Apenas os últimos N dias")
+):
+    """
+    Atividade diária do usuário, do dia mais antigo para hoje
+
+    Lê uma linha por dia do período em `user_daily_stats`.
+    """
+    days = await asyncio.to_thread(analytics_service.activity, user_id, period)
+    if limit is not None:
+        days = days[-limit:]
+    return [to_activity(b) for b in days]
@@ -0,0 +1,88 @@
+"""
+Simulai OAB - Rotas para o Cache de Respostas
+Contadores do cache e invalidação por tag para escritores externos
+(importação de questões, publicação de simulados)
+"""
+
+import asyncio
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from models.cache import CacheInvalidate, CacheInvalidateResult, CacheStatsResponse
+from services.calibration import calibration_refresher
+from services.database import get_supabase_client
+from services.question_bank import question_bank
+from services.response_cache import response_cache
+from services.search import search_index
+from services.single_flight import SingleFlight
+
+# Tag cujas respostas vêm do banco de questões em memória
+QUESTIONS_TAG = "questions"
+
+# Invalidações simultâneas de "questions" compartilham uma única recarga
+_reloads = SingleFlight()
+
+
+def reload_questions(client) -> int:
+    """Recarrega o banco de questões e reindexa as alteradas; devolve quantas foram carregadas"""
+    loaded = question_bank.load_from_supabase(client)
+    search_index.refresh_from_supabase(client)
+    # Pools do seletor adaptativo e níveis calibrados seguem os novos ordinais
+    calibration_refresher.refresh()
+    return loaded
+
+router = APIRouter(
+    prefix="/api/v1/cache",
+    tags=["cache"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/stats", response_model=CacheStatsResponse)
+async def cache_stats():
+    """
+    Acertos, falhas, despejos e ocupação do cache de respostas
+    
+    - **coalesced**: falhas atendidas pelo cálculo em andamento de outra requisição
+    - **coalesce_timeouts**: falhas que desistiram de esperar e calcularam sozinhas
+    """
+    stats = response_cache.stats()
+    flights = response_cache.flights.stats()
+    return CacheStatsResponse(
+        hit_rate=round(stats.hit_rate, 4),
+        coalesced=flights.followers,
+        coalesce_timeouts=flights.timeouts,
+        **stats.__dict__
+    )
+
+@router.post("/invalidate", response_model=CacheInvalidateResult)
+async def invalidate_cache(
+    invalidation: CacheInvalidate,
+    x_admin_token: Optional[str] = Header(None, description="Valor de CACHE_ADMIN_TOKEN")
+):
+    """
+    Remove do cache as respostas com as tags informadas
+    
+    Chamado por processos que escrevem fora da API (ex.: `scripts/import_dataset.py`).
+    Exige o cabeçalho `X-Admin-Token` igual a `CACHE_ADMIN_TOKEN`; sem a
+    variável configurada a invalidação remota fica desabilitada.
+    
+    A tag `questions` também recarrega o banco de questões e o índice de
+    busca em memória antes de invalidar, para que as listagens recalculadas
+    já vejam as questões novas.
+    """
+    expected = os.getenv("CACHE_ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Invalidação remota desabilitada")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Token inválido")
+    reloaded = None
+    client = get_supabase_client()
+    if QUESTIONS_TAG in invalidation.tags and client is not None:
+        reloaded = await _reloads.do(QUESTIONS_TAG, lambda: asyncio.to_thread(reload_questions, client))
+    invalidated = response_cache.invalidate(*invalidation.tags)
+    return CacheInvalidateResult(
+        tags=invalidation.tags, invalidated=invalidated, reloaded_questions=reloaded
+    )
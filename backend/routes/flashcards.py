@@ -0,0 +1,66 @@
+"""
+Simulai OAB - Rotas para Flashcards
+Revisão espaçada (SM-2) servida a partir das filas em memória
+"""
+
+import asyncio
+from fastapi import APIRouter, HTTPException, Path, Query
+
+from models.flashcards import FlashcardDueResponse, FlashcardReviewCreate, FlashcardSchedule
+from services.flashcards import CardSchedule, flashcard_scheduler
+
+router = APIRouter(
+    prefix="/api/v1/flashcards",
+    tags=["flashcards"],
+    responses={404: {"description": "Not found"}},
+)
+
+def to_schedule(card: CardSchedule) -> FlashcardSchedule:
+    return FlashcardSchedule(
+        id=card.card_id,
+        category=card.category,
+        next_review_at=card.next_review_at,
+        interval_days=card.interval_days,
+        ease_factor=round(card.ease_factor, 2),
+        repetitions=card.repetitions,
+        lapses=card.lapses,
+        review_count=card.review_count
+    )
+
+@router.get("/due", response_model=FlashcardDueResponse)
+async def get_due_flashcards(
+    user_id: str = Query(..., description="ID do usuário"),
+    limit: int = Query(20, ge=1, le=100, description="Máximo de cartões retornados"),
+    forecast_days: int = Query(7, ge=1, le=60, description="Dias na previsão de revisões")
+):
+    """
+    Flashcards vencidos agora, dos mais atrasados para os mais recentes
+    
+    - **due_now**: total de cartões vencidos
+    - **forecast**: cartões que vencem em cada dia (hoje inclui os atrasados)
+    """
+    # Uma fila ausente ou vencida é lida do Supabase: fora do event loop
+    summary = await asyncio.to_thread(
+        flashcard_scheduler.due, user_id, limit=limit, forecast_days=forecast_days
+    )
+    return FlashcardDueResponse(
+        due_now=summary.due_now,
+        data=[to_schedule(card) for card in summary.cards],
+        forecast=summary.forecast
+    )
+
+@router.post("/{card_id}/review", response_model=FlashcardSchedule)
+async def review_flashcard(
+    review: FlashcardReviewCreate,
+    card_id: str = Path(..., description="ID do flashcard")
+):
+    """
+    Registra uma revisão e reagenda o cartão pelo SM-2
+    
+    Notas abaixo de 3 reiniciam o intervalo; as demais multiplicam o
+    intervalo atual pelo fator de facilidade do cartão.
+    """
+    card = await asyncio.to_thread(flashcard_scheduler.review, review.user_id, card_id, review.grade)
+    if card is None:
+        raise HTTPException(status_code=404, detail="Flashcard não encontrado")
+    return to_schedule(card)
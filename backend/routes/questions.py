@@ -0,0 +1,177 @@
+"""
+Simulai OAB - Rotas para Questões
+Listagem do banco de questões servida a partir do índice em memória
+"""
+
+import asyncio
+from fastapi import APIRouter, HTTPException, Path, Query
+from typing import Optional
+
+from models.simulados import PaginatedResponse
+from models.questions import (
+    QuestionSummary,
+    QuestionSearchHit,
+    QuestionSearchResponse,
+    QuestionAnswerCreate,
+    QuestionAnswerResult,
+    AbilityEstimate,
+    NextQuestion,
+    CategoryProgress,
+    ProgressResponse
+)
+from services.adaptive import adaptive_selector
+from services.answer_ingestion import answer_buffer
+from routes.simulados import paginate_data
+from services.question_bank import question_bank
+from services.response_cache import CachedRoute, response_cache
+from services.search import search_index
+from services.user_history import user_history
+
+router = APIRouter(
+    prefix="/api/v1/questions",
+    tags=["questions"],
+    responses={404: {"description": "Not found"}},
+    route_class=CachedRoute,
+)
+
+# Listagens iguais para todos os usuários; invalidadas pela tag "questions"
+LISTING_TTL_SECONDS = 300
+
+@router.get("", response_model=PaginatedResponse[QuestionSummary])
+@response_cache.cached(ttl=LISTING_TTL_SECONDS, tags=("questions",))
+async def get_questions(
+    category: Optional[str] = Query(None, description="Disciplina (ex.: Direito Civil)"),
+    exam_year: Optional[int] = Query(None, ge=2000, le=2100, description="Ano do exame"),
+    difficulty: Optional[str] = Query(None, pattern="^(easy|medium|hard)$", description="Dificuldade"),
+    tag: Optional[str] = Query(None, description="Tag da questão"),
+    page: int = Query(1, ge=1, description="Página atual"),
+    limit: int = Query(20, ge=1, le=100, description="Itens por página")
+):
+    """
+    Lista questões do banco com filtros e paginação
+    
+    - **category**, **exam_year**, **difficulty**, **tag**: filtros opcionais
+    - **page**: Número da página (começa em 1)
+    - **limit**: Número de itens por página (máximo 100)
+    """
+    ordinals = question_bank.filter(
+        category=category,
+        exam_year=exam_year,
+        difficulty=difficulty,
+        tag=tag
+    )
+    page_ordinals, meta = paginate_data(ordinals, page, limit)
+    return PaginatedResponse(data=question_bank.rows(page_ordinals), meta=meta)
+
+@router.get("/search", response_model=QuestionSearchResponse)
+@response_cache.cached(ttl=LISTING_TTL_SECONDS, tags=("questions",))
+async def search_questions(
+    q: str = Query(..., min_length=2, description="Termos da busca"),
+    category: Optional[str] = Query(None, description="Filtrar por disciplina"),
+    exam_year: Optional[int] = Query(None, ge=2000, le=2100, description="Filtrar por ano do exame"),
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de resultados")
+):
+    """
+    Busca textual no enunciado e na explicação das questões
+    
+    - **q**: Termos da busca (acentos e flexões são ignorados)
+    - **category**, **exam_year**: filtros de faceta
+    - **limit**: Número máximo de resultados (ranking BM25)
+    """
+    result = search_index.search(q, limit=limit, category=category, exam_year=exam_year)
+    return QuestionSearchResponse(
+        data=[QuestionSearchHit(**hit.__dict__) for hit in result.hits],
+        total=result.total,
+        facets=result.facets
+    )
+
+@router.get("/review", response_model=PaginatedResponse[QuestionSummary])
+async def review_questions(
+    user_id: str = Query(..., description="ID do usuário"),
+    category: Optional[str] = Query(None, description="Disciplina (ex.: Direito Civil)"),
+    page: int = Query(1, ge=1, description="Página atual"),
+    limit: int = Query(20, ge=1, le=100, description="Itens por página")
+):
+    """
+    Revisão de erros: questões cuja última resposta do usuário foi incorreta
+    
+    - **category**: restringe a uma disciplina
+    - **page**, **limit**: paginação
+    """
+    # A primeira consulta de um usuário lê o histórico no Supabase: fora do event loop
+    ordinals = await asyncio.to_thread(user_history.review, user_id, category)
+    page_ordinals, meta = paginate_data(ordinals, page, limit)
+    return PaginatedResponse(data=question_bank.rows(page_ordinals), meta=meta)
+
+@router.get("/progress", response_model=ProgressResponse)
+async def question_progress(user_id: str = Query(..., description="ID do usuário")):
+    """
+    Questões respondidas e erradas pelo usuário em cada disciplina
+    
+    Conta apenas questões ativas do banco; respostas enviadas há poucos
+    segundos já entram, antes mesmo de serem gravadas.
+    """
+    progress = await asyncio.to_thread(user_history.progress, user_id)
+    categories = [CategoryProgress(**p.__dict__) for p in progress]
+    return ProgressResponse(
+        user_id=user_id,
+        answered=sum(p.answered for p in categories),
+        wrong=sum(p.wrong for p in categories),
+        categories=categories
+    )
+
+@router.get("/next", response_model=NextQuestion)
+async def next_question(
+    user_id: str = Query(..., description="ID do usuário"),
+    category: str = Query(..., description="Disciplina do treino (ex.: Direito Civil)")
+):
+    """
+    Próxima questão do treino adaptativo numa disciplina
+    
+    Escolhe, entre as questões ainda não respondidas pelo usuário, a de
+    maior informação (TRI) para a habilidade estimada dele na disciplina.
+    A estimativa é atualizada a cada resposta enviada em
+    `POST /{question_id}/answer`.
+    """
+    pick = await asyncio.to_thread(adaptive_selector.next_question, user_id, category)
+    if pick is None:
+        raise HTTPException(status_code=404, detail="Nenhuma questão disponível para esta disciplina")
+    return NextQuestion(
+        question=question_bank.rows([pick.ordinal])[0],
+        information=pick.information,
+        ability=AbilityEstimate(**pick.ability.__dict__)
+    )
+
+@router.post("/{question_id}/answer", response_model=QuestionAnswerResult, status_code=202)
+async def answer_question(
+    answer: QuestionAnswerCreate,
+    question_id: str = Path(..., description="ID da questão")
+):
+    """
+    Registra a resposta de um usuário a uma questão
+    
+    A correção é imediata (gabarito em memória); a gravação em
+    `user_question_history` e `user_stats` é feita em lote pelo buffer de
+    ingestão, alguns segundos depois.
+    """
+    ordinal = question_bank.ordinal(question_id)
+    correct_answer = question_bank.correct_answer(ordinal) if ordinal is not None else None
+    if correct_answer is None:
+        raise HTTPException(status_code=404, detail="Questão não encontrada")
+    
+    selected = answer.selected_answer.upper()
+    record = answer_buffer.record(
+        user_id=str(answer.user_id),
+        question_id=question_id,
+        selected_answer=selected,
+        is_correct=selected == correct_answer,
+        time_taken_seconds=answer.time_taken_seconds,
+        confidence_level=answer.confidence_level,
+        simulation_id=str(answer.simulation_id) if answer.simulation_id else None
+    )
+    return QuestionAnswerResult(
+        id=record["id"],
+        question_id=question_id,
+        is_correct=record["is_correct"],
+        correct_answer=correct_answer
+    )
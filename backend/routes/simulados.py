@@ -4,18 +4,30 @@ Endpoints para gerenciamento de simulados com suporte a paginação
 """
 
 from fastapi import APIRouter, Query, Path, HTTPException, Depends
-from typing import List, Optional
+from typing import List, Optional, Union
+import asyncio
+import base64
+import json
 import math
 from datetime import datetime
 
 from models.simulados import (
     SimuladoDisponivel,
     SimuladoRealizado,
+    RankingSimulado,
     SimuladoCreate,
+    SimuladoMontado,
     SimuladoSubmit,
     PaginationMeta,
-    PaginatedResponse
+    PaginatedResponse,
+    CursorPaginationMeta,
+    CursorPaginatedResponse
 )
+from services.assembly import build_quotas, simulado_assembler
+from services.user_history import user_history
+from services.grading import grading_engine
+from services.ranking import ranking_service
+from services.response_cache import CachedRoute, response_cache
 
 # Dados mockados para desenvolvimento (serão substituídos por banco de dados)
 SIMULADOS_DISPONIVEIS = [
@@ -210,12 +222,28 @@ SIMULADOS_REALIZADOS = [
     }
 ]
 
+# Gabaritos mockados (serão carregados do banco junto com as questões)
+def _mock_gabarito(simulado):
+    """Gera um gabarito determinístico para os simulados mockados"""
+    total = simulado["questoes"]
+    disciplinas = simulado["disciplinas"]
+    respostas = ["ABCD"[(posicao * 7 + simulado["id"]) % 4] for posicao in range(total)]
+    por_posicao = [disciplinas[posicao * len(disciplinas) // total] for posicao in range(total)]
+    return respostas, por_posicao
+
+for _simulado in SIMULADOS_DISPONIVEIS:
+    grading_engine.register(_simulado["id"], *_mock_gabarito(_simulado))
+
 router = APIRouter(
     prefix="/api/v1/simulados",
     tags=["simulados"],
     responses={404: {"description": "Not found"}},
+    route_class=CachedRoute,
 )
 
+# Catálogo igual para todos os usuários; invalidado pela tag "simulados"
+CATALOG_TTL_SECONDS = 300
+
 def paginate_data(data, page: int, limit: int):
     """Função auxiliar para paginar dados"""
     start = (page - 1) * limit
@@ -239,36 +267,136 @@ def paginate_data(data, page: int, limit: int):
     
     return paginated_items, meta
 
-@router.get("/disponiveis", response_model=PaginatedResponse[SimuladoDisponivel])
+def encode_cursor(key) -> str:
+    """Codifica a chave de ordenação do último item em um cursor opaco"""
+    raw = json.dumps(list(key), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decodifica um cursor opaco de volta para a chave de ordenação"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(key, list) or not key:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return tuple(key)
+
+def _seek_after(data, sort_key, boundary: tuple, descending: bool) -> int:
+    """Busca binária pela primeira posição depois do cursor (equivale a WHERE key > :cursor)"""
+    lo, hi = 0, len(data)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        key = sort_key(data[mid])
+        if (key < boundary) if descending else (key > boundary):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def paginate_cursor(data, limit: int, cursor: Optional[str], sort_key,
+                    descending: bool = False, include_total: bool = False):
+    """
+    Função auxiliar para paginar dados por cursor (keyset)
+    
+    `data` deve estar ordenado por `sort_key` (decrescente se `descending`).
+    O custo de cada página independe da profundidade: em memória é uma busca
+    binária; no banco, `WHERE (chave) > (:cursor) ORDER BY chave LIMIT :limit`.
+    """
+    start = 0
+    if cursor is not None:
+        try:
+            start = _seek_after(data, sort_key, decode_cursor(cursor), descending)
+        except TypeError:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+    
+    end = start + limit
+    paginated_items = data[start:end]
+    has_next = end < len(data)
+    
+    meta = CursorPaginationMeta(
+        itemsPerPage=limit,
+        nextCursor=encode_cursor(sort_key(paginated_items[-1])) if has_next else None,
+        hasNextPage=has_next,
+        hasPrevPage=(cursor is not None),
+        # No banco, estimativa via pg_class.reltuples em vez de COUNT(*)
+        approximateTotal=len(data) if include_total else None
+    )
+    
+    return paginated_items, meta
+
+def _disponivel_key(simulado):
+    return (simulado["id"],)
+
+def _realizado_key(simulado):
+    return (simulado["dataRealizacao"], simulado["id"])
+
+@router.get(
+    "/disponiveis",
+    response_model=Union[PaginatedResponse[SimuladoDisponivel], CursorPaginatedResponse[SimuladoDisponivel]]
+)
+@response_cache.cached(ttl=CATALOG_TTL_SECONDS, tags=("simulados",))
 async def get_simulados_disponiveis(
     page: int = Query(1, ge=1, description="Página atual"),
-    limit: int = Query(10, ge=1, le=100, description="Itens por página")
+    limit: int = Query(10, ge=1, le=100, description="Itens por página"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="Modo de paginação"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em nextCursor"),
+    include_total: bool = Query(False, description="Incluir total aproximado (modo cursor)")
 ):
     """
     Retorna simulados disponíveis com paginação
     
     - **page**: Número da página (começa em 1)
     - **limit**: Número de itens por página (máximo 100)
+    - **pagination**: `offset` (padrão) ou `cursor`; informar `cursor` ativa o modo cursor
+    - **cursor**: Cursor da próxima página, retornado em `meta.nextCursor`
+    - **include_total**: Inclui `approximateTotal` nos metadados do modo cursor
     """
+    if pagination == "cursor" or cursor is not None:
+        items, cursor_meta = paginate_cursor(
+            SIMULADOS_DISPONIVEIS, limit, cursor, _disponivel_key,
+            include_total=include_total
+        )
+        return CursorPaginatedResponse(data=items, meta=cursor_meta)
+    
     items, meta = paginate_data(SIMULADOS_DISPONIVEIS, page, limit)
     return PaginatedResponse(data=items, meta=meta)
 
-@router.get("/realizados", response_model=PaginatedResponse[SimuladoRealizado])
+@router.get(
+    "/realizados",
+    response_model=Union[PaginatedResponse[SimuladoRealizado], CursorPaginatedResponse[SimuladoRealizado]]
+)
 async def get_simulados_realizados(
     page: int = Query(1, ge=1, description="Página atual"),
-    limit: int = Query(10, ge=1, le=100, description="Itens por página")
+    limit: int = Query(10, ge=1, le=100, description="Itens por página"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="Modo de paginação"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em nextCursor"),
+    include_total: bool = Query(False, description="Incluir total aproximado (modo cursor)")
 ):
     """
     Retorna simulados realizados pelo usuário com paginação
     
     - **page**: Número da página (começa em 1)
     - **limit**: Número de itens por página (máximo 100)
+    - **pagination**: `offset` (padrão) ou `cursor`; informar `cursor` ativa o modo cursor
+    - **cursor**: Cursor da próxima página, retornado em `meta.nextCursor`
+    - **include_total**: Inclui `approximateTotal` nos metadados do modo cursor
     """
     # Em um cenário real, filtraríamos pelo ID do usuário autenticado
+    if pagination == "cursor" or cursor is not None:
+        # Mais recentes primeiro: (dataRealizacao, id) decrescente
+        items, cursor_meta = paginate_cursor(
+            SIMULADOS_REALIZADOS, limit, cursor, _realizado_key,
+            descending=True, include_total=include_total
+        )
+        return CursorPaginatedResponse(data=items, meta=cursor_meta)
+    
     items, meta = paginate_data(SIMULADOS_REALIZADOS, page, limit)
     return PaginatedResponse(data=items, meta=meta)
 
 @router.get("/{simulado_id}", response_model=SimuladoDisponivel)
+@response_cache.cached(ttl=CATALOG_TTL_SECONDS, tags=("simulados", "simulado:{simulado_id}"))
 async def get_simulado(
     simulado_id: int = Path(..., ge=1, description="ID do simulado")
 ):
@@ -283,6 +411,26 @@ async def get_simulado(
     
     raise HTTPException(status_code=404, detail="Simulado não encontrado")
 
+@router.get("/{simulado_id}/ranking", response_model=RankingSimulado)
+async def get_ranking_simulado(
+    simulado_id: int = Path(..., ge=1, description="ID do simulado"),
+    nota: float = Query(..., ge=0, le=100, description="Nota a posicionar no ranking")
+):
+    """
+    Retorna a posição e o percentil de uma nota no ranking do simulado
+    
+    - **simulado_id**: ID do simulado
+    - **nota**: Nota (0 a 100)
+    """
+    info = ranking_service.rank(simulado_id, nota)
+    return RankingSimulado(
+        simulado_id=simulado_id,
+        nota=nota,
+        posicao=info.posicao,
+        totalParticipantes=info.total_participantes,
+        percentil=info.percentil
+    )
+
 @router.post("/iniciar/{simulado_id}")
 async def iniciar_simulado(
     simulado_id: int = Path(..., ge=1, description="ID do simulado")
@@ -312,22 +460,59 @@ async def iniciar_simulado(
         "iniciado_em": datetime.now().isoformat()
     }
 
+@router.post("/montar", response_model=SimuladoMontado)
+async def montar_simulado(
+    simulado: SimuladoCreate,
+    user_id: Optional[str] = Query(None, description="Usuário cujas questões já vistas serão excluídas")
+):
+    """
+    Monta um simulado customizado a partir das cotas por disciplina e dificuldade
+    
+    - **simulado**: Dados do simulado (questões, disciplinas, dificuldade)
+    - **user_id**: Exclui as questões que o usuário já respondeu
+    """
+    # A primeira consulta de um usuário lê o histórico no Supabase: fora do event loop
+    seen = await asyncio.to_thread(user_history.answered, user_id) if user_id else ()
+    
+    quotas = build_quotas(simulado.questoes, simulado.disciplinas, simulado.dificuldade)
+    # Envios repetidos do mesmo usuário enquanto o primeiro é montado recebem o mesmo
+    # simulado; pedidos anônimos não são coalescidos (seriam de pessoas diferentes)
+    key = (user_id, tuple(quotas)) if user_id else None
+    resultado = await simulado_assembler.assemble_coalesced(key, quotas, exclude=seen)
+    
+    return SimuladoMontado(
+        titulo=simulado.titulo,
+        questoes=resultado.question_ids,
+        faltantes=resultado.shortfall
+    )
+
 @router.post("/submeter")
 async def submeter_simulado(submission: SimuladoSubmit):
     """
     Submete as respostas de um simulado
     
-    - **submission**: Dados da submissão do simulado
+    - **submission**: Dados da submissão do simulado; `respostas` é
+      `{posição: alternativa}`, com posições começando em 1
     """
-    # Em um cenário real, processaríamos as respostas e calcularíamos a nota
+    try:
+        resultado = grading_engine.grade(submission.simulado_id, submission.respostas)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Simulado não encontrado")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Simulando uma nota calculada
-    nota = 75  # Exemplo de nota
+    # Com user_id, a nova nota substitui a tentativa anterior do usuário no ranking
+    ranking = ranking_service.record(submission.simulado_id, resultado.nota, user_id=submission.user_id)
     
     return {
         "message": "Simulado submetido com sucesso",
         "simulado_id": submission.simulado_id,
-        "nota": nota,
+        "nota": resultado.nota,
+        "acertos": resultado.acertos,
+        "total": resultado.total,
+        "disciplinas": resultado.por_disciplina,
+        "posicao": ranking.posicao,
+        "totalParticipantes": ranking.total_participantes,
         "tempo_gasto": submission.tempo_gasto,
         "submetido_em": datetime.now().isoformat()
     }
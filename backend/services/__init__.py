@@ -0,0 +1,60 @@
+"""
+Simulai OAB - Services Package
+"""
+
+from .database import get_supabase_client
+from .question_bank import QuestionBank, question_bank
+from .grading import GradingEngine, GradeResult, grading_engine
+from .assembly import Quota, SimuladoAssembler, build_quotas, simulado_assembler
+from .ranking import RankingService, ScoreRanking, ranking_service
+from .search import SearchIndex, search_index
+from .answer_ingestion import AnswerIngestionBuffer, answer_buffer
+from .question_stats import QuestionStatsAggregator, question_stats_aggregator
+from .adaptive import AdaptiveSelector, adaptive_selector
+from .calibration import CalibrationRefresher, calibration_refresher
+from .user_history import Bitset, UserHistoryCache, user_history
+from .flashcards import FlashcardScheduler, flashcard_scheduler
+from .achievements import AchievementEngine, achievement_engine
+from .analytics import AnalyticsService, analytics_service
+from .response_cache import CachedRoute, ResponseCache, response_cache
+from .single_flight import SingleFlight, SingleFlightTimeout
+
+__all__ = [
+    'get_supabase_client',
+    'QuestionBank',
+    'question_bank',
+    'GradingEngine',
+    'GradeResult',
+    'grading_engine',
+    'Quota',
+    'SimuladoAssembler',
+    'build_quotas',
+    'simulado_assembler',
+    'RankingService',
+    'ScoreRanking',
+    'ranking_service',
+    'SearchIndex',
+    'search_index',
+    'AnswerIngestionBuffer',
+    'answer_buffer',
+    'QuestionStatsAggregator',
+    'question_stats_aggregator',
+    'AdaptiveSelector',
+    'adaptive_selector',
+    'CalibrationRefresher',
+    'calibration_refresher',
+    'Bitset',
+    'UserHistoryCache',
+    'user_history',
+    'FlashcardScheduler',
+    'flashcard_scheduler',
+    'AchievementEngine',
+    'achievement_engine',
+    'AnalyticsService',
+    'analytics_service',
+    'CachedRoute',
+    'ResponseCache',
+    'response_cache',
+    'SingleFlight',
+    'SingleFlightTimeout'
+]
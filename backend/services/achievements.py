@@ -0,0 +1,330 @@
+"""
+Simulai OAB - Avaliação incremental de conquistas
+Compila `achievements.requirements` em condições indexadas pelo contador de
+que dependem; cada resposta atualiza os contadores do usuário e só verifica
+as conquistas cujo limite o contador acabou de cruzar
+"""
+
+import asyncio
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .database import is_rejection, iter_table_rows, write_isolating_rejections
+from .question_bank import QuestionBank, question_bank
+from .user_history import HistoryLoader
+
+# Contadores em que maior é melhor; `answer_time_seconds` é o único em que
+# a condição é "abaixo de" (resposta mais rápida)
+ASCENDING = ("questions_answered", "correct_streak", "daily_streak")
+FASTEST = "answer_time_seconds"
+CATEGORY_CORRECT = "category_correct"
+
+# Usuários com contadores em memória
+MAX_USERS = 10_000
+
+UnlockedLoader = Callable[[str], Iterable[Dict[str, Any]]]
+UnlockWriter = Callable[[List[Dict[str, Any]]], Any]
+
+
+def supabase_unlocked_loader(client) -> UnlockedLoader:
+    def load(user_id: str) -> Iterable[Dict[str, Any]]:
+        return iter_table_rows(client, "user_achievements", "id,achievement_id", filters={"user_id": user_id})
+    return load
+
+
+def supabase_unlock_writer(client) -> UnlockWriter:
+    """Insere os desbloqueios em lote; duplicados (UNIQUE user_id, achievement_id) são ignorados"""
+    def write(rows: List[Dict[str, Any]]):
+        client.table("user_achievements").upsert(
+            rows, on_conflict="user_id,achievement_id", ignore_duplicates=True
+        ).execute()
+    return write
+
+
+@dataclass
+class Rule:
+    """Conquista compilada: todas as condições (contador, limite) precisam valer"""
+    achievement_id: str
+    name: str
+    conditions: List[Tuple[str, float]]
+
+
+def compile_requirements(requirements: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """
+    Converte o JSONB de `requirements` em pares (contador, limite)
+
+    `category_correct` vira um contador por disciplina
+    ("category_correct:Direito Civil"). Chaves desconhecidas levantam
+    ValueError: a conquista inteira fica de fora, em vez de ser avaliada só
+    pelos requisitos conhecidos e desbloqueada antes da hora.
+    """
+    conditions = []
+    for key, value in requirements.items():
+        if key == CATEGORY_CORRECT:
+            for category, count in value.items():
+                conditions.append((f"{CATEGORY_CORRECT}:{category}", float(count)))
+        elif key in ASCENDING or key == FASTEST:
+            conditions.append((key, float(value)))
+        else:
+            raise ValueError(f"Requisito de conquista desconhecido: {key}")
+    if not conditions:
+        raise ValueError("Conquista sem requisitos")
+    return conditions
+
+
+class _Counters:
+    """Contadores incrementais de um usuário"""
+
+    __slots__ = ("values", "last_day", "loaded", "pending", "pending_ids", "unlocked")
+
+    def __init__(self):
+        self.values: Dict[str, float] = {"questions_answered": 0, "correct_streak": 0, "daily_streak": 0}
+        self.last_day: Optional[str] = None
+        self.loaded = False
+        # Eventos recebidos antes da leitura do histórico
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_ids: Set[str] = set()
+        self.unlocked: Set[str] = set()
+
+    def satisfied(self, key: str, threshold: float) -> bool:
+        value = self.values.get(key)
+        if value is None:
+            return False
+        return value < threshold if key == FASTEST else value >= threshold
+
+    def apply(self, category: Optional[str], is_correct: bool, time_taken: Optional[float],
+              day: str) -> List[Tuple[str, float, float]]:
+        """Aplica uma resposta e devolve (contador, antes, depois) dos que mudaram"""
+        values = self.values
+        changes = []
+
+        def set_value(key: str, new: float, default: float = 0):
+            old = values.get(key, default)
+            if new != old:
+                values[key] = new
+                changes.append((key, old, new))
+
+        set_value("questions_answered", values["questions_answered"] + 1)
+        set_value("correct_streak", values["correct_streak"] + 1 if is_correct else 0)
+        if day != self.last_day:
+            consecutive = self.last_day is not None and (
+                datetime.fromisoformat(day).toordinal() - datetime.fromisoformat(self.last_day).toordinal() == 1
+            )
+            set_value("daily_streak", values["daily_streak"] + 1 if consecutive else 1)
+            self.last_day = day
+        if time_taken is not None and time_taken < values.get(FASTEST, float("inf")):
+            set_value(FASTEST, float(time_taken), float("inf"))
+        if is_correct and category:
+            key = f"{CATEGORY_CORRECT}:{category}"
+            set_value(key, values.get(key, 0) + 1)
+        return changes
+
+
+@dataclass
+class AchievementFlushReport:
+    unlocked: int = 0
+    users_loaded: int = 0
+
+
+@dataclass
+class _Index:
+    """Regras de um contador ordenadas pelo limite"""
+    thresholds: List[float] = field(default_factory=list)
+    rules: List[Rule] = field(default_factory=list)
+
+
+class AchievementEngine:
+    """
+    Motor de conquistas orientado a eventos
+
+    Cada condição compilada entra no índice do seu contador, ordenado pelo
+    limite. Uma resposta muda poucos contadores (total, sequência de
+    acertos, sequência de dias, tempo mínimo, acertos da disciplina) e, para
+    cada um, uma busca binária seleciona só as regras cujo limite ficou
+    entre o valor antigo e o novo. Os contadores de um usuário são montados
+    uma vez a partir do histórico (no flush, fora do caminho da requisição);
+    os desbloqueios são inseridos em lote em `user_achievements`. Linhas que
+    o banco recusa (ex.: usuário removido) são descartadas com aviso em vez
+    de bloquear o lote; falhas transitórias mantêm o lote para o próximo flush.
+    """
+
+    def __init__(
+        self,
+        bank: Optional[QuestionBank] = None,
+        history_loader: Optional[HistoryLoader] = None,
+        unlocked_loader: Optional[UnlockedLoader] = None,
+        writer: Optional[UnlockWriter] = None,
+        flush_interval: float = 5.0,
+        max_users: int = MAX_USERS,
+    ):
+        self.bank = bank or question_bank
+        self.history_loader = history_loader
+        self.unlocked_loader = unlocked_loader
+        self.writer = writer
+        self.flush_interval = flush_interval
+        self.max_users = max_users
+        self._rules: List[Rule] = []
+        self._index: Dict[str, _Index] = {}
+        self._users: "OrderedDict[str, _Counters]" = OrderedDict()
+        self._unlocks: List[Dict[str, Any]] = []
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def configure(self, history_loader: Optional[HistoryLoader], unlocked_loader: Optional[UnlockedLoader],
+                  writer: Optional[UnlockWriter]):
+        self.history_loader = history_loader
+        self.unlocked_loader = unlocked_loader
+        self.writer = writer
+
+    def load(self, achievements: Iterable[Dict[str, Any]]) -> int:
+        """Compila as conquistas ativas; as com requisito inválido são ignoradas inteiras, com aviso"""
+        rules = []
+        for row in achievements:
+            if row.get("is_active") is False:
+                continue
+            try:
+                conditions = compile_requirements(row.get("requirements") or {})
+            except (ValueError, AttributeError) as e:
+                print(f"⚠️  Achievement {row.get('name')!r} skipped: {e}")
+                continue
+            rules.append(Rule(str(row["id"]), row.get("name") or "", conditions))
+
+        index: Dict[str, _Index] = {}
+        for rule in rules:
+            for key, threshold in rule.conditions:
+                index.setdefault(key, _Index()).rules.append(rule)
+        for key, entry in index.items():
+            entry.rules.sort(key=lambda r: dict(r.conditions)[key])
+            entry.thresholds = [dict(r.conditions)[key] for r in entry.rules]
+        with self._lock:
+            self._rules, self._index = rules, index
+        return len(rules)
+
+    def load_from_supabase(self, client) -> int:
+        return self.load(iter_table_rows(client, "achievements", "id,name,requirements,is_active"))
+
+    @property
+    def pending_unlocks(self) -> int:
+        return len(self._unlocks)
+
+    def _candidates(self, key: str, old: float, new: float) -> List[Rule]:
+        entry = self._index.get(key)
+        if entry is None:
+            return []
+        if key == FASTEST:
+            # Condição "tempo < limite": vale para limites em (novo, antigo]
+            low, high = bisect_right(entry.thresholds, new), bisect_right(entry.thresholds, old)
+        else:
+            low, high = bisect_right(entry.thresholds, old), bisect_right(entry.thresholds, new)
+        return entry.rules[low:high]
+
+    def _unlock(self, user_id: str, counters: _Counters, rules: Iterable[Rule], unlocked_at: str):
+        for rule in rules:
+            if rule.achievement_id in counters.unlocked:
+                continue
+            if all(counters.satisfied(key, threshold) for key, threshold in rule.conditions):
+                counters.unlocked.add(rule.achievement_id)
+                self._unlocks.append({
+                    "user_id": user_id,
+                    "achievement_id": rule.achievement_id,
+                    "unlocked_at": unlocked_at,
+                })
+
+    def _apply(self, user_id: str, counters: _Counters, answer: Dict[str, Any], evaluate: bool = True):
+        ordinal = self.bank.ordinal(str(answer["question_id"]))
+        category = self.bank.category(ordinal) if ordinal is not None else None
+        answered_at = answer.get("answered_at") or datetime.now(timezone.utc).isoformat()
+        changes = counters.apply(
+            category, bool(answer["is_correct"]), answer.get("time_taken_seconds"), str(answered_at)[:10]
+        )
+        if evaluate:
+            for key, old, new in changes:
+                self._unlock(user_id, counters, self._candidates(key, old, new), answered_at)
+
+    def _counters(self, user_id: str) -> _Counters:
+        counters = self._users.get(user_id)
+        if counters is None:
+            counters = self._users[user_id] = _Counters()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return counters
+
+    def observe_answer(self, answer: Dict[str, Any]):
+        """Assinante do buffer de ingestão de respostas"""
+        with self._lock:
+            counters = self._counters(answer["user_id"])
+            if counters.loaded:
+                self._apply(answer["user_id"], counters, answer)
+            else:
+                counters.pending.append(answer)
+                if answer.get("id"):
+                    counters.pending_ids.add(str(answer["id"]))
+
+    def _load_user(self, user_id: str, counters: _Counters):
+        """Monta os contadores pelo histórico e avalia todas as regras uma vez"""
+        history = list(self.history_loader(user_id)) if self.history_loader is not None else []
+        unlocked = list(self.unlocked_loader(user_id)) if self.unlocked_loader is not None else []
+        history.sort(key=lambda row: row.get("answered_at") or "")
+        with self._lock:
+            counters.unlocked.update(str(row["achievement_id"]) for row in unlocked)
+            for row in history:
+                if str(row.get("id")) not in counters.pending_ids:
+                    self._apply(user_id, counters, row, evaluate=False)
+            for answer in counters.pending:
+                self._apply(user_id, counters, answer, evaluate=False)
+            counters.pending.clear()
+            counters.pending_ids.clear()
+            counters.loaded = True
+            # Inclui conquistas criadas depois que o usuário já cumpria os requisitos
+            self._unlock(user_id, counters, self._rules, datetime.now(timezone.utc).isoformat())
+
+    def flush(self) -> AchievementFlushReport:
+        with self._flush_lock:
+            with self._lock:
+                waiting = [(user_id, c) for user_id, c in self._users.items() if not c.loaded and c.pending]
+            for user_id, counters in waiting:
+                self._load_user(user_id, counters)
+
+            with self._lock:
+                rows, self._unlocks = self._unlocks, []
+            # Sem `writer` os desbloqueios ficam pendentes
+            if rows and self.writer is not None:
+                written: List[Dict[str, Any]] = []
+                rejected: List[Tuple[Dict[str, Any], str]] = []
+                try:
+                    write_isolating_rejections(self.writer, rows, written, rejected, is_rejection)
+                except Exception:
+                    done = {id(row) for row in written} | {id(row) for row, _ in rejected}
+                    with self._lock:
+                        self._unlocks = [row for row in rows if id(row) not in done] + self._unlocks
+                    raise
+                finally:
+                    if rejected:
+                        self.rejected += len(rejected)
+                        print(f"⚠️  {len(rejected)} achievement unlocks rejected by the database: {rejected[0][1]}")
+                rows = written
+            elif rows:
+                with self._lock:
+                    self._unlocks = rows + self._unlocks
+                rows = []
+            return AchievementFlushReport(unlocked=len(rows), users_loaded=len(waiting))
+
+    async def run(self):
+        """Loop de flush periódico (tarefa de fundo da API)"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"⚠️  Achievement flush failed, will retry: {e}")
+
+
+# Instância compartilhada pela API
+achievement_engine = AchievementEngine()
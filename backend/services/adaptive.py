@@ -0,0 +1,258 @@
+"""
+Simulai OAB - Seleção adaptativa de questões (CAT)
+Mantém a habilidade de cada usuário por disciplina (posterior sobre os nós
+de quadratura da TRI, atualizada a cada resposta) e escolhe a questão ainda
+não respondida de maior informação para essa habilidade
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .database import iter_table_rows
+from .irt import QUADRATURE_NODES, QUADRATURE_WEIGHTS, information, probability
+from .question_bank import QuestionBank, question_bank
+from .user_history import HistoryLoader
+
+# Faixas de habilidade: cada faixa guarda as questões ordenadas pela
+# informação no seu centro
+ABILITY_BUCKETS = np.linspace(-3.0, 3.0, 25)
+
+# Parâmetros usados enquanto a questão não foi calibrada pelo job de TRI
+DEFAULT_DISCRIMINATION = 1.0
+LEVEL_DIFFICULTY = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+
+SCAN_BLOCK = 64
+
+# Estados (usuário, disciplina) mantidos em memória
+MAX_STATES = 100_000
+
+@dataclass
+class AbilityEstimate:
+    """Estimativa EAP da habilidade numa disciplina"""
+    theta: float
+    standard_error: float
+    answered: int
+
+
+@dataclass
+class AdaptivePick:
+    """Questão escolhida e a estimativa usada na escolha"""
+    ordinal: int
+    information: float
+    ability: AbilityEstimate
+
+
+class _CategoryPool:
+    """Questões ativas de uma disciplina com os parâmetros (a, b)"""
+
+    def __init__(self, ids: List[str], discrimination: np.ndarray, difficulty: np.ndarray):
+        # Ids, não ordinais: o banco pode ser recarregado antes dos pools
+        self.ids = ids
+        # Por faixa: posições em `ids` por informação decrescente
+        # (um max-heap estático: o topo é o primeiro elemento)
+        info = information(discrimination[None, :], difficulty[None, :], ABILITY_BUCKETS[:, None])
+        self.order = np.argsort(-info, axis=1, kind="stable").astype(np.int32)
+        self.information = np.take_along_axis(info, self.order, axis=1)
+
+
+class _AbilityState:
+    __slots__ = ("log_posterior", "seen", "answered", "loaded", "pending_ids")
+
+    def __init__(self):
+        self.log_posterior = np.log(QUADRATURE_WEIGHTS)
+        # Por id: os ordinais mudam quando o banco de questões é recarregado
+        self.seen: Set[str] = set()
+        self.answered = 0
+        self.loaded = False
+        # Respostas aplicadas antes da carga do histórico (evita contá-las duas vezes)
+        self.pending_ids: Set[str] = set()
+
+    def add(self, question_id: str, a: float, b: float, is_correct: bool):
+        p = probability(a, b, QUADRATURE_NODES)
+        self.log_posterior = self.log_posterior + np.log(p if is_correct else 1.0 - p)
+        self.log_posterior -= self.log_posterior.max()
+        self.seen.add(question_id)
+        self.answered += 1
+
+    def estimate(self) -> AbilityEstimate:
+        posterior = np.exp(self.log_posterior)
+        posterior /= posterior.sum()
+        theta = float(posterior @ QUADRATURE_NODES)
+        variance = float(posterior @ (QUADRATURE_NODES - theta) ** 2)
+        return AbilityEstimate(theta=theta, standard_error=variance ** 0.5, answered=self.answered)
+
+
+class AdaptiveSelector:
+    """
+    Seleção adaptativa por máxima informação
+
+    Cada disciplina tem, para cada faixa de habilidade, as questões já
+    ordenadas pela informação no centro da faixa; escolher a próxima questão
+    é ir à faixa da habilidade estimada e pegar a primeira não respondida
+    (custo proporcional às respondidas que estão no topo, não ao banco).
+    A atualização da habilidade após uma resposta é O(nós de quadratura).
+    """
+
+    def __init__(self, bank: Optional[QuestionBank] = None, history_loader: Optional[HistoryLoader] = None,
+                 max_states: int = MAX_STATES):
+        self.bank = bank or question_bank
+        self.history_loader = history_loader
+        self.max_states = max_states
+        self._discrimination = np.zeros(0)
+        self._difficulty = np.zeros(0)
+        # Posição de cada questão nos arrays de parâmetros (ordinais da carga)
+        self._index: Dict[str, int] = {}
+        self._pools: Dict[str, _CategoryPool] = {}
+        self._states: "OrderedDict[Tuple[str, str], _AbilityState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, history_loader: Optional[HistoryLoader]):
+        self.history_loader = history_loader
+
+    def load(self, parameters: Iterable[Dict[str, Any]]) -> int:
+        """
+        Monta os pools a partir do banco de questões e das linhas de
+        `question_stats` com `irt_discrimination`/`irt_difficulty`
+        """
+        bank = self.bank
+        # difficulty_levels() segue a ordem dos ordinais
+        levels = bank.difficulty_levels()
+        ids = list(levels)
+        index = {question_id: ordinal for ordinal, question_id in enumerate(ids)}
+        discrimination = np.full(len(ids), DEFAULT_DISCRIMINATION)
+        difficulty = np.array([LEVEL_DIFFICULTY[level] for level in levels.values()], dtype=float)
+        calibrated = 0
+        for row in parameters:
+            ordinal = index.get(str(row["question_id"]))
+            if ordinal is None or row.get("irt_difficulty") is None:
+                continue
+            discrimination[ordinal] = row.get("irt_discrimination") or DEFAULT_DISCRIMINATION
+            difficulty[ordinal] = row["irt_difficulty"]
+            calibrated += 1
+
+        pools = {}
+        for category in bank.categories():
+            ordinals = bank.stratum(category)
+            if len(ordinals):
+                pools[category] = _CategoryPool(
+                    [ids[ordinal] for ordinal in ordinals.tolist()], discrimination[ordinals], difficulty[ordinals]
+                )
+        with self._lock:
+            self._discrimination, self._difficulty = discrimination, difficulty
+            self._index = index
+            self._pools = pools
+        return calibrated
+
+    def load_from_supabase(self, client, page_size: int = 1000) -> int:
+        return self.load(iter_table_rows(
+            client, "question_stats", "id,question_id,irt_discrimination,irt_difficulty",
+            page_size=page_size,
+        ))
+
+    def _state(self, user_id: str, category: str) -> _AbilityState:
+        key = (user_id, category)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _AbilityState()
+            while len(self._states) > self.max_states:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        return state
+
+    def _apply(self, state: _AbilityState, question_id: str, is_correct: bool):
+        index = self._index.get(question_id)
+        if index is not None:
+            state.add(question_id, float(self._discrimination[index]), float(self._difficulty[index]), is_correct)
+
+    def _ensure_history(self, user_id: str, category: str):
+        """
+        Reconstrói as habilidades do usuário pelas respostas já gravadas
+
+        Uma leitura do histórico preenche todas as disciplinas do usuário que
+        ainda não tinham sido carregadas.
+        """
+        with self._lock:
+            state = self._state(user_id, category)
+            if state.loaded or self.history_loader is None:
+                state.loaded = True
+                return
+        history = list(self.history_loader(user_id))
+        with self._lock:
+            targets: Dict[str, Optional[_AbilityState]] = {category: self._state(user_id, category)}
+            for row in history:
+                question_id = str(row["question_id"])
+                ordinal = self.bank.ordinal(question_id)
+                row_category = self.bank.category(ordinal) if ordinal is not None else None
+                if row_category is None:
+                    continue
+                if row_category not in targets:
+                    candidate = self._state(user_id, row_category)
+                    targets[row_category] = None if candidate.loaded else candidate
+                target = targets[row_category]
+                if target is None or target.loaded or str(row.get("id")) in target.pending_ids:
+                    continue
+                self._apply(target, question_id, bool(row["is_correct"]))
+            for target in targets.values():
+                if target is not None:
+                    target.pending_ids.clear()
+                    target.loaded = True
+
+    def observe(self, user_id: str, question_id: str, is_correct: bool, answer_id: Optional[str] = None):
+        ordinal = self.bank.ordinal(question_id)
+        if ordinal is None:
+            return
+        category = self.bank.category(ordinal)
+        if category is None:
+            return
+        with self._lock:
+            state = self._state(user_id, category)
+            if not state.loaded and answer_id is not None:
+                state.pending_ids.add(answer_id)
+            self._apply(state, question_id, is_correct)
+
+    def observe_answer(self, answer: Dict[str, Any]):
+        """Assinante do buffer de ingestão de respostas"""
+        self.observe(answer["user_id"], answer["question_id"], answer["is_correct"], answer.get("id"))
+
+    def ability(self, user_id: str, category: str) -> AbilityEstimate:
+        self._ensure_history(user_id, category)
+        with self._lock:
+            return self._state(user_id, category).estimate()
+
+    def next_question(self, user_id: str, category: str) -> Optional[AdaptivePick]:
+        """Questão não respondida de maior informação na habilidade atual, ou None"""
+        if category not in self._pools:
+            return None
+        self._ensure_history(user_id, category)
+        with self._lock:
+            pool = self._pools.get(category)
+            if pool is None:
+                return None
+            state = self._state(user_id, category)
+            estimate = state.estimate()
+            bucket = int(np.abs(ABILITY_BUCKETS - estimate.theta).argmin())
+            order, seen = pool.order[bucket], state.seen
+            # Percorre o topo em blocos: só avança enquanto encontra respondidas
+            for start in range(0, len(order), SCAN_BLOCK):
+                for offset, position in enumerate(order[start:start + SCAN_BLOCK].tolist()):
+                    question_id = pool.ids[position]
+                    if question_id in seen:
+                        continue
+                    # Ordinal no banco atual (a questão pode ter saído numa recarga)
+                    ordinal = self.bank.ordinal(question_id)
+                    if ordinal is not None:
+                        return AdaptivePick(
+                            ordinal=ordinal,
+                            information=float(pool.information[bucket, start + offset]),
+                            ability=estimate,
+                        )
+        return None
+
+
+# Instância compartilhada pela API
+adaptive_selector = AdaptiveSelector()
@@ -0,0 +1,178 @@
+"""
+Simulai OAB - Estatísticas de estudo por período
+Lê os agregados diários de `user_daily_stats` e `user_daily_category_stats`
+(mantidos por gatilho a cada lote de respostas, migração 009), então um
+gráfico de 90 dias lê no máximo 90 linhas por usuário em vez das respostas
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from zoneinfo import ZoneInfo
+
+from .question_bank import QuestionBank, question_bank
+
+# Fuso em que os dias dos agregados são calculados (o mesmo da migração 009)
+ROLLUP_TIMEZONE = ZoneInfo("America/Sao_Paulo")
+
+PERIOD_DAYS = {"7d": 7, "30d": 30, "90d": 90, "1y": 365}
+
+DAILY_TABLE = "user_daily_stats"
+CATEGORY_TABLE = "user_daily_category_stats"
+BUCKET_COLUMNS = {
+    DAILY_TABLE: "day,answered,correct,time_spent_seconds",
+    CATEGORY_TABLE: "day,category,answered,correct,time_spent_seconds",
+}
+BUCKET_ORDER = {DAILY_TABLE: ("day",), CATEGORY_TABLE: ("day", "category")}
+
+# (tabela, usuário, primeiro dia) -> linhas dos agregados a partir desse dia
+BucketLoader = Callable[[str, str, date], Iterable[Dict[str, Any]]]
+
+
+def supabase_bucket_loader(client, page_size: int = 1000) -> BucketLoader:
+    """Agregados de um usuário a partir de um dia (pela chave primária)"""
+    def load(table: str, user_id: str, since: date) -> Iterator[Dict[str, Any]]:
+        offset = 0
+        while True:
+            query = (
+                client.table(table).select(BUCKET_COLUMNS[table])
+                .eq("user_id", user_id).gte("day", since.isoformat())
+            )
+            for column in BUCKET_ORDER[table]:
+                query = query.order(column)
+            rows = query.range(offset, offset + page_size - 1).execute().data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            offset += page_size
+    return load
+
+
+def accuracy(correct: int, answered: int) -> int:
+    """Percentual de acertos arredondado (0 sem respostas)"""
+    return round(correct * 100 / answered) if answered else 0
+
+
+@dataclass
+class Bucket:
+    """Respostas, acertos e tempo somados de um dia ou de uma disciplina"""
+    key: str
+    answered: int = 0
+    correct: int = 0
+    time_spent_seconds: int = 0
+
+    @property
+    def accuracy(self) -> int:
+        return accuracy(self.correct, self.answered)
+
+    def add(self, row: Dict[str, Any]):
+        self.answered += row.get("answered") or 0
+        self.correct += row.get("correct") or 0
+        self.time_spent_seconds += row.get("time_spent_seconds") or 0
+
+
+@dataclass
+class AnalyticsOverview:
+    """Totais do período, desempenho por disciplina e série diária"""
+    total_questions: int
+    totals: Bucket
+    categories: List[Bucket]
+    activity: List[Bucket]
+
+
+def period_start(period: str, today: date) -> date:
+    """Primeiro dia do período (inclui hoje); ValueError para período desconhecido"""
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Período inválido: {period}")
+    return today - timedelta(days=PERIOD_DAYS[period] - 1)
+
+
+def by_category(rows: Iterable[Dict[str, Any]]) -> List[Bucket]:
+    """Soma as linhas por disciplina, das mais respondidas para as menos"""
+    buckets: Dict[str, Bucket] = {}
+    for row in rows:
+        category = row.get("category") or ""
+        buckets.setdefault(category, Bucket(category)).add(row)
+    return sorted(buckets.values(), key=lambda b: (-b.answered, b.key))
+
+
+def daily_series(rows: Iterable[Dict[str, Any]], start: date, end: date) -> List[Bucket]:
+    """Um item por dia de `start` a `end`, com zero nos dias sem respostas"""
+    buckets = [Bucket((start + timedelta(days=offset)).isoformat())
+               for offset in range((end - start).days + 1)]
+    for row in rows:
+        offset = (date.fromisoformat(str(row["day"])) - start).days
+        if 0 <= offset < len(buckets):
+            buckets[offset].add(row)
+    return buckets
+
+
+class AnalyticsService:
+    """
+    Consultas de estatísticas servidas pelos agregados diários
+
+    Os agregados são atualizados no banco, pelo mesmo INSERT em lote que
+    grava as respostas, e reconstruídos por `backfill_daily_rollups`
+    (scripts/backfill_daily_rollups.py). Respostas ainda no buffer de
+    ingestão entram no próximo flush.
+    """
+
+    def __init__(self, loader: Optional[BucketLoader] = None, bank: Optional[QuestionBank] = None):
+        self.loader = loader
+        self.bank = bank or question_bank
+
+    def configure(self, loader: Optional[BucketLoader]):
+        self.loader = loader
+
+    @staticmethod
+    def today() -> date:
+        return datetime.now(ROLLUP_TIMEZONE).date()
+
+    def _rows(self, table: str, user_id: str, since: date) -> List[Dict[str, Any]]:
+        # Sem `loader` (API sem banco) não há agregados
+        return list(self.loader(table, user_id, since)) if self.loader is not None else []
+
+    def performance(self, user_id: str, period: str = "30d", today: Optional[date] = None) -> List[Bucket]:
+        """Respostas e acertos por disciplina no período"""
+        since = period_start(period, today or self.today())
+        return by_category(self._rows(CATEGORY_TABLE, user_id, since))
+
+    def activity(self, user_id: str, period: str = "30d", category: Optional[str] = None,
+                 today: Optional[date] = None) -> List[Bucket]:
+        """Série diária do período (todos os dias, inclusive os sem respostas)"""
+        today = today or self.today()
+        since = period_start(period, today)
+        if category is None:
+            rows = self._rows(DAILY_TABLE, user_id, since)
+        else:
+            rows = [row for row in self._rows(CATEGORY_TABLE, user_id, since) if row.get("category") == category]
+        return daily_series(rows, since, today)
+
+    def overview(self, user_id: str, period: str = "30d", category: Optional[str] = None,
+                 today: Optional[date] = None) -> AnalyticsOverview:
+        """Totais, disciplinas e série diária a partir de uma leitura por tabela"""
+        today = today or self.today()
+        since = period_start(period, today)
+        category_rows = self._rows(CATEGORY_TABLE, user_id, since)
+        if category is None:
+            daily_rows = self._rows(DAILY_TABLE, user_id, since)
+        else:
+            category_rows = [row for row in category_rows if row.get("category") == category]
+            daily_rows = category_rows
+        activity = daily_series(daily_rows, since, today)
+        totals = Bucket(
+            period,
+            answered=sum(day.answered for day in activity),
+            correct=sum(day.correct for day in activity),
+            time_spent_seconds=sum(day.time_spent_seconds for day in activity),
+        )
+        return AnalyticsOverview(
+            total_questions=len(self.bank.filter(category=category)),
+            totals=totals,
+            categories=by_category(category_rows),
+            activity=activity,
+        )
+
+
+# Instância compartilhada pela API
+analytics_service = AnalyticsService()
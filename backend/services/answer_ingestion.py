@@ -0,0 +1,395 @@
+"""
+Simulai OAB - Ingestão de respostas com write-behind
+Respostas avulsas são agrupadas por usuário em memória e gravadas em lote
+(RPC `ingest_answers`): um INSERT multi-linha em `user_question_history` e um
+único upsert de `user_stats` por usuário por flush. Um journal local guarda
+o que ainda não foi gravado
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .database import is_rejection, write_isolating_rejections
+
+ANSWER_FIELDS = (
+    "id", "user_id", "question_id", "simulation_id", "selected_answer", "is_correct",
+    "time_taken_seconds", "confidence_level", "answered_at",
+)
+
+AnswerWriter = Callable[[List[Dict[str, Any]]], Any]
+
+# Group commit do journal: um fsync por intervalo para todas as respostas dele
+SYNC_INTERVAL_SECONDS = 0.1
+
+def supabase_answer_writer(client) -> AnswerWriter:
+    """Grava um lote pela RPC da migração 004 (idempotente pelo id da resposta)"""
+    def write(answers: List[Dict[str, Any]]):
+        client.rpc("ingest_answers", {"answers": answers}).execute()
+    return write
+
+
+class AnswerJournal:
+    """
+    Journal append-only das respostas ainda não gravadas no banco
+
+    As respostas vão para `active.jsonl` (uma linha JSON por resposta, com
+    flush para o sistema operacional a cada escrita). Com `sync=True` o
+    fsync é feito em grupo: `commit` (chamado pelo loop do buffer a cada
+    `sync_interval` segundos, numa thread) sincroniza de uma vez tudo o que
+    foi escrito desde o anterior, então o custo em disco cresce com o
+    intervalo e não com as respostas; uma queda do sistema perde no máximo
+    o último intervalo. Cada flush do buffer fecha o arquivo ativo como um
+    segmento, que só é apagado depois que o lote correspondente foi gravado.
+    Respostas recusadas pelo banco vão para `rejected.jsonl`, que não é
+    reprocessado.
+    """
+
+    ACTIVE = "active.jsonl"
+    REJECTED = "rejected.jsonl"
+
+    def __init__(self, directory: Path, sync: bool = False, sync_interval: float = SYNC_INTERVAL_SECONDS):
+        self.directory = Path(directory)
+        self.sync = sync
+        self.sync_interval = sync_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self._sequence = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.syncs = 0
+
+    @property
+    def active_path(self) -> Path:
+        return self.directory / self.ACTIVE
+
+    @property
+    def dirty(self) -> bool:
+        """Há respostas escritas ainda sem fsync"""
+        return self._dirty
+
+    def append(self, answer: Dict[str, Any]):
+        line = json.dumps(answer, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.active_path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            self._dirty = self.sync
+
+    def commit(self) -> bool:
+        """Faz fsync do que foi escrito desde o último commit; False se não havia nada"""
+        with self._lock:
+            if not self._dirty or self._file is None:
+                return False
+            # Uma cópia do descritor: o fsync roda fora do lock, sem atrasar `append`
+            fd = os.dup(self._file.fileno())
+            self._dirty = False
+        try:
+            os.fsync(fd)
+        except OSError:
+            self._dirty = True
+            raise
+        finally:
+            os.close(fd)
+        self.syncs += 1
+        return True
+
+    def rotate(self) -> Optional[Path]:
+        """Fecha o arquivo ativo como segmento; None se estava vazio"""
+        with self._lock:
+            if self._file is not None:
+                if self._dirty:
+                    os.fsync(self._file.fileno())
+                    self._dirty = False
+                    self.syncs += 1
+                self._file.close()
+                self._file = None
+            if not self.active_path.exists() or self.active_path.stat().st_size == 0:
+                return None
+            self._sequence += 1
+            segment = self.directory / f"segment-{time.time_ns()}-{self._sequence}.jsonl"
+            os.replace(self.active_path, segment)
+            return segment
+
+    def discard(self, segment: Path):
+        segment.unlink(missing_ok=True)
+
+    def reject(self, answers: List[Tuple[Dict[str, Any], str]]):
+        """Guarda respostas recusadas (com o motivo) fora dos segmentos pendentes"""
+        with open(self.directory / self.REJECTED, "a", encoding="utf-8") as f:
+            for answer, reason in answers:
+                f.write(json.dumps({"answer": answer, "error": reason}, ensure_ascii=False) + "\n")
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+
+    def recover(self) -> Tuple[List[Dict[str, Any]], List[Path]]:
+        """Respostas de segmentos pendentes e do arquivo ativo de uma execução anterior"""
+        self.rotate()
+        segments = sorted(self.directory.glob("segment-*.jsonl"))
+        answers: Dict[str, Dict[str, Any]] = {}
+        for segment in segments:
+            with open(segment, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        answer = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # última linha truncada por uma queda
+                    answers[answer["id"]] = answer
+        return list(answers.values()), segments
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                if self._dirty:
+                    os.fsync(self._file.fileno())
+                    self._dirty = False
+                self._file.close()
+                self._file = None
+
+
+@dataclass
+class FlushReport:
+    answers: int = 0
+    users: int = 0
+    batches: int = 0
+    rejected: int = 0
+
+
+class AnswerIngestionBuffer:
+    """
+    Buffer write-behind de respostas, agrupado por usuário
+
+    `record` só escreve no journal e na memória; `flush` (chamado pelo loop
+    `run` a cada `flush_interval` segundos, ou antes quando há
+    `max_buffered` respostas pendentes) envia lotes de até `batch_rows`
+    respostas sem separar as de um mesmo usuário entre lotes sempre que
+    possível. Se o envio falha por indisponibilidade, as respostas ainda não
+    gravadas voltam para o buffer e os segmentos do journal são mantidos;
+    como cada resposta tem um id gerado aqui, reenviar um lote já gravado
+    não duplica nada. Se o banco recusa os dados (`is_rejection`), o lote é
+    dividido ao meio até isolar as linhas recusadas, que vão para o arquivo
+    de rejeitadas do journal em vez de bloquear as demais.
+
+    Há dois tipos de assinante: os comuns recebem cada resposta ao ser
+    registrada (e as recuperadas do journal), para leituras imediatas do
+    próprio usuário; os de `persisted=True` só recebem respostas já gravadas
+    no banco, para agregados que não podem contar o que foi recusado.
+    """
+
+    def __init__(
+        self,
+        writer: Optional[AnswerWriter] = None,
+        journal: Optional[AnswerJournal] = None,
+        flush_interval: float = 2.0,
+        max_buffered: int = 1000,
+        batch_rows: int = 500,
+        rejects: Callable[[Exception], bool] = is_rejection,
+    ):
+        self.writer = writer
+        self.rejects = rejects
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.batch_rows = batch_rows
+        self._by_user: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending = 0
+        self._segments: List[Path] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._persisted_subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self.flushes = 0
+        self.answers_flushed = 0
+        self.answers_rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def configure(self, writer: Optional[AnswerWriter], journal: Optional[AnswerJournal] = None):
+        self.writer = writer
+        self.journal = journal
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None], persisted: bool = False):
+        """
+        Registra um consumidor chamado com cada resposta recebida, ou com
+        cada resposta gravada se `persisted` (ex.: estatísticas por questão)
+        """
+        subscribers = self._persisted_subscribers if persisted else self._subscribers
+        if callback not in subscribers:
+            subscribers.append(callback)
+
+    @staticmethod
+    def _notify(subscribers: List[Callable[[Dict[str, Any]], None]], answers: List[Dict[str, Any]]):
+        for answer in answers:
+            for callback in subscribers:
+                callback(answer)
+
+    def record(
+        self,
+        user_id: str,
+        question_id: str,
+        selected_answer: str,
+        is_correct: bool,
+        time_taken_seconds: Optional[int] = None,
+        confidence_level: Optional[int] = None,
+        simulation_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Enfileira uma resposta; a gravação no banco acontece no próximo flush"""
+        answer = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "question_id": question_id,
+            "simulation_id": simulation_id,
+            "selected_answer": selected_answer,
+            "is_correct": bool(is_correct),
+            "time_taken_seconds": time_taken_seconds,
+            "confidence_level": confidence_level,
+            "answered_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            if self.journal is not None:
+                self.journal.append(answer)
+            self._by_user.setdefault(user_id, []).append(answer)
+            self._pending += 1
+            full = self._pending >= self.max_buffered
+        if full and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        self._notify(self._subscribers, [answer])
+        return answer
+
+    def recover(self) -> int:
+        """Recarrega do journal as respostas não gravadas de uma execução anterior"""
+        if self.journal is None:
+            return 0
+        with self._lock:
+            answers, segments = self.journal.recover()
+            known = {a["id"] for user_answers in self._by_user.values() for a in user_answers}
+            recovered = [a for a in answers if a["id"] not in known]
+            for answer in recovered:
+                self._by_user.setdefault(answer["user_id"], []).append(answer)
+                self._pending += 1
+            self._segments.extend(s for s in segments if s not in self._segments)
+        # A execução anterior caiu antes de gravá-las: os caches em memória
+        # desta execução ainda não as viram
+        self._notify(self._subscribers, recovered)
+        return len(answers)
+
+    def _batches(self, by_user: Dict[str, List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        batches: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        for answers in by_user.values():
+            if current and len(current) + len(answers) > self.batch_rows:
+                batches.append(current)
+                current = []
+            current.extend(answers)
+            while len(current) >= self.batch_rows:
+                batches.append(current[: self.batch_rows])
+                current = current[self.batch_rows:]
+        if current:
+            batches.append(current)
+        return batches
+
+    def _reject(self, rejected: List[Tuple[Dict[str, Any], str]]):
+        if not rejected:
+            return
+        if self.journal is not None:
+            self.journal.reject(rejected)
+        self.answers_rejected += len(rejected)
+        print(f"⚠️  {len(rejected)} answers rejected by the database: {rejected[0][1]}")
+
+    def flush(self) -> FlushReport:
+        """Grava tudo o que está pendente; sem `writer` as respostas ficam no buffer"""
+        if self.writer is None:
+            return FlushReport()
+        with self._flush_lock:
+            if self.journal is not None:
+                # Sincroniza antes de pegar o lock: `rotate` só fica com o resto
+                self.journal.commit()
+            with self._lock:
+                if not self._by_user:
+                    return FlushReport()
+                by_user, self._by_user = self._by_user, {}
+                self._pending = 0
+                if self.journal is not None:
+                    segment = self.journal.rotate()
+                    if segment is not None:
+                        self._segments.append(segment)
+                segments = list(self._segments)
+
+            batches = self._batches(by_user)
+            written: List[Dict[str, Any]] = []
+            rejected: List[Tuple[Dict[str, Any], str]] = []
+            try:
+                for batch in batches:
+                    write_isolating_rejections(self.writer, batch, written, rejected, self.rejects)
+            except Exception:
+                done = {a["id"] for a in written} | {a["id"] for a, _ in rejected}
+                with self._lock:
+                    for user_id, answers in by_user.items():
+                        retry = [a for a in answers if a["id"] not in done]
+                        if retry:
+                            self._by_user[user_id] = retry + self._by_user.get(user_id, [])
+                            self._pending += len(retry)
+                self._reject(rejected)
+                self._notify(self._persisted_subscribers, written)
+                raise
+
+            self._reject(rejected)
+            self._notify(self._persisted_subscribers, written)
+            with self._lock:
+                if self.journal is not None:
+                    for segment in segments:
+                        self.journal.discard(segment)
+                        self._segments.remove(segment)
+                self.flushes += 1
+                self.answers_flushed += len(written)
+            return FlushReport(
+                answers=len(written), users=len(by_user), batches=len(batches), rejected=len(rejected)
+            )
+
+    async def _commit_journal(self):
+        """Group commit do journal a cada `sync_interval`, fora do event loop"""
+        while True:
+            journal = self.journal
+            await asyncio.sleep(journal.sync_interval if journal is not None else self.flush_interval)
+            if journal is not None and journal.dirty:
+                try:
+                    await asyncio.to_thread(journal.commit)
+                except OSError as e:
+                    print(f"⚠️  Answer journal sync failed, will retry: {e}")
+
+    async def run(self):
+        """Loop de flush periódico (tarefa de fundo da API)"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        committer = asyncio.create_task(self._commit_journal())
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    print(f"⚠️  Answer flush failed, will retry: {e}")
+        finally:
+            committer.cancel()
+            self._wake = None
+
+
+# Instância compartilhada pela API
+answer_buffer = AnswerIngestionBuffer()
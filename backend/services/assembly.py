@@ -0,0 +1,229 @@
+"""
+Simulai OAB - Montagem estratificada de simulados
+Preenche cotas por disciplina e dificuldade sorteando diretamente das listas
+pré-computadas do banco de questões, sem ORDER BY random() no banco
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Collection, Dict, Hashable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .question_bank import DIFFICULTY_LEVELS, QuestionBank, question_bank
+from .single_flight import SingleFlight, SingleFlightTimeout
+from .user_history import Bitset
+
+# Distribuição de referência da 1ª fase da OAB (80 questões)
+OAB_PRIMEIRA_FASE = {
+    "Ética Profissional": 8,
+    "Filosofia do Direito": 2,
+    "Direito Constitucional": 6,
+    "Direitos Humanos": 3,
+    "Direito Internacional": 2,
+    "Direito Tributário": 5,
+    "Direito Administrativo": 6,
+    "Direito Ambiental": 2,
+    "Direito Civil": 7,
+    "Estatuto da Criança e do Adolescente": 2,
+    "Direito do Consumidor": 2,
+    "Direito Empresarial": 5,
+    "Direito Processual Civil": 6,
+    "Direito Penal": 6,
+    "Direito Processual Penal": 6,
+    "Direito do Trabalho": 6,
+    "Direito Processual do Trabalho": 6,
+}
+
+# Mistura de dificuldades (easy, medium, hard) por nível de simulado
+DIFFICULTY_MIX = {
+    "Fácil": (0.6, 0.3, 0.1),
+    "Média": (0.25, 0.5, 0.25),
+    "Difícil": (0.1, 0.3, 0.6),
+}
+
+ALL_DISCIPLINES = "Todas as disciplinas"
+
+# Quanto uma montagem repetida espera a montagem em andamento antes de montar sozinha
+ASSEMBLY_TIMEOUT_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class Quota:
+    """Quantidade de questões de uma disciplina (e opcionalmente dificuldade)"""
+    category: str
+    count: int
+    difficulty: Optional[str] = None
+
+
+@dataclass
+class AssembledSimulado:
+    """Questões sorteadas e cotas que não puderam ser preenchidas"""
+    question_ids: List[str]
+    shortfall: Dict[str, int] = field(default_factory=dict)
+
+
+def apportion(total: int, weights: Sequence[float]) -> List[int]:
+    """Divide `total` proporcionalmente aos pesos (método do maior resto)"""
+    weight_sum = float(sum(weights))
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+    exact = [total * w / weight_sum for w in weights]
+    counts = [int(x) for x in exact]
+    remainders = sorted(range(len(weights)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in remainders[: total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def build_quotas(questoes: int, disciplinas: Sequence[str], dificuldade: str) -> List[Quota]:
+    """
+    Converte os campos de `SimuladoCreate` em cotas
+
+    "Todas as disciplinas" usa a distribuição oficial escalada para `questoes`;
+    uma lista de disciplinas recebe partes iguais. Dificuldades fora de
+    DIFFICULTY_MIX (ex.: "Oficial") não restringem a dificuldade.
+    """
+    if not disciplinas or ALL_DISCIPLINES in disciplinas:
+        names = list(OAB_PRIMEIRA_FASE)
+        counts = apportion(questoes, list(OAB_PRIMEIRA_FASE.values()))
+    else:
+        names = list(dict.fromkeys(disciplinas))
+        counts = apportion(questoes, [1] * len(names))
+
+    mix = DIFFICULTY_MIX.get(dificuldade)
+    quotas = []
+    for name, count in zip(names, counts):
+        if count == 0:
+            continue
+        if mix is None:
+            quotas.append(Quota(name, count))
+            continue
+        for level, level_count in zip(DIFFICULTY_LEVELS, apportion(count, mix)):
+            if level_count:
+                quotas.append(Quota(name, level_count, level))
+    return quotas
+
+
+def _sample(pool: np.ndarray, k: int, excluded: Union[Collection[int], Bitset], taken: set,
+            rng: np.random.Generator) -> List[int]:
+    """
+    Sorteia até `k` ordinais de `pool` fora de `excluded` e `taken`
+
+    Usa amostragem por rejeição (O(k) esperado enquanto a fração excluída é
+    pequena); se as rejeições se acumulam, cai para um filtro vetorizado.
+    """
+    n = len(pool)
+    if k <= 0 or n == 0:
+        return []
+
+    chosen: List[int] = []
+    attempts = 0
+    max_attempts = 4 * k + 16
+    while len(chosen) < k and attempts < max_attempts:
+        batch = pool[rng.integers(0, n, size=2 * (k - len(chosen)))]
+        for ordinal in batch.tolist():
+            attempts += 1
+            if ordinal in taken or ordinal in excluded:
+                continue
+            taken.add(ordinal)
+            chosen.append(ordinal)
+            if len(chosen) == k:
+                return chosen
+
+    blocked = np.isin(pool, np.fromiter(taken, dtype=np.int64, count=len(taken)))
+    if isinstance(excluded, Bitset):
+        blocked |= excluded.contains(pool)
+    elif excluded:
+        blocked |= np.isin(pool, np.fromiter(excluded, dtype=np.int64, count=len(excluded)))
+    available = pool[~blocked]
+    if len(available) == 0:
+        return chosen
+    picked = rng.choice(available, size=min(k - len(chosen), len(available)), replace=False)
+    for ordinal in picked.tolist():
+        taken.add(ordinal)
+        chosen.append(ordinal)
+    return chosen
+
+
+class SimuladoAssembler:
+    """Monta simulados a partir dos estratos do banco de questões"""
+
+    def __init__(self, bank: QuestionBank = question_bank):
+        self.bank = bank
+        self.flights = SingleFlight()
+
+    def assemble(
+        self,
+        quotas: Sequence[Quota],
+        exclude: Union[Collection[str], Bitset] = (),
+        seed: Optional[int] = None,
+    ) -> AssembledSimulado:
+        """
+        Sorteia as questões de cada cota, excluindo as já vistas pelo usuário
+
+        `exclude` são ids de questões ou, sem conversão, o bitset de ordinais
+        respondidos de `user_history`.
+
+        Uma cota com dificuldade que não pode ser preenchida completa-se com
+        outras dificuldades da mesma disciplina; o que ainda faltar é
+        reportado em `shortfall`.
+        """
+        rng = np.random.default_rng(seed)
+        if isinstance(exclude, Bitset):
+            excluded = exclude
+        else:
+            excluded = {
+                ordinal for ordinal in (self.bank.ordinal(qid) for qid in exclude)
+                if ordinal is not None
+            }
+        taken: set = set()
+        ordinals: List[int] = []
+        shortfall: Dict[str, int] = {}
+
+        for quota in quotas:
+            picked = _sample(
+                self.bank.stratum(quota.category, quota.difficulty), quota.count, excluded, taken, rng
+            )
+            missing = quota.count - len(picked)
+            if missing and quota.difficulty is not None:
+                picked += _sample(self.bank.stratum(quota.category), missing, excluded, taken, rng)
+                missing = quota.count - len(picked)
+            if missing:
+                shortfall[quota.category] = shortfall.get(quota.category, 0) + missing
+            ordinals.extend(picked)
+
+        return AssembledSimulado(
+            question_ids=[self.bank.question_id(o) for o in ordinals],
+            shortfall=shortfall,
+        )
+
+    async def assemble_coalesced(
+        self,
+        key: Optional[Hashable],
+        quotas: Sequence[Quota],
+        exclude: Union[Collection[str], Bitset] = (),
+        timeout: Optional[float] = ASSEMBLY_TIMEOUT_SECONDS,
+    ) -> AssembledSimulado:
+        """
+        `assemble` numa thread, com chamadas concorrentes de mesma `key` coalescidas
+
+        Requisições repetidas (ex.: o mesmo usuário enviando o formulário
+        várias vezes) recebem o mesmo simulado em vez de montar um cada.
+        Quem encontra uma montagem em andamento e espera mais que `timeout`
+        monta o seu; a primeira chamada espera a própria montagem até o fim.
+        Com `key` None (pedido sem dono, ex.: anônimo) não há coalescência:
+        pedidos iguais de pessoas diferentes recebem sorteios independentes.
+        """
+        def run():
+            return asyncio.to_thread(self.assemble, quotas, exclude)
+        if key is None:
+            return await run()
+        try:
+            return await self.flights.do(key, run, timeout)
+        except SingleFlightTimeout:
+            return await run()
+
+
+# Instância compartilhada sobre o banco de questões da API
+simulado_assembler = SimuladoAssembler()
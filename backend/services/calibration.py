@@ -0,0 +1,85 @@
+"""
+Simulai OAB - Recarga periódica da calibração TRI
+O job noturno (calibrate_irt.py) grava os parâmetros em `question_stats` e o
+nível em `questions`; esta tarefa relê os parâmetros e os aplica ao banco de
+questões, ao agregador de estatísticas e ao seletor adaptativo sem reiniciar
+a API
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .adaptive import AdaptiveSelector, adaptive_selector
+from .database import iter_table_rows
+from .irt import difficulty_level
+from .question_bank import QuestionBank, question_bank
+from .question_stats import QuestionStatsAggregator, question_stats_aggregator
+
+# O job roda uma vez por noite; uma hora basta para a API alcançá-lo
+REFRESH_INTERVAL_SECONDS = 3600.0
+
+CalibrationLoader = Callable[[], Iterable[Dict[str, Any]]]
+
+
+def supabase_calibration_loader(client, page_size: int = 1000) -> CalibrationLoader:
+    """Linhas de `question_stats` com os parâmetros TRI"""
+    def load() -> Iterable[Dict[str, Any]]:
+        return iter_table_rows(
+            client, "question_stats", "id,question_id,irt_discrimination,irt_difficulty",
+            page_size=page_size,
+        )
+    return load
+
+
+class CalibrationRefresher:
+    """
+    Mantém os serviços em memória alinhados aos parâmetros calibrados
+
+    Uma leitura de `question_stats` alimenta os três consumidores: o nível
+    das questões calibradas vai para o banco de questões (mesma regra do
+    job), o agregador passa a não reclassificá-las e o seletor adaptativo
+    refaz os pools com os novos (a, b).
+    """
+
+    def __init__(self, bank: Optional[QuestionBank] = None,
+                 aggregator: Optional[QuestionStatsAggregator] = None,
+                 selector: Optional[AdaptiveSelector] = None,
+                 loader: Optional[CalibrationLoader] = None,
+                 interval: float = REFRESH_INTERVAL_SECONDS):
+        self.bank = bank or question_bank
+        self.aggregator = aggregator or question_stats_aggregator
+        self.selector = selector or adaptive_selector
+        self.loader = loader
+        self.interval = interval
+
+    def configure(self, loader: Optional[CalibrationLoader]):
+        self.loader = loader
+
+    def refresh(self) -> int:
+        """Aplica a calibração atual; devolve quantas questões estão calibradas"""
+        if self.loader is None:
+            return 0
+        rows: List[Dict[str, Any]] = list(self.loader())
+        levels = {
+            str(row["question_id"]): difficulty_level(row["irt_difficulty"])
+            for row in rows
+            if row.get("irt_difficulty") is not None
+        }
+        self.bank.set_difficulty_levels(levels)
+        self.aggregator.set_calibrated(levels)
+        # Os pools usam o nível do banco para as questões ainda sem calibração
+        self.selector.load(rows)
+        return len(levels)
+
+    async def run(self):
+        """Loop de recarga periódica (tarefa de fundo da API)"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"⚠️  IRT calibration refresh failed, will retry: {e}")
+
+
+# Instância compartilhada pela API
+calibration_refresher = CalibrationRefresher()
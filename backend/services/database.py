@@ -0,0 +1,101 @@
+"""
+Simulai OAB - Acesso ao banco de dados
+Cliente Supabase compartilhado pelos serviços em memória
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Classes SQLSTATE de erros causados pelos dados (22: valor inválido, ex.:
+# UUID malformado; 23: restrição violada, ex.: FK de usuário inexistente).
+# Reenviar a mesma linha falharia sempre; os demais erros são transitórios.
+REJECTION_SQLSTATE_CLASSES = ("22", "23")
+
+
+@lru_cache(maxsize=1)
+def get_supabase_client():
+    """
+    Retorna o cliente Supabase configurado pelo ambiente
+
+    Retorna None quando SUPABASE_URL/SUPABASE_SERVICE_KEY não estão definidas,
+    permitindo que a API suba em modo de desenvolvimento sem banco.
+    """
+    url = os.getenv("SUPABASE_URL")
+    service_key = os.getenv("SUPABASE_SERVICE_KEY")
+    if not url or not service_key:
+        return None
+
+    from supabase import create_client
+
+    return create_client(url, service_key)
+
+
+def iter_table_rows(
+    client,
+    table: str,
+    columns: str,
+    key: str = "id",
+    page_size: int = 1000,
+    filters: Optional[Dict[str, Any]] = None,
+    greater_than: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre uma tabela inteira com paginação por chave (keyset)
+
+    Cada página é `key > último_valor ORDER BY key LIMIT page_size`, então o
+    custo por página é constante e o limite de linhas do PostgREST não trunca
+    o resultado. `filters` aplica igualdades e `greater_than` limites inferiores
+    exclusivos (ex.: marca d'água de `updated_at`).
+    """
+    last_key = None
+    while True:
+        query = client.table(table).select(columns).order(key).limit(page_size)
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        for column, value in (greater_than or {}).items():
+            query = query.gt(column, value)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+
+        rows: List[Dict[str, Any]] = query.execute().data or []
+        yield from rows
+
+        if len(rows) < page_size:
+            return
+        last_key = rows[-1][key]
+
+
+def is_rejection(error: Exception) -> bool:
+    """True se o banco recusou os dados do lote (e não uma falha de conexão)"""
+    code = getattr(error, "code", None)
+    return isinstance(code, str) and code[:2] in REJECTION_SQLSTATE_CLASSES
+
+
+def write_isolating_rejections(
+    writer: Callable[[List[Dict[str, Any]]], Any],
+    rows: List[Dict[str, Any]],
+    written: List[Dict[str, Any]],
+    rejected: List[Tuple[Dict[str, Any], str]],
+    rejects: Callable[[Exception], bool] = is_rejection,
+):
+    """
+    Grava um lote isolando as linhas que o banco recusa
+
+    Se o banco recusa os dados (`rejects`), o lote é dividido ao meio até
+    chegar às linhas recusadas, que vão para `rejected` com o motivo; as
+    demais vão para `written`. Outros erros (transitórios) são propagados.
+    """
+    try:
+        writer(rows)
+    except Exception as e:
+        if not rejects(e):
+            raise
+        if len(rows) == 1:
+            rejected.append((rows[0], str(e)))
+            return
+        middle = len(rows) // 2
+        write_isolating_rejections(writer, rows[:middle], written, rejected, rejects)
+        write_isolating_rejections(writer, rows[middle:], written, rejected, rejects)
+        return
+    written.extend(rows)
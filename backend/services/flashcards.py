@@ -0,0 +1,287 @@
+"""
+Simulai OAB - Repetição espaçada de flashcards (SM-2)
+Calcula o próximo intervalo de cada cartão em O(1) e mantém, por usuário,
+uma fila ordenada por `next_review_at` e a contagem de cartões por dia,
+para que "o que vence agora" não precise de varredura no banco
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .database import iter_table_rows
+
+# Parâmetros do SM-2
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+FIRST_INTERVAL_DAYS = 1.0
+SECOND_INTERVAL_DAYS = 6.0
+# Notas 0-5; abaixo de PASSING_GRADE o cartão volta ao início
+PASSING_GRADE = 3
+
+# Usuários com fila em memória
+MAX_DECKS = 10_000
+# Cartões criados ou removidos fora da API (ex.: pelo app, direto no
+# Supabase) aparecem na fila depois de no máximo este tempo
+DECK_TTL_SECONDS = 300.0
+
+FLASHCARD_COLUMNS = "id,category,review_count,next_review_at,ease_factor,interval_days,repetitions,lapses"
+
+SECONDS_PER_DAY = 86_400
+
+DeckLoader = Callable[[str], Iterable[Dict[str, Any]]]
+ReviewWriter = Callable[[str, Dict[str, Any]], Any]
+
+
+def supabase_deck_loader(client, page_size: int = 1000) -> DeckLoader:
+    """Cartões ativos de um usuário (uma leitura quando a fila não está em memória)"""
+    def load(user_id: str) -> Iterable[Dict[str, Any]]:
+        return iter_table_rows(
+            client, "flashcards", FLASHCARD_COLUMNS, page_size=page_size,
+            filters={"user_id": user_id, "is_active": True},
+        )
+    return load
+
+
+def supabase_review_writer(client) -> ReviewWriter:
+    """Grava o novo estado de um cartão revisado"""
+    def write(card_id: str, fields: Dict[str, Any]):
+        client.table("flashcards").update(fields).eq("id", card_id).execute()
+    return write
+
+
+@dataclass
+class CardSchedule:
+    """Estado de agendamento de um cartão"""
+    card_id: str
+    due_at: float  # epoch em segundos; 0 para cartões nunca agendados
+    ease_factor: float = INITIAL_EASE
+    interval_days: float = 0.0
+    repetitions: int = 0
+    lapses: int = 0
+    review_count: int = 0
+    category: Optional[str] = None
+
+    @property
+    def next_review_at(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.due_at, timezone.utc) if self.due_at else None
+
+
+def sm2(card: CardSchedule, grade: int, reviewed_at: float) -> CardSchedule:
+    """Novo estado após uma revisão com nota `grade` (0-5)"""
+    grade = min(max(int(grade), 0), 5)
+    ease = max(MIN_EASE, card.ease_factor + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    if grade < PASSING_GRADE:
+        repetitions, interval, lapses = 0, FIRST_INTERVAL_DAYS, card.lapses + 1
+    else:
+        repetitions, lapses = card.repetitions + 1, card.lapses
+        if repetitions == 1:
+            interval = FIRST_INTERVAL_DAYS
+        elif repetitions == 2:
+            interval = SECOND_INTERVAL_DAYS
+        else:
+            interval = round(card.interval_days * ease)
+    return CardSchedule(
+        card_id=card.card_id,
+        due_at=reviewed_at + interval * SECONDS_PER_DAY,
+        ease_factor=ease,
+        interval_days=interval,
+        repetitions=repetitions,
+        lapses=lapses,
+        review_count=card.review_count + 1,
+        category=card.category,
+    )
+
+
+def _day(timestamp: float) -> int:
+    """Dia (UTC) do vencimento; cartões sem data contam como vencidos hoje"""
+    return int(timestamp // SECONDS_PER_DAY)
+
+
+def _timestamp(value) -> float:
+    if not value:
+        return 0.0
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+class _Deck:
+    """Fila de um usuário ordenada por vencimento, com contagem por dia"""
+
+    __slots__ = ("cards", "queue", "daily", "loaded_at")
+
+    def __init__(self, loaded_at: float = 0.0):
+        self.loaded_at = loaded_at
+        self.cards: Dict[str, CardSchedule] = {}
+        self.queue: List[Tuple[float, str]] = []
+        self.daily: Dict[int, int] = {}
+
+    def put(self, card: CardSchedule):
+        old = self.cards.get(card.card_id)
+        if old is not None:
+            index = bisect_left(self.queue, (old.due_at, old.card_id))
+            del self.queue[index]
+            day = _day(old.due_at)
+            self.daily[day] -= 1
+            if not self.daily[day]:
+                del self.daily[day]
+        self.cards[card.card_id] = card
+        insort(self.queue, (card.due_at, card.card_id))
+        day = _day(card.due_at)
+        self.daily[day] = self.daily.get(day, 0) + 1
+
+    def due_count(self, until: float, inclusive: bool = True) -> int:
+        """Cartões com vencimento até `until` (busca binária na fila)"""
+        search = bisect_right if inclusive else bisect_left
+        return search(self.queue, until, key=lambda entry: entry[0])
+
+
+@dataclass
+class DueSummary:
+    """Cartões vencidos e previsão de revisões por dia"""
+    due_now: int
+    cards: List[CardSchedule]
+    forecast: Dict[str, int]
+
+
+class FlashcardScheduler:
+    """
+    Agendador SM-2 com filas de vencimento em memória
+
+    Cada usuário tem uma lista de (vencimento, id) ordenada, então contar e
+    listar os cartões vencidos é uma busca binária seguida de um fatiamento,
+    e a contagem por dia é atualizada incrementalmente a cada revisão. A
+    fila é carregada do banco por usuário e mantida num LRU por até
+    `deck_ttl` segundos, quando é relida para incluir cartões criados ou
+    removidos por outros clientes; a revisão grava o cartão (write-through)
+    e reposiciona-o na fila.
+    """
+
+    def __init__(self, loader: Optional[DeckLoader] = None, writer: Optional[ReviewWriter] = None,
+                 max_decks: int = MAX_DECKS, deck_ttl: float = DECK_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.loader = loader
+        self.writer = writer
+        self.max_decks = max_decks
+        self.deck_ttl = deck_ttl
+        self.clock = clock
+        self._decks: "OrderedDict[str, _Deck]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, loader: Optional[DeckLoader], writer: Optional[ReviewWriter]):
+        self.loader = loader
+        self.writer = writer
+        with self._lock:
+            self._decks.clear()
+
+    def _build(self, rows: Iterable[Dict[str, Any]]) -> _Deck:
+        deck = _Deck(self.clock())
+        for row in rows:
+            deck.put(CardSchedule(
+                card_id=str(row["id"]),
+                due_at=_timestamp(row.get("next_review_at")),
+                ease_factor=row.get("ease_factor") or INITIAL_EASE,
+                interval_days=row.get("interval_days") or 0.0,
+                repetitions=row.get("repetitions") or 0,
+                lapses=row.get("lapses") or 0,
+                review_count=row.get("review_count") or 0,
+                category=row.get("category"),
+            ))
+        return deck
+
+    def _store(self, user_id: str, deck: _Deck):
+        with self._lock:
+            self._decks[user_id] = deck
+            self._decks.move_to_end(user_id)
+            while len(self._decks) > self.max_decks:
+                self._decks.popitem(last=False)
+
+    def load(self, user_id: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Substitui a fila do usuário pelas linhas de `flashcards`"""
+        deck = self._build(rows)
+        self._store(user_id, deck)
+        return len(deck.cards)
+
+    def _deck(self, user_id: str) -> _Deck:
+        with self._lock:
+            deck = self._decks.get(user_id)
+            fresh = deck is not None and (
+                self.loader is None or self.clock() - deck.loaded_at < self.deck_ttl
+            )
+            if fresh:
+                self._decks.move_to_end(user_id)
+                return deck
+        deck = self._build(self.loader(user_id) if self.loader is not None else ())
+        self._store(user_id, deck)
+        return deck
+
+    def add(self, user_id: str, card_id: str, category: Optional[str] = None,
+            due_at: Optional[datetime] = None):
+        """Inclui um cartão recém-criado na fila (vence imediatamente por padrão)"""
+        deck = self._deck(user_id)
+        with self._lock:
+            deck.put(CardSchedule(card_id=card_id, due_at=_timestamp(due_at), category=category))
+
+    def remove(self, user_id: str, card_id: str):
+        with self._lock:
+            deck = self._decks.get(user_id)
+            card = deck.cards.pop(card_id, None) if deck is not None else None
+            if card is None:
+                return
+            deck.queue.remove((card.due_at, card.card_id))
+            day = _day(card.due_at)
+            deck.daily[day] -= 1
+            if not deck.daily[day]:
+                del deck.daily[day]
+
+    def review(self, user_id: str, card_id: str, grade: int,
+               reviewed_at: Optional[datetime] = None) -> Optional[CardSchedule]:
+        """Aplica a nota ao cartão, grava e reposiciona na fila; None se o cartão não existe"""
+        reviewed_at = reviewed_at or datetime.now(timezone.utc)
+        deck = self._deck(user_id)
+        with self._lock:
+            card = deck.cards.get(card_id)
+        if card is None:
+            return None
+        updated = sm2(card, grade, reviewed_at.timestamp())
+        if self.writer is not None:
+            self.writer(card_id, {
+                "ease_factor": updated.ease_factor,
+                "interval_days": updated.interval_days,
+                "repetitions": updated.repetitions,
+                "lapses": updated.lapses,
+                "review_count": updated.review_count,
+                "last_reviewed_at": reviewed_at.isoformat(),
+                "next_review_at": updated.next_review_at.isoformat(),
+            })
+        with self._lock:
+            deck.put(updated)
+        return updated
+
+    def due(self, user_id: str, now: Optional[datetime] = None, limit: int = 20,
+            forecast_days: int = 7) -> DueSummary:
+        """Cartões vencidos (mais atrasados primeiro) e quantos vencem em cada dia seguinte"""
+        now = now or datetime.now(timezone.utc)
+        deck = self._deck(user_id)
+        with self._lock:
+            due_now = deck.due_count(now.timestamp())
+            cards = [deck.cards[card_id] for _, card_id in deck.queue[:min(limit, due_now)]]
+            today = _day(now.timestamp())
+            forecast = {}
+            for offset in range(forecast_days):
+                day = today + offset
+                count = deck.daily.get(day, 0)
+                if offset == 0:
+                    # Hoje inclui os atrasados de dias anteriores
+                    count = deck.due_count((today + 1) * SECONDS_PER_DAY, inclusive=False)
+                forecast[datetime.fromtimestamp(day * SECONDS_PER_DAY, timezone.utc).date().isoformat()] = count
+        return DueSummary(due_now=due_now, cards=cards, forecast=forecast)
+
+
+# Instância compartilhada pela API
+flashcard_scheduler = FlashcardScheduler()
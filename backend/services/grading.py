@@ -0,0 +1,138 @@
+"""
+Simulai OAB - Correção vetorizada de simulados
+Cada gabarito é pré-compilado em um array de bytes (um byte por questão,
+indexado pela posição) e a correção é uma única comparação vetorizada
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Byte do gabarito para questões anuladas: contam como acerto para todos
+ANNULLED = ord("*")
+# Byte de resposta para questões em branco
+BLANK = 0
+
+OPTION_LETTERS = "ABCDE"
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Gabarito compilado de um simulado"""
+    key: np.ndarray               # uint8, letra correta por posição
+    discipline: np.ndarray        # uint16, código da disciplina por posição
+    disciplines: List[str]        # código -> nome da disciplina
+    discipline_totals: np.ndarray  # questões por disciplina
+
+    @property
+    def size(self) -> int:
+        return len(self.key)
+
+
+@dataclass
+class GradeResult:
+    """Resultado da correção de uma submissão"""
+    acertos: int
+    total: int
+    nota: int
+    por_disciplina: Dict[str, Dict[str, int]]
+
+
+def compile_answer_key(answers: Sequence[str], disciplines: Sequence[str]) -> AnswerKey:
+    """
+    Compila o gabarito em arrays compactos
+
+    - **answers**: letra correta por posição ("A".."E"; "*" para anulada)
+    - **disciplines**: disciplina de cada posição
+    """
+    if len(answers) != len(disciplines):
+        raise ValueError("Gabarito e disciplinas devem ter o mesmo tamanho")
+
+    letters = "".join((a or "").strip().upper()[:1] or "*" for a in answers)
+    if any(letter not in OPTION_LETTERS and letter != "*" for letter in letters):
+        raise ValueError("Gabarito contém alternativas inválidas")
+    key = np.frombuffer(letters.encode("ascii"), dtype=np.uint8).copy()
+    names = list(dict.fromkeys(disciplines))
+    codes = {name: code for code, name in enumerate(names)}
+    discipline = np.array([codes[d] for d in disciplines], dtype=np.uint16)
+
+    return AnswerKey(
+        key=key,
+        discipline=discipline,
+        disciplines=names,
+        discipline_totals=np.bincount(discipline, minlength=len(names)),
+    )
+
+
+def encode_responses(respostas: Mapping, size: int) -> np.ndarray:
+    """
+    Converte o dicionário de respostas {posição: letra} (posição começa em 1)
+    no array de bytes usado na comparação
+    """
+    responses = np.full(size, BLANK, dtype=np.uint8)
+    for position, letter in respostas.items():
+        try:
+            index = int(position) - 1
+        except (TypeError, ValueError):
+            raise ValueError(f"Posição de questão inválida: {position!r}")
+        if not 0 <= index < size:
+            raise ValueError(f"Posição de questão fora do simulado: {position!r}")
+        letter = str(letter or "").strip().upper()
+        if not letter:
+            continue
+        if letter not in OPTION_LETTERS:
+            raise ValueError(f"Alternativa inválida na questão {position}: {letter!r}")
+        responses[index] = ord(letter)
+    return responses
+
+
+class GradingEngine:
+    """Registro de gabaritos compilados e correção das submissões"""
+
+    def __init__(self):
+        self._keys: Dict[int, AnswerKey] = {}
+
+    def register(self, simulado_id: int, answers: Sequence[str], disciplines: Sequence[str]) -> AnswerKey:
+        """Compila e registra o gabarito de um simulado"""
+        answer_key = compile_answer_key(answers, disciplines)
+        self._keys[simulado_id] = answer_key
+        return answer_key
+
+    def get(self, simulado_id: int) -> Optional[AnswerKey]:
+        return self._keys.get(simulado_id)
+
+    def grade(self, simulado_id: int, respostas: Mapping) -> GradeResult:
+        """
+        Corrige uma submissão
+
+        Lança KeyError se o simulado não tiver gabarito registrado e
+        ValueError se as respostas referirem posições inválidas.
+        """
+        answer_key = self._keys[simulado_id]
+        responses = encode_responses(respostas, answer_key.size)
+        return grade_responses(answer_key, responses)
+
+
+def grade_responses(answer_key: AnswerKey, responses: np.ndarray) -> GradeResult:
+    """Compara respostas e gabarito e soma os acertos por disciplina"""
+    correct = (responses == answer_key.key) | (answer_key.key == ANNULLED)
+    per_discipline = np.bincount(
+        answer_key.discipline, weights=correct, minlength=len(answer_key.disciplines)
+    ).astype(np.int64)
+
+    acertos = int(per_discipline.sum())
+    total = answer_key.size
+    return GradeResult(
+        acertos=acertos,
+        total=total,
+        nota=round(100 * acertos / total) if total else 0,
+        por_disciplina={
+            name: {"acertos": int(per_discipline[code]), "total": int(answer_key.discipline_totals[code])}
+            for code, name in enumerate(answer_key.disciplines)
+        },
+    )
+
+
+# Instância compartilhada com os gabaritos dos simulados ativos
+grading_engine = GradingEngine()
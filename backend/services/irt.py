@@ -0,0 +1,185 @@
+"""
+Simulai OAB - Teoria de Resposta ao Item (modelo logístico de 2 parâmetros)
+Calibração por EM marginal (Bock-Aitkin) sobre a matriz esparsa
+usuário × questão, com passos de Newton vetorizados para todos os itens
+de uma vez
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.special import expit, log_expit, logsumexp
+
+# Nós de quadratura da habilidade (theta) e pesos da priori N(0, 1)
+QUADRATURE_NODES = np.linspace(-4.0, 4.0, 31)
+_PRIOR = np.exp(-0.5 * QUADRATURE_NODES ** 2)
+QUADRATURE_WEIGHTS = _PRIOR / _PRIOR.sum()
+
+# Prioris dos parâmetros (estabilizam itens com poucas respostas)
+DISCRIMINATION_PRIOR = (1.0, 0.5)  # média, desvio-padrão
+INTERCEPT_PRIOR_SD = 3.0
+DISCRIMINATION_BOUNDS = (0.05, 4.0)
+DIFFICULTY_BOUNDS = (-6.0, 6.0)
+
+# Faixas de dificuldade (b) por nível de `questions.difficulty_level`
+EASY_BELOW = -0.5
+HARD_ABOVE = 0.5
+
+
+def probability(discrimination, difficulty, theta):
+    """P(acerto) = 1 / (1 + exp(-a (theta - b)))"""
+    return expit(discrimination * (theta - difficulty))
+
+
+def information(discrimination, difficulty, theta):
+    """Informação de Fisher do item em theta: a² P (1 - P)"""
+    p = probability(discrimination, difficulty, theta)
+    return discrimination ** 2 * p * (1.0 - p)
+
+
+def difficulty_level(difficulty: float) -> str:
+    if difficulty < EASY_BELOW:
+        return "easy"
+    if difficulty > HARD_ABOVE:
+        return "hard"
+    return "medium"
+
+
+def response_matrices(
+    user_index: np.ndarray,
+    item_index: np.ndarray,
+    correct: np.ndarray,
+    n_users: int,
+    n_items: int,
+) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """
+    Matrizes CSR de acertos e erros (usuários × itens)
+
+    Respostas repetidas de um usuário ao mesmo item somam-se como
+    observações independentes.
+    """
+    correct = np.asarray(correct, dtype=bool)
+    shape = (n_users, n_items)
+    right = sparse.csr_matrix(
+        (np.ones(int(correct.sum())), (user_index[correct], item_index[correct])), shape=shape
+    )
+    wrong = sparse.csr_matrix(
+        (np.ones(int((~correct).sum())), (user_index[~correct], item_index[~correct])), shape=shape
+    )
+    return right, wrong
+
+
+@dataclass
+class CalibrationResult:
+    discrimination: np.ndarray
+    difficulty: np.ndarray
+    iterations: int
+    log_likelihood: float
+    converged: bool
+
+
+def _expected_counts(right, wrong, a, c, chunk_users):
+    """E-step: acertos e respostas esperados por item em cada nó de quadratura"""
+    z = np.outer(a, QUADRATURE_NODES) + c[:, None]
+    log_p, log_q = log_expit(z), log_expit(-z)
+    log_weights = np.log(QUADRATURE_WEIGHTS)
+
+    n_items, n_nodes = z.shape
+    expected_right = np.zeros((n_items, n_nodes))
+    expected_total = np.zeros((n_items, n_nodes))
+    log_likelihood = 0.0
+    for start in range(0, right.shape[0], chunk_users):
+        r = right[start:start + chunk_users]
+        w = wrong[start:start + chunk_users]
+        log_posterior = r @ log_p + w @ log_q + log_weights
+        norm = logsumexp(log_posterior, axis=1, keepdims=True)
+        log_likelihood += float(norm.sum())
+        posterior = np.exp(log_posterior - norm)
+        from_right = r.T @ posterior
+        expected_right += from_right
+        expected_total += from_right + w.T @ posterior
+    return expected_right, expected_total, log_likelihood
+
+
+def _newton_step(expected_right, expected_total, a, c):
+    """M-step: um passo de Newton por item no parâmetro (a, c), com c = -a b"""
+    theta = QUADRATURE_NODES
+    p = expit(np.outer(a, theta) + c[:, None])
+    residual = expected_right - expected_total * p
+    weight = expected_total * p * (1.0 - p)
+
+    mean_a, sd_a = DISCRIMINATION_PRIOR
+    grad_a = residual @ theta - (a - mean_a) / sd_a ** 2
+    grad_c = residual.sum(axis=1) - c / INTERCEPT_PRIOR_SD ** 2
+    h_aa = -(weight @ theta ** 2) - 1.0 / sd_a ** 2
+    h_ac = -(weight @ theta)
+    h_cc = -weight.sum(axis=1) - 1.0 / INTERCEPT_PRIOR_SD ** 2
+
+    det = h_aa * h_cc - h_ac ** 2
+    step_a = np.clip((h_cc * grad_a - h_ac * grad_c) / det, -1.0, 1.0)
+    step_c = np.clip((h_aa * grad_c - h_ac * grad_a) / det, -1.0, 1.0)
+    return a - step_a, c - step_c
+
+
+def initial_difficulty(right: sparse.csr_matrix, wrong: sparse.csr_matrix) -> np.ndarray:
+    """b inicial pela taxa de acerto suavizada de cada item"""
+    hits = np.asarray(right.sum(axis=0)).ravel()
+    totals = hits + np.asarray(wrong.sum(axis=0)).ravel()
+    p = (hits + 0.5) / (totals + 1.0)
+    return np.clip(-np.log(p / (1.0 - p)), *DIFFICULTY_BOUNDS)
+
+
+def calibrate_2pl(
+    right: sparse.csr_matrix,
+    wrong: sparse.csr_matrix,
+    discrimination: Optional[np.ndarray] = None,
+    difficulty: Optional[np.ndarray] = None,
+    fit: Optional[np.ndarray] = None,
+    max_iter: int = 100,
+    tol: float = 1e-3,
+    newton_steps: int = 2,
+    chunk_users: int = 100_000,
+) -> CalibrationResult:
+    """
+    Ajusta (a, b) do modelo 2PL por EM marginal
+
+    `fit` (máscara booleana por item) restringe a atualização a alguns itens;
+    os demais entram com os parâmetros fornecidos, fixos. A E-step percorre
+    os usuários em blocos de `chunk_users` linhas, então a memória densa é
+    de no máximo `chunk_users` × nós de quadratura.
+    """
+    n_items = right.shape[1]
+    a = np.ones(n_items) if discrimination is None else np.asarray(discrimination, dtype=float).copy()
+    b = initial_difficulty(right, wrong) if difficulty is None else np.asarray(difficulty, dtype=float).copy()
+    fit = np.ones(n_items, dtype=bool) if fit is None else np.asarray(fit, dtype=bool)
+    c = -a * b
+
+    right, wrong = right.tocsr(), wrong.tocsr()
+    log_likelihood = -np.inf
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        expected_right, expected_total, log_likelihood = _expected_counts(right, wrong, a, c, chunk_users)
+        new_a, new_c = a, c
+        for _ in range(newton_steps):
+            new_a, new_c = _newton_step(expected_right, expected_total, new_a, new_c)
+        new_a = np.clip(new_a, *DISCRIMINATION_BOUNDS)
+        new_b = np.clip(-new_c / new_a, *DIFFICULTY_BOUNDS)
+
+        change = np.max(np.abs(np.concatenate([new_a - a, new_b - b])[np.tile(fit, 2)]), initial=0.0)
+        a = np.where(fit, new_a, a)
+        b = np.where(fit, new_b, b)
+        c = -a * b
+        if change < tol:
+            converged = True
+            break
+
+    return CalibrationResult(
+        discrimination=a,
+        difficulty=b,
+        iterations=iteration,
+        log_likelihood=log_likelihood,
+        converged=converged,
+    )
@@ -0,0 +1,307 @@
+"""
+Simulai OAB - Banco de questões em memória
+Armazena os metadados de `public.questions` em colunas (arrays NumPy) e
+responde listagens filtradas por meio de listas invertidas e bitmaps
+"""
+
+import copy
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .database import iter_table_rows
+
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+
+QUESTION_BANK_COLUMNS = "id,category,exam_year,difficulty_level,tags,is_active,correct_answer"
+
+
+def _postings_and_bitmaps(codes: np.ndarray, size: int, with_bitmaps: bool = True):
+    """Gera lista invertida (ordinais ordenados) e bitmap para cada código"""
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+    postings = {}
+    bitmaps = {}
+    for chunk in np.split(order, boundaries):
+        if len(chunk) == 0:
+            continue
+        code = int(codes[chunk[0]])
+        posting = chunk.astype(np.int32)
+        postings[code] = posting
+        if with_bitmaps:
+            bitmap = np.zeros(size, dtype=bool)
+            bitmap[posting] = True
+            bitmaps[code] = bitmap
+    return postings, bitmaps
+
+
+class _Columns:
+    """Snapshot imutável das colunas; trocado atomicamente a cada carga"""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]]):
+        # Ordem de listagem: provas mais recentes primeiro, depois id
+        rows = sorted(rows, key=lambda r: (-(r.get("exam_year") or 0), str(r["id"])))
+        size = len(rows)
+        self.size = size
+
+        self.ids: List[str] = [str(r["id"]) for r in rows]
+        self.ordinal_by_id: Dict[str, int] = {qid: i for i, qid in enumerate(self.ids)}
+
+        self.categories: List[str] = sorted(
+            {r["category"] for r in rows if r.get("category")}
+        )
+        category_codes = {name: code for code, name in enumerate(self.categories)}
+        self.category = np.array(
+            [category_codes.get(r.get("category"), -1) for r in rows], dtype=np.int32
+        )
+
+        self.exam_year = np.array(
+            [r.get("exam_year") or 0 for r in rows], dtype=np.int16
+        )
+
+        difficulty_codes = {name: code for code, name in enumerate(DIFFICULTY_LEVELS)}
+        self.difficulty = np.array(
+            [difficulty_codes.get(r.get("difficulty_level") or "medium", 1) for r in rows],
+            dtype=np.int8,
+        )
+
+        self.active = np.array([r.get("is_active", True) is not False for r in rows], dtype=bool)
+        # Gabarito como código ASCII da letra (0 = desconhecido)
+        self.correct_answer = np.array(
+            [ord((str(r.get("correct_answer") or "").strip().upper() or "\0")[0]) for r in rows],
+            dtype=np.uint8,
+        )
+        self.tags: List[tuple] = [tuple(r.get("tags") or ()) for r in rows]
+
+        self.category_postings, self.category_bitmaps = _postings_and_bitmaps(
+            self.category, size
+        )
+        self.year_postings, self.year_bitmaps = _postings_and_bitmaps(self.exam_year, size)
+        self.active_postings = np.flatnonzero(self.active).astype(np.int32)
+        self.index_difficulty()
+
+        tag_ordinals: Dict[str, List[int]] = {}
+        for ordinal, tags in enumerate(self.tags):
+            for tag in tags:
+                tag_ordinals.setdefault(tag, []).append(ordinal)
+        self.tag_postings: Dict[str, np.ndarray] = {}
+        self.tag_bitmaps: Dict[str, np.ndarray] = {}
+        for tag, ordinals in tag_ordinals.items():
+            posting = np.array(ordinals, dtype=np.int32)
+            bitmap = np.zeros(size, dtype=bool)
+            bitmap[posting] = True
+            self.tag_postings[tag] = posting
+            self.tag_bitmaps[tag] = bitmap
+
+        self.category_index = category_codes
+
+    def index_difficulty(self):
+        """Listas da coluna de dificuldade e estratos (categoria, dificuldade) das questões ativas"""
+        size = self.size
+        self.difficulty_postings, self.difficulty_bitmaps = _postings_and_bitmaps(
+            self.difficulty, size
+        )
+        # Estratos (categoria, dificuldade) com apenas questões ativas,
+        # usados na montagem de simulados
+        stratum_codes = np.where(
+            self.active, self.category.astype(np.int64) * len(DIFFICULTY_LEVELS) + self.difficulty, -1
+        )
+        stratum_postings, _ = _postings_and_bitmaps(stratum_codes, size, with_bitmaps=False)
+        self.stratum_postings: Dict[tuple, np.ndarray] = {
+            divmod(code, len(DIFFICULTY_LEVELS)): posting
+            for code, posting in stratum_postings.items()
+            if code >= 0
+        }
+        active_category = np.where(self.active, self.category, -1)
+        for code, posting in _postings_and_bitmaps(active_category, size, with_bitmaps=False)[0].items():
+            if code >= 0:
+                self.stratum_postings[(code, None)] = posting
+
+
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+
+class QuestionBank:
+    """
+    Banco de questões colunar
+
+    Cada coluna filtrável (categoria, ano, dificuldade, tags, ativo) tem uma
+    lista invertida por valor e o bitmap correspondente. Um filtro simples
+    devolve a lista invertida diretamente; filtros combinados fazem AND dos
+    bitmaps, sem varrer as linhas.
+    """
+
+    def __init__(self):
+        self._columns = _Columns([])
+        self.version = 0
+
+    @property
+    def size(self) -> int:
+        return self._columns.size
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Reconstrói as colunas a partir das linhas de `questions`"""
+        columns = _Columns(list(rows))
+        self._columns = columns
+        # Ordinais mudam a cada carga; estruturas indexadas por ordinal comparam a versão
+        self.version += 1
+        return columns.size
+
+    def load_from_supabase(self, client, page_size: int = 1000) -> int:
+        """Carrega a tabela `questions` inteira via paginação por chave"""
+        return self.load(
+            iter_table_rows(client, "questions", QUESTION_BANK_COLUMNS, page_size=page_size)
+        )
+
+    def set_difficulty_levels(self, levels: Mapping[str, str]) -> int:
+        """
+        Aplica novos níveis de dificuldade (por id) sem recarregar o banco
+
+        Só as listas de dificuldade e os estratos são refeitos, numa cópia do
+        snapshot trocada atomicamente; os ordinais não mudam. Devolve quantas
+        questões carregadas mudaram de nível.
+        """
+        columns = self._columns
+        difficulty = columns.difficulty.copy()
+        changed = 0
+        for question_id, level in levels.items():
+            ordinal = columns.ordinal_by_id.get(question_id)
+            if ordinal is None or level not in DIFFICULTY_LEVELS:
+                continue
+            code = DIFFICULTY_LEVELS.index(level)
+            if difficulty[ordinal] != code:
+                difficulty[ordinal] = code
+                changed += 1
+        if changed:
+            updated = copy.copy(columns)
+            updated.difficulty = difficulty
+            updated.index_difficulty()
+            self._columns = updated
+        return changed
+
+    def categories(self) -> List[str]:
+        """Categorias conhecidas, em ordem alfabética"""
+        return list(self._columns.categories)
+
+    def filter(
+        self,
+        category: Optional[str] = None,
+        exam_year: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        tag: Optional[str] = None,
+        include_inactive: bool = False,
+    ) -> np.ndarray:
+        """
+        Retorna os ordinais (ordem de listagem) das questões que atendem aos filtros
+        """
+        columns = self._columns
+        postings: List[np.ndarray] = []
+        bitmaps: List[np.ndarray] = []
+
+        def add(index_postings, index_bitmaps, code) -> bool:
+            posting = index_postings.get(code)
+            if posting is None:
+                return False
+            postings.append(posting)
+            bitmaps.append(index_bitmaps[code])
+            return True
+
+        if category is not None:
+            code = columns.category_index.get(category)
+            if code is None or not add(
+                columns.category_postings, columns.category_bitmaps, code
+            ):
+                return _EMPTY
+        if exam_year is not None:
+            if not add(columns.year_postings, columns.year_bitmaps, exam_year):
+                return _EMPTY
+        if difficulty is not None:
+            if difficulty not in DIFFICULTY_LEVELS or not add(
+                columns.difficulty_postings,
+                columns.difficulty_bitmaps,
+                DIFFICULTY_LEVELS.index(difficulty),
+            ):
+                return _EMPTY
+        if tag is not None:
+            if not add(columns.tag_postings, columns.tag_bitmaps, tag):
+                return _EMPTY
+        if not include_inactive:
+            postings.append(columns.active_postings)
+            bitmaps.append(columns.active)
+
+        if not postings:
+            return np.arange(columns.size, dtype=np.int32)
+        if len(postings) == 1:
+            return postings[0]
+
+        mask = bitmaps[0] & bitmaps[1]
+        for bitmap in bitmaps[2:]:
+            mask &= bitmap
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def stratum(self, category: str, difficulty: Optional[str] = None) -> np.ndarray:
+        """
+        Ordinais das questões ativas de uma categoria, opcionalmente restritos
+        a uma dificuldade (listas pré-computadas, sem filtragem por requisição)
+        """
+        columns = self._columns
+        category_code = columns.category_index.get(category)
+        if category_code is None:
+            return _EMPTY
+        if difficulty is None:
+            return columns.stratum_postings.get((category_code, None), _EMPTY)
+        if difficulty not in DIFFICULTY_LEVELS:
+            return _EMPTY
+        return columns.stratum_postings.get(
+            (category_code, DIFFICULTY_LEVELS.index(difficulty)), _EMPTY
+        )
+
+    def ordinal(self, question_id: str) -> Optional[int]:
+        """Ordinal denso da questão, ou None se não estiver carregada"""
+        return self._columns.ordinal_by_id.get(question_id)
+
+    def rows(self, ordinals: Iterable[int]) -> List[Dict[str, Any]]:
+        """Materializa as linhas das questões pelos ordinais"""
+        columns = self._columns
+        items = []
+        for ordinal in ordinals:
+            ordinal = int(ordinal)
+            category_code = int(columns.category[ordinal])
+            year = int(columns.exam_year[ordinal])
+            items.append({
+                "id": columns.ids[ordinal],
+                "category": columns.categories[category_code] if category_code >= 0 else None,
+                "exam_year": year or None,
+                "difficulty_level": DIFFICULTY_LEVELS[int(columns.difficulty[ordinal])],
+                "tags": list(columns.tags[ordinal]),
+                "is_active": bool(columns.active[ordinal]),
+            })
+        return items
+
+    def correct_answer(self, ordinal: int) -> Optional[str]:
+        """Letra do gabarito da questão, ou None se não foi carregada"""
+        code = int(self._columns.correct_answer[int(ordinal)])
+        return chr(code) if code else None
+
+    def difficulty_levels(self) -> Dict[str, str]:
+        """Nível de dificuldade atual de cada questão carregada, por id"""
+        columns = self._columns
+        return {
+            qid: DIFFICULTY_LEVELS[code]
+            for qid, code in zip(columns.ids, columns.difficulty.tolist())
+        }
+
+    def category(self, ordinal: int) -> Optional[str]:
+        """Disciplina da questão pelo ordinal denso"""
+        columns = self._columns
+        code = int(columns.category[int(ordinal)])
+        return columns.categories[code] if code >= 0 else None
+
+    def question_id(self, ordinal: int) -> str:
+        """Id da questão pelo ordinal denso"""
+        return self._columns.ids[int(ordinal)]
+
+
+# Instância compartilhada, carregada na inicialização da API
+question_bank = QuestionBank()
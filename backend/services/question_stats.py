@@ -0,0 +1,265 @@
+"""
+Simulai OAB - Estatísticas por questão em tempo real
+Agrega os eventos de resposta em memória (contagens e média de tempo pelo
+método de Welford) e grava as questões alteradas em `question_stats` com um
+upsert em lote periódico, recalculando `difficulty_rating` e o nível de
+dificuldade da questão
+"""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .database import is_rejection, iter_table_rows, write_isolating_rejections
+
+# Prior Beta(1, 1) sobre a taxa de erro: questões com poucas tentativas
+# ficam próximas de 0.5 em vez de saltar para 0 ou 1
+PRIOR_WRONG = 1.0
+PRIOR_RIGHT = 1.0
+
+# Faixas de difficulty_rating (taxa de erro suavizada) por nível
+EASY_BELOW = 0.35
+HARD_ABOVE = 0.65
+# Tentativas mínimas antes de reclassificar `questions.difficulty_level`
+MIN_ATTEMPTS_FOR_LEVEL = 20
+
+StatsWriter = Callable[[List[Dict[str, Any]], Dict[str, List[str]]], Any]
+
+
+def difficulty_rating(attempts: int, correct: int) -> float:
+    """Taxa de erro suavizada em [0, 1] (coluna DECIMAL(3,2))"""
+    return round((attempts - correct + PRIOR_WRONG) / (attempts + PRIOR_WRONG + PRIOR_RIGHT), 2)
+
+
+def difficulty_level(rating: float) -> str:
+    if rating < EASY_BELOW:
+        return "easy"
+    if rating > HARD_ABOVE:
+        return "hard"
+    return "medium"
+
+
+class _Aggregate:
+    __slots__ = ("attempts", "correct", "timed", "mean_time", "level", "calibrated")
+
+    def __init__(self, attempts: int = 0, correct: int = 0, mean_time: float = 0.0,
+                 level: Optional[str] = None, calibrated: bool = False):
+        self.attempts = attempts
+        self.correct = correct
+        # Tentativas com tempo informado; a média persistida vale para todas
+        self.timed = attempts if mean_time else 0
+        self.mean_time = float(mean_time)
+        self.level = level
+        # Questões calibradas por TRI têm o nível definido pelo job de calibração
+        self.calibrated = calibrated
+
+    def add(self, is_correct: bool, time_taken: Optional[float]):
+        self.attempts += 1
+        self.correct += 1 if is_correct else 0
+        if time_taken is not None:
+            # Welford: média incremental sem guardar as amostras
+            self.timed += 1
+            self.mean_time += (float(time_taken) - self.mean_time) / self.timed
+
+
+def supabase_stats_writer(client) -> StatsWriter:
+    """Upsert em lote de `question_stats` e uma atualização por nível em `questions`"""
+    def write(rows: List[Dict[str, Any]], level_changes: Dict[str, List[str]]):
+        client.table("question_stats").upsert(rows, on_conflict="question_id").execute()
+        for level, question_ids in level_changes.items():
+            client.table("questions").update({"difficulty_level": level}).in_("id", question_ids).execute()
+    return write
+
+
+@dataclass
+class StatsFlushReport:
+    questions: int = 0
+    level_changes: int = 0
+    rejected: int = 0
+
+
+class QuestionStatsAggregator:
+    """
+    Estatísticas de `question_stats` mantidas em memória
+
+    `observe` é O(1) e só marca a questão como alterada; `flush` grava as
+    linhas alteradas desde o último flush num único upsert (valores
+    absolutos, por isso o agregador é semeado com `load` antes de receber
+    eventos e deve haver um único processo escrevendo). Se a gravação falha,
+    as questões continuam marcadas para o próximo flush; se o banco recusa
+    os dados (`is_rejection`, ex.: questão apagada), o lote é dividido até
+    isolar as linhas recusadas, que são descartadas. Com `bank`, os
+    níveis reclassificados também são aplicados ao banco de questões em
+    memória, para que filtros e montagem de simulados os vejam.
+    """
+
+    def __init__(self, writer: Optional[StatsWriter] = None, flush_interval: float = 5.0,
+                 bank=None, rejects: Callable[[Exception], bool] = is_rejection):
+        self.writer = writer
+        self.bank = bank
+        self.rejects = rejects
+        self.rejected = 0
+        self.flush_interval = flush_interval
+        self._stats: Dict[str, _Aggregate] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def configure(self, writer: Optional[StatsWriter], bank=None):
+        self.writer = writer
+        self.bank = bank
+
+    @property
+    def dirty(self) -> int:
+        return len(self._dirty)
+
+    def load(self, rows: Iterable[Dict[str, Any]], levels: Optional[Dict[str, str]] = None) -> int:
+        """Semeia os agregados com as linhas atuais de `question_stats`"""
+        levels = levels or {}
+        stats = {}
+        for row in rows:
+            question_id = str(row["question_id"])
+            stats[question_id] = _Aggregate(
+                attempts=row.get("total_attempts") or 0,
+                correct=row.get("correct_attempts") or 0,
+                mean_time=row.get("average_time_seconds") or 0,
+                level=levels.get(question_id),
+                calibrated=row.get("irt_difficulty") is not None,
+            )
+        with self._lock:
+            self._stats = stats
+            self._dirty.clear()
+        return len(stats)
+
+    def load_from_supabase(self, client, levels: Optional[Dict[str, str]] = None,
+                           page_size: int = 1000) -> int:
+        return self.load(iter_table_rows(
+            client, "question_stats",
+            "id,question_id,total_attempts,correct_attempts,average_time_seconds,irt_difficulty",
+            page_size=page_size,
+        ), levels)
+
+    def set_calibrated(self, levels: Dict[str, str]):
+        """Marca as questões calibradas por TRI (com o nível gravado pelo job); as demais deixam de ser"""
+        with self._lock:
+            for question_id, aggregate in self._stats.items():
+                level = levels.get(question_id)
+                aggregate.calibrated = level is not None
+                if level is not None:
+                    aggregate.level = level
+            for question_id, level in levels.items():
+                if question_id not in self._stats:
+                    self._stats[question_id] = _Aggregate(level=level, calibrated=True)
+
+    def observe(self, question_id: str, is_correct: bool, time_taken_seconds: Optional[float] = None):
+        with self._lock:
+            aggregate = self._stats.get(question_id)
+            if aggregate is None:
+                aggregate = self._stats[question_id] = _Aggregate()
+            aggregate.add(is_correct, time_taken_seconds)
+            self._dirty.add(question_id)
+
+    def observe_answer(self, answer: Dict[str, Any]):
+        """Assinante (`persisted=True`) do buffer de ingestão de respostas"""
+        self.observe(answer["question_id"], answer["is_correct"], answer.get("time_taken_seconds"))
+
+    def snapshot(self, question_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            aggregate = self._stats.get(question_id)
+            return self._row(question_id, aggregate, "") if aggregate else None
+
+    @staticmethod
+    def _row(question_id: str, aggregate: _Aggregate, now: str) -> Dict[str, Any]:
+        return {
+            "question_id": question_id,
+            "total_attempts": aggregate.attempts,
+            "correct_attempts": aggregate.correct,
+            "average_time_seconds": int(round(aggregate.mean_time)),
+            "difficulty_rating": difficulty_rating(aggregate.attempts, aggregate.correct),
+            "last_updated": now,
+        }
+
+    def _collect(self) -> Tuple[List[Dict[str, Any]], Dict[str, List[str]], set]:
+        now = datetime.now(timezone.utc).isoformat()
+        dirty, self._dirty = self._dirty, set()
+        rows, level_changes = [], {}
+        for question_id in dirty:
+            aggregate = self._stats[question_id]
+            row = self._row(question_id, aggregate, now)
+            rows.append(row)
+            if aggregate.attempts >= MIN_ATTEMPTS_FOR_LEVEL and not aggregate.calibrated:
+                level = difficulty_level(row["difficulty_rating"])
+                if level != aggregate.level:
+                    level_changes.setdefault(level, []).append(question_id)
+        return rows, level_changes, dirty
+
+    def flush(self) -> StatsFlushReport:
+        if self.writer is None:
+            return StatsFlushReport()
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return StatsFlushReport()
+                rows, level_changes, dirty = self._collect()
+            level_of = {
+                question_id: level
+                for level, question_ids in level_changes.items()
+                for question_id in question_ids
+            }
+
+            def write(batch: List[Dict[str, Any]]):
+                # Cada parte do lote leva só as mudanças de nível das suas questões
+                changes: Dict[str, List[str]] = {}
+                for row in batch:
+                    level = level_of.get(row["question_id"])
+                    if level is not None:
+                        changes.setdefault(level, []).append(row["question_id"])
+                self.writer(batch, changes)
+
+            written: List[Dict[str, Any]] = []
+            rejected: List[Tuple[Dict[str, Any], str]] = []
+            try:
+                write_isolating_rejections(write, rows, written, rejected, self.rejects)
+            except Exception:
+                with self._lock:
+                    self._dirty |= dirty
+                raise
+            if rejected:
+                self.rejected += len(rejected)
+                print(f"⚠️  {len(rejected)} question_stats rows rejected by the database: {rejected[0][1]}")
+                dropped = {row["question_id"] for row, _ in rejected}
+                level_changes = {
+                    level: [q for q in question_ids if q not in dropped]
+                    for level, question_ids in level_changes.items()
+                }
+                level_changes = {level: ids for level, ids in level_changes.items() if ids}
+            with self._lock:
+                for level, question_ids in level_changes.items():
+                    for question_id in question_ids:
+                        self._stats[question_id].level = level
+            if self.bank is not None and level_changes:
+                self.bank.set_difficulty_levels({
+                    question_id: level
+                    for level, question_ids in level_changes.items()
+                    for question_id in question_ids
+                })
+            return StatsFlushReport(
+                questions=len(written),
+                level_changes=sum(len(ids) for ids in level_changes.values()),
+                rejected=len(rejected),
+            )
+
+    async def run(self):
+        """Loop de flush periódico (tarefa de fundo da API)"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"⚠️  Question stats flush failed, will retry: {e}")
+
+
+# Instância compartilhada pela API
+question_stats_aggregator = QuestionStatsAggregator()
@@ -0,0 +1,207 @@
+"""
+Simulai OAB - Ranking por simulado
+Árvore de Fenwick sobre faixas de nota para responder posição e percentil
+em O(log n), atualizada a cada submissão concluída
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .database import iter_table_rows
+from .single_flight import SingleFlight
+
+# Notas são percentuais com duas casas (DECIMAL(5,2)): 0.00 .. 100.00
+SCORE_SCALE = 100
+MAX_SCORE = 100
+
+
+@dataclass
+class RankInfo:
+    """Posição de uma nota dentro do simulado"""
+    posicao: int
+    total_participantes: int
+    percentil: float
+
+
+class ScoreRanking:
+    """
+    Árvore de Fenwick com a contagem de participantes por faixa de nota
+
+    A faixa é a nota em centésimos; `rank` conta quantos participantes têm
+    nota estritamente maior (posição = 1 + esse número).
+    """
+
+    def __init__(self, scale: int = SCORE_SCALE, max_score: int = MAX_SCORE):
+        self.scale = scale
+        self.size = max_score * scale + 1
+        self._tree = [0] * (self.size + 1)
+        self.total = 0
+
+    def _bucket(self, score: float) -> int:
+        bucket = int(round(float(score) * self.scale))
+        return min(max(bucket, 0), self.size - 1)
+
+    def _add(self, bucket: int, delta: int):
+        i = bucket + 1
+        tree = self._tree
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket: int) -> int:
+        """Participantes com faixa <= bucket"""
+        i = bucket + 1
+        tree = self._tree
+        count = 0
+        while i > 0:
+            count += tree[i]
+            i -= i & -i
+        return count
+
+    def add(self, score: float, previous_score: Optional[float] = None):
+        """Registra uma nota; `previous_score` substitui a tentativa anterior"""
+        if previous_score is not None:
+            self._add(self._bucket(previous_score), -1)
+            self.total -= 1
+        self._add(self._bucket(score), 1)
+        self.total += 1
+
+    def remove(self, score: float):
+        self._add(self._bucket(score), -1)
+        self.total -= 1
+
+    def rebuild(self, scores: Iterable[float]):
+        """Reconstrói a árvore em O(n) a partir de todas as notas"""
+        scores = np.fromiter((float(s) for s in scores), dtype=np.float64)
+        buckets = np.clip(np.rint(scores * self.scale).astype(np.int64), 0, self.size - 1)
+        counts = np.bincount(buckets, minlength=self.size)
+        tree = [0] + counts.tolist()
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self.total = int(len(scores))
+
+    def rank(self, score: float) -> RankInfo:
+        """Posição e percentil (fração de participantes abaixo da nota)"""
+        bucket = self._bucket(score)
+        at_or_below = self._prefix(bucket)
+        below = self._prefix(bucket - 1) if bucket > 0 else 0
+        total = self.total
+        return RankInfo(
+            posicao=total - at_or_below + 1,
+            total_participantes=total,
+            percentil=round(100 * below / total, 2) if total else 0.0,
+        )
+
+
+def ranking_key(simulado_id: Hashable) -> str:
+    """
+    Chave dos rankings: o id do simulado como texto, para que o id vindo da
+    rota (int nos simulados atuais) e o `simulation_id` de `user_simulations`
+    caiam no mesmo ranking
+    """
+    return str(simulado_id)
+
+
+class RankingService:
+    """
+    Rankings de todos os simulados, indexados pelo id do simulado
+
+    Cada usuário conta uma vez por simulado, com a tentativa mais recente:
+    uma nova submissão substitui a anterior no ranking.
+    """
+
+    def __init__(self):
+        self._rankings: Dict[str, ScoreRanking] = {}
+        # (simulado, usuário) -> nota que está no ranking
+        self._latest: Dict[Tuple[str, str], float] = {}
+        self._flights = SingleFlight()
+
+    def ranking(self, simulado_id: Hashable) -> ScoreRanking:
+        key = ranking_key(simulado_id)
+        ranking = self._rankings.get(key)
+        if ranking is None:
+            ranking = self._rankings[key] = ScoreRanking()
+        return ranking
+
+    def record(self, simulado_id: Hashable, score: float, user_id: Optional[str] = None,
+               previous_score: Optional[float] = None) -> RankInfo:
+        """
+        Registra uma submissão concluída e devolve a posição resultante
+
+        Com `user_id`, a tentativa anterior do usuário no simulado é
+        substituída; sem ele, a submissão conta como um participante novo.
+        """
+        ranking = self.ranking(simulado_id)
+        if user_id is not None:
+            attempt = (ranking_key(simulado_id), str(user_id))
+            if previous_score is None:
+                previous_score = self._latest.get(attempt)
+            self._latest[attempt] = score
+        ranking.add(score, previous_score)
+        return ranking.rank(score)
+
+    def rank(self, simulado_id: Hashable, score: float) -> RankInfo:
+        ranking = self._rankings.get(ranking_key(simulado_id))
+        if ranking is None:
+            return RankInfo(posicao=1, total_participantes=0, percentil=0.0)
+        return ranking.rank(score)
+
+    def rebuild(self, rows: Iterable[Tuple[Hashable, Optional[str], float]]) -> int:
+        """
+        Reconstrói todos os rankings a partir de (simulado, usuário, nota)
+
+        As linhas devem vir da tentativa mais antiga para a mais recente;
+        para cada usuário fica a última nota do simulado. Linhas sem usuário
+        contam cada uma.
+        """
+        latest: Dict[Tuple[str, str], float] = {}
+        anonymous: Dict[str, list] = {}
+        for simulado_id, user_id, score in rows:
+            if user_id is None:
+                anonymous.setdefault(ranking_key(simulado_id), []).append(score)
+            else:
+                latest[(ranking_key(simulado_id), str(user_id))] = score
+        scores: Dict[str, list] = anonymous
+        for (key, _), score in latest.items():
+            scores.setdefault(key, []).append(score)
+        rankings = {}
+        for key, values in scores.items():
+            ranking = ScoreRanking()
+            ranking.rebuild(values)
+            rankings[key] = ranking
+        self._rankings, self._latest = rankings, latest
+        return sum(len(values) for values in scores.values())
+
+    def rebuild_from_supabase(self, client, page_size: int = 1000) -> int:
+        """Recarrega a última tentativa concluída de cada usuário em `user_simulations`"""
+        rows = [
+            row for row in iter_table_rows(
+                client,
+                "user_simulations",
+                "id,user_id,simulation_id,score,completed_at",
+                page_size=page_size,
+                filters={"status": "completed"},
+            )
+            if row.get("score") is not None
+        ]
+        rows.sort(key=lambda row: row.get("completed_at") or "")
+        return self.rebuild((row["simulation_id"], row["user_id"], row["score"]) for row in rows)
+
+    async def refresh_from_supabase(self, client, timeout: Optional[float] = None) -> int:
+        """
+        `rebuild_from_supabase` numa thread; chamadas concorrentes esperam a
+        mesma reconstrução em vez de reler `user_simulations` cada uma
+        """
+        return await self._flights.do(
+            "rebuild", lambda: asyncio.to_thread(self.rebuild_from_supabase, client), timeout
+        )
+
+
+# Instância compartilhada pela API
+ranking_service = RankingService()
@@ -0,0 +1,251 @@
+"""
+Simulai OAB - Cache de respostas das rotas de leitura
+Guarda o corpo já serializado das respostas (JSON em bytes) com TTL e
+despejo LRU limitado por bytes; as entradas levam tags para que as rotas de
+escrita (novo simulado, importação) invalidem só o que mudou
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Mapping, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from .single_flight import SingleFlight, SingleFlightTimeout
+
+# Limite padrão do cache (corpos + chaves + custo fixo por entrada)
+MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 60.0
+# Estimativa do custo de cada entrada além do corpo e da chave
+ENTRY_OVERHEAD_BYTES = 200
+# Quanto uma falha espera o cálculo em andamento da mesma chave antes de calcular sozinha
+COALESCE_TIMEOUT_SECONDS = 5.0
+
+CACHE_POLICY_ATTR = "__response_cache_policy__"
+
+
+def cache_key(route: str, path_params: Mapping[str, str], query_params: Iterable[Tuple[str, str]]) -> str:
+    """Chave da resposta: rota (modelo do path), parâmetros do path e query em ordem canônica"""
+    path = "&".join(f"{name}={value}" for name, value in sorted(path_params.items()))
+    query = urlencode(sorted(query_params))
+    return f"{route}|{path}|{query}"
+
+
+@dataclass
+class CacheStats:
+    """Contadores do cache desde a subida da API"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = MAX_BYTES
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class _Entry:
+    __slots__ = ("body", "media_type", "expires_at", "tags", "size")
+
+    def __init__(self, body: bytes, media_type: str, expires_at: float, tags: Tuple[str, ...], size: int):
+        self.body = body
+        self.media_type = media_type
+        self.expires_at = expires_at
+        self.tags = tags
+        self.size = size
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Política de uma rota: TTL e tags (podem usar parâmetros do path, ex.: "simulado:{simulado_id}")"""
+    cache: "ResponseCache"
+    ttl: Optional[float]
+    tags: Tuple[str, ...]
+
+
+class ResponseCache:
+    """
+    Cache LRU de corpos de resposta com TTL e invalidação por tag
+
+    As entradas ficam num OrderedDict em ordem de uso; ao passar de
+    `max_bytes` as menos usadas são descartadas. Entradas vencidas são
+    removidas na leitura. Cada tag aponta para as chaves que a carregam, e
+    `invalidate` remove só essas. Um contador de geração impede que uma
+    resposta calculada antes de uma invalidação seja gravada depois dela.
+    Falhas concorrentes da mesma chave são coalescidas em `flights`.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, default_ttl: float = DEFAULT_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic,
+                 coalesce_timeout: Optional[float] = COALESCE_TIMEOUT_SECONDS):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.coalesce_timeout = coalesce_timeout
+        self.flights = SingleFlight()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._generation = 0
+        self._stats = CacheStats(max_bytes=max_bytes)
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Muda a cada invalidação; passe o valor lido antes do cálculo para `set`"""
+        return self._generation
+
+    def _remove(self, key: str) -> _Entry:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return entry
+
+    def get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self.clock():
+                self._remove(key)
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry
+
+    def set(self, key: str, body: bytes, ttl: Optional[float] = None, tags: Iterable[str] = (),
+            media_type: str = "application/json", generation: Optional[int] = None) -> bool:
+        """Grava o corpo; False se não coube ou se houve invalidação desde `generation`"""
+        size = len(body) + len(key) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return False
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            ttl = self.default_ttl if ttl is None else ttl
+            self._entries[key] = _Entry(body, media_type, self.clock() + ttl, tags, size)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+            return True
+
+    def invalidate(self, *tags: str) -> int:
+        """Remove as entradas com qualquer uma das tags; devolve quantas saíram"""
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            stats = CacheStats(**self._stats.__dict__)
+            stats.entries, stats.bytes = len(self._entries), self._bytes
+            return stats
+
+    def cached(self, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        """
+        Marca uma rota GET para ser servida do cache
+
+        Vale para routers criados com `route_class=CachedRoute`; o decorador
+        deve ficar abaixo de `@router.get`.
+        """
+        policy = CachePolicy(self, ttl, tuple(tags))
+
+        def mark(endpoint):
+            setattr(endpoint, CACHE_POLICY_ATTR, policy)
+            return endpoint
+        return mark
+
+
+class CachedRoute(APIRoute):
+    """
+    Rota que consulta o cache antes de executar o endpoint
+
+    Só as rotas marcadas com `ResponseCache.cached` são afetadas. O corpo
+    guardado é o que o FastAPI serializou (já validado pelo
+    `response_model`), então um acerto devolve os bytes sem chamar o
+    endpoint nem o Pydantic. Apenas respostas 200 são guardadas.
+
+    Numa falha, requisições concorrentes com a mesma chave esperam uma única
+    execução do endpoint (single-flight); quem esperar por ela mais que
+    `coalesce_timeout` executa o endpoint por conta própria, e essa resposta
+    também é guardada.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        policy: Optional[CachePolicy] = getattr(self.endpoint, CACHE_POLICY_ATTR, None)
+        if policy is None:
+            return handler
+        route = self.path
+        cache = policy.cache
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+            key = cache_key(route, request.path_params, request.query_params.multi_items())
+            entry = cache.get(key)
+            if entry is not None:
+                return Response(content=entry.body, media_type=entry.media_type, headers={"X-Cache": "HIT"})
+            generation = cache.generation
+
+            async def compute() -> Response:
+                response = await handler(request)
+                body = getattr(response, "body", None)
+                if response.status_code == 200 and isinstance(body, bytes) and "set-cookie" not in response.headers:
+                    tags = [tag.format(**request.path_params) for tag in policy.tags]
+                    cache.set(key, body, policy.ttl, tags, response.media_type or "application/json", generation)
+                return response
+
+            try:
+                shared = await cache.flights.do(key, compute, timeout=cache.coalesce_timeout)
+            except SingleFlightTimeout:
+                response = await compute()
+                response.headers["X-Cache"] = "BYPASS"
+                return response
+            # A mesma resposta atende vários chamadores: cada um recebe uma cópia
+            response = Response(
+                content=shared.body, status_code=shared.status_code, headers=dict(shared.headers)
+            )
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return cached_handler
+
+
+# Instância compartilhada pela API
+response_cache = ResponseCache()
@@ -0,0 +1,357 @@
+"""
+Simulai OAB - Busca textual em português
+Índice invertido em memória sobre `question_text` e `explanation`, com
+remoção de acentos, stemmer leve para o português, ranking BM25 e facetas
+de categoria e ano
+"""
+
+import copy
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .database import iter_table_rows
+
+SEARCH_COLUMNS = "id,question_text,explanation,category,exam_year,is_active,updated_at"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e ela elas ele eles em entre era essa
+esse esta este eu foi ha isso isto ja la lhe mais mas me mesmo muito na nao
+nas nem no nos o os ou para pela pelas pelo pelos por qual quando que quem se
+sem ser seu seus sob sobre sua suas tambem te tem um uma umas uns
+""".split())
+
+
+def fold_accents(text: str) -> str:
+    """Minúsculas e sem diacríticos ("Usucapião" -> "usucapiao")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+# Regras do stemmer leve (inspirado no RSLP), aplicadas sobre texto sem acentos:
+# (sufixo, substituição, tamanho mínimo do radical)
+_PLURAL_RULES = (
+    ("oes", "ao", 1), ("aes", "ao", 1), ("ais", "al", 1), ("eis", "el", 2),
+    ("ois", "ol", 1), ("ns", "m", 1), ("res", "r", 2), ("les", "l", 2), ("is", "il", 3),
+)
+_FEMININE_RULES = (
+    ("eira", "eiro", 3), ("ora", "or", 3), ("inha", "inho", 3), ("esa", "es", 3),
+    ("osa", "oso", 3), ("ica", "ico", 3), ("ada", "ado", 2), ("ida", "ido", 3),
+    ("iva", "ivo", 3), ("ona", "ao", 3),
+)
+_NOUN_SUFFIXES = (
+    ("amentos", 3), ("imentos", 3), ("amento", 3), ("imento", 3), ("acoes", 3),
+    ("acao", 3), ("icao", 3), ("idades", 3), ("idade", 3), ("ismo", 3), ("ista", 3),
+    ("avel", 3), ("ivel", 3), ("ancia", 3), ("encia", 3), ("ador", 3), ("edor", 3),
+    ("idor", 3), ("mente", 4),
+)
+_VERB_SUFFIXES = (
+    ("ariam", 2), ("eriam", 2), ("iriam", 2), ("aram", 2), ("eram", 2), ("iram", 2),
+    ("ando", 2), ("endo", 2), ("indo", 2), ("ava", 2), ("ado", 2), ("ido", 2),
+    ("ar", 2), ("er", 2), ("ir", 2),
+)
+
+
+def stem(word: str) -> str:
+    """Stemmer leve para o português (entrada já sem acentos)"""
+    if len(word) <= 3:
+        return word
+
+    if word.endswith("s") and not word.endswith(("us", "ss")):
+        for suffix, replacement, min_stem in _PLURAL_RULES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                word = word[: -len(suffix)] + replacement
+                break
+        else:
+            word = word[:-1]
+
+    if word.endswith("a"):
+        for suffix, replacement, min_stem in _FEMININE_RULES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                word = word[: -len(suffix)] + replacement
+                break
+
+    for suffix, min_stem in _NOUN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            word = word[: -len(suffix)]
+            break
+    else:
+        for suffix, min_stem in _VERB_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                word = word[: -len(suffix)]
+                break
+
+    if len(word) > 3 and word[-1] in "aeo":
+        word = word[:-1]
+    return word
+
+
+_stem_cache: Dict[str, str] = {}
+
+
+def analyze(text: Optional[str]) -> List[str]:
+    """Tokeniza, remove acentos e stopwords e aplica o stemmer"""
+    if not text:
+        return []
+    terms = []
+    for token in _TOKEN_RE.findall(fold_accents(str(text))):
+        if token in STOPWORDS:
+            continue
+        term = _stem_cache.get(token)
+        if term is None:
+            term = _stem_cache[token] = stem(token)
+        terms.append(term)
+    return terms
+
+
+@dataclass
+class SearchHit:
+    id: str
+    score: float
+    category: Optional[str]
+    exam_year: Optional[int]
+
+
+@dataclass
+class SearchResult:
+    hits: List[SearchHit]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+
+class _Snapshot:
+    """Estado do índice; cada carga monta um novo e o troca atomicamente"""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.ordinal_by_id: Dict[str, int] = {}
+        self.lengths = np.zeros(0, dtype=np.float32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.category = np.zeros(0, dtype=np.int32)
+        self.year = np.zeros(0, dtype=np.int16)
+        self.categories: List[str] = []
+        self.category_codes: Dict[str, int] = {}
+        self.postings: Dict[str, tuple] = {}
+        self.doc_norm = np.zeros(0, dtype=np.float32)
+        self.live_length_sum = 0.0
+        self.live_docs = 0
+
+    def copy(self) -> "_Snapshot":
+        """Cópia que pode ser alterada sem afetar buscas no snapshot atual"""
+        snapshot = copy.copy(self)
+        snapshot.ids = list(self.ids)
+        snapshot.ordinal_by_id = dict(self.ordinal_by_id)
+        snapshot.alive = self.alive.copy()
+        snapshot.categories = list(self.categories)
+        snapshot.category_codes = dict(self.category_codes)
+        # As listas de postings são substituídas, nunca alteradas
+        snapshot.postings = dict(self.postings)
+        return snapshot
+
+    def category_code(self, category: Optional[str]) -> int:
+        if not category:
+            return -1
+        code = self.category_codes.get(category)
+        if code is None:
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def remove(self, question_id: str):
+        ordinal = self.ordinal_by_id.pop(question_id, None)
+        if ordinal is not None and self.alive[ordinal]:
+            self.alive[ordinal] = False
+            self.live_docs -= 1
+            self.live_length_sum -= float(self.lengths[ordinal])
+
+    def merge_postings(self, pending: Dict[str, List[tuple]]):
+        """Converte as listas pendentes do lote em arrays NumPy por termo"""
+        for term, entries in pending.items():
+            docs = np.fromiter((doc for doc, _ in entries), dtype=np.int32, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries))
+            current = self.postings.get(term)
+            if current is not None:
+                docs = np.concatenate([current[0], docs])
+                tfs = np.concatenate([current[1], tfs])
+            self.postings[term] = (docs, tfs)
+
+    def compute_norms(self):
+        """Normalização de tamanho do BM25 por documento"""
+        avgdl = self.live_length_sum / self.live_docs if self.live_docs else 1.0
+        self.doc_norm = (BM25_K1 * (1 - BM25_B + BM25_B * self.lengths / avgdl)).astype(np.float32)
+
+
+class SearchIndex:
+    """
+    Índice invertido com BM25
+
+    Documentos recebem ordinais densos; reindexar uma questão marca o ordinal
+    antigo como removido e acrescenta um novo, então importações incrementais
+    não exigem reconstruir o índice inteiro.
+
+    Como no banco de questões, o estado fica num snapshot imutável: uma
+    carga (que roda numa thread) monta uma cópia e a troca de uma vez, e a
+    busca lê um único snapshot do começo ao fim. Cargas simultâneas são
+    serializadas por um lock.
+    """
+
+    def __init__(self):
+        self._load_lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._snapshot = _Snapshot()
+        self.watermark: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return self._snapshot.live_docs
+
+    def add_documents(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Indexa (ou reindexa) questões; linhas inativas são removidas"""
+        return self._load(rows, rebuild=False)
+
+    def _load(self, rows: Iterable[Dict[str, Any]], rebuild: bool) -> int:
+        # Última versão de cada questão no lote
+        rows = list({str(row["id"]): row for row in rows}.values())
+        with self._load_lock:
+            snapshot = _Snapshot() if rebuild else self._snapshot.copy()
+            watermark = None if rebuild else self.watermark
+            start = len(snapshot.ids)
+            lengths, categories, years, alive = [], [], [], []
+            pending: Dict[str, List[tuple]] = {}
+
+            for row in rows:
+                question_id = str(row["id"])
+                snapshot.remove(question_id)
+                if row.get("updated_at") and (watermark is None or row["updated_at"] > watermark):
+                    watermark = row["updated_at"]
+
+                ordinal = start + len(lengths)
+                active = row.get("is_active", True) is not False
+                terms = analyze(row.get("question_text")) + analyze(row.get("explanation"))
+
+                snapshot.ids.append(question_id)
+                lengths.append(len(terms))
+                categories.append(snapshot.category_code(row.get("category")))
+                years.append(row.get("exam_year") or 0)
+                alive.append(active)
+                if not active:
+                    continue
+
+                snapshot.ordinal_by_id[question_id] = ordinal
+                snapshot.live_docs += 1
+                snapshot.live_length_sum += len(terms)
+                frequencies: Dict[str, int] = {}
+                for term in terms:
+                    frequencies[term] = frequencies.get(term, 0) + 1
+                for term, tf in frequencies.items():
+                    pending.setdefault(term, []).append((ordinal, tf))
+
+            snapshot.lengths = np.concatenate([snapshot.lengths, np.array(lengths, dtype=np.float32)])
+            snapshot.alive = np.concatenate([snapshot.alive, np.array(alive, dtype=bool)])
+            snapshot.category = np.concatenate([snapshot.category, np.array(categories, dtype=np.int32)])
+            snapshot.year = np.concatenate([snapshot.year, np.array(years, dtype=np.int16)])
+            snapshot.merge_postings(pending)
+            snapshot.compute_norms()
+            self._snapshot = snapshot
+            self.watermark = watermark
+        return len(rows)
+
+    def build(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Reconstrói o índice do zero"""
+        return self._load(rows, rebuild=True)
+
+    def build_from_supabase(self, client, page_size: int = 1000) -> int:
+        return self.build(iter_table_rows(client, "questions", SEARCH_COLUMNS, page_size=page_size))
+
+    def refresh_from_supabase(self, client, page_size: int = 1000) -> int:
+        """Reindexa apenas as questões alteradas desde a última carga (updated_at)"""
+        if self.watermark is None:
+            return self.build_from_supabase(client, page_size)
+        return self.add_documents(iter_table_rows(
+            client, "questions", SEARCH_COLUMNS, page_size=page_size,
+            greater_than={"updated_at": self.watermark},
+        ))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        category: Optional[str] = None,
+        exam_year: Optional[int] = None,
+    ) -> SearchResult:
+        """Top `limit` por BM25, com contagem de facetas sobre todos os resultados"""
+        terms = list(dict.fromkeys(analyze(query)))
+        # Um único snapshot durante toda a busca (cargas trocam o snapshot inteiro)
+        index = self._snapshot
+        if not terms or not index.live_docs:
+            return SearchResult(hits=[], total=0, facets={"categories": {}, "years": {}})
+
+        scores = np.zeros(len(index.ids), dtype=np.float32)
+        doc_norm = index.doc_norm
+        for term in terms:
+            postings = index.postings.get(term)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            live = index.alive[docs]
+            docs, tfs = docs[live], tfs[live]
+            if len(docs) == 0:
+                continue
+            idf = np.log(1 + (index.live_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += np.float32(idf * (BM25_K1 + 1)) * tfs / (tfs + doc_norm[docs])
+
+        matched = np.flatnonzero(scores > 0)
+        matched_categories = index.category[matched]
+        category_counts = np.bincount(
+            matched_categories[matched_categories >= 0], minlength=len(index.categories)
+        )
+        year_counts = np.bincount(index.year[matched])
+        facets = {
+            "categories": {
+                index.categories[code]: int(count)
+                for code, count in enumerate(category_counts.tolist()) if count
+            },
+            "years": {
+                str(year): count
+                for year, count in enumerate(year_counts.tolist()) if year and count
+            },
+        }
+
+        if category is not None:
+            code = index.category_codes.get(category, -2)
+            matched = matched[index.category[matched] == code]
+        if exam_year is not None:
+            matched = matched[index.year[matched] == exam_year]
+
+        if len(matched) > limit:
+            top = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        else:
+            top = matched
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        hits = []
+        for ordinal in top.tolist():
+            code = int(index.category[ordinal])
+            year = int(index.year[ordinal])
+            hits.append(SearchHit(
+                id=index.ids[ordinal],
+                score=round(float(scores[ordinal]), 4),
+                category=index.categories[code] if code >= 0 else None,
+                exam_year=year or None,
+            ))
+        return SearchResult(hits=hits, total=int(len(matched)), facets=facets)
+
+
+# Instância compartilhada pela API
+search_index = SearchIndex()
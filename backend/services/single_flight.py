@@ -0,0 +1,108 @@
+"""
+Simulai OAB - Coalescência de requisições (single-flight)
+Chamadas concorrentes com a mesma chave aguardam uma única corrotina em
+andamento em vez de repetir o mesmo cálculo (e a mesma consulta ao banco)
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlightTimeout(asyncio.TimeoutError):
+    """O chamador desistiu de esperar a execução em andamento"""
+
+
+@dataclass
+class FlightStats:
+    """Execuções iniciadas, chamadas que aproveitaram uma execução em andamento e desistências"""
+    leaders: int = 0
+    followers: int = 0
+    timeouts: int = 0
+    cancelled: int = 0
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes por chave
+
+    A primeira chamada de uma chave cria uma tarefa com `fn()`; as seguintes,
+    enquanto ela não termina, aguardam a mesma tarefa e recebem o mesmo
+    resultado (ou a mesma exceção). Cada chamador espera através de
+    `asyncio.shield`, então cancelar ou estourar o `timeout` de um chamador
+    não interrompe os demais. O `timeout` vale só para quem encontra uma
+    execução em andamento: quem a iniciou espera até o fim. Quando o último
+    chamador é cancelado, a tarefa é cancelada e a chave é liberada; um
+    seguidor que desiste por timeout não cancela nada, e a execução termina
+    (ex.: gravando no cache) mesmo sem ninguém esperando.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = FlightStats()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> FlightStats:
+        return FlightStats(**self._stats.__dict__)
+
+    def _finish(self, key: Hashable, flight: _Flight, task: asyncio.Task):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Marca a exceção como lida mesmo que nenhum chamador tenha esperado
+        if not task.cancelled():
+            task.exception()
+
+    def forget(self, key: Hashable):
+        """Chamadas seguintes da chave iniciam uma nova execução (a atual continua)"""
+        self._flights.pop(key, None)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                 timeout: Optional[float] = None) -> Any:
+        """
+        Executa `fn()` uma vez por chave entre os chamadores concorrentes
+
+        Um seguidor levanta SingleFlightTimeout se a execução em andamento
+        não terminar em `timeout` segundos; o líder não tem limite.
+        """
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight, task))
+            self._stats.leaders += 1
+            timeout = None
+        else:
+            self._stats.followers += 1
+
+        flight.waiters += 1
+        cancelled = False
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        except asyncio.TimeoutError:
+            if flight.task.done():
+                # A própria execução levantou TimeoutError
+                raise
+            self._stats.timeouts += 1
+            raise SingleFlightTimeout(f"single-flight {key!r} não terminou em {timeout}s") from None
+        except asyncio.CancelledError:
+            cancelled = True
+            self._stats.cancelled += 1
+            raise
+        finally:
+            flight.waiters -= 1
+            if cancelled and not flight.waiters and not flight.task.done():
+                # O último chamador foi cancelado: propaga o cancelamento
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
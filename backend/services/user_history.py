@@ -0,0 +1,288 @@
+"""
+Simulai OAB - Histórico de respostas por usuário em bitsets
+Para cada usuário, um bitset de questões respondidas e outro das que estão
+erradas (última resposta incorreta), indexados pelo ordinal denso do banco
+de questões e mantidos num cache LRU
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .database import iter_table_rows
+from .question_bank import QuestionBank, question_bank
+
+# Usuários mantidos em memória (2 bits por questão cada)
+MAX_USERS = 10_000
+
+# Leituras de histórico reaproveitadas entre os caches (ver SharedHistoryLoader)
+SHARED_HISTORY_TTL_SECONDS = 120.0
+SHARED_HISTORY_USERS = 1000
+
+HistoryLoader = Callable[[str], Iterable[Dict[str, Any]]]
+
+
+def supabase_history_loader(client, page_size: int = 1000) -> HistoryLoader:
+    """Respostas já gravadas de um usuário (uma leitura por usuário não carregado)"""
+    def load(user_id: str) -> Iterable[Dict[str, Any]]:
+        return iter_table_rows(
+            client, "user_question_history", "id,question_id,is_correct,answered_at,time_taken_seconds",
+            page_size=page_size, filters={"user_id": user_id},
+        )
+    return load
+
+
+class _SharedRead:
+    __slots__ = ("done", "rows", "error", "read_at", "served")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.rows: List[Dict[str, Any]] = []
+        self.error: Optional[BaseException] = None
+        self.read_at = 0.0
+        # Consumidores que já receberam esta leitura
+        self.served: Set[Hashable] = set()
+
+
+class SharedHistoryLoader:
+    """
+    Uma leitura do histórico por usuário para todos os caches em memória
+
+    O histórico de bitsets, o seletor adaptativo e o motor de conquistas
+    precisam das mesmas linhas na primeira vez que veem um usuário. Este
+    loader guarda a última leitura de cada usuário por `ttl` segundos (LRU
+    de `max_users`) e faz chamadas concorrentes para o mesmo usuário
+    esperarem a mesma leitura. Respostas gravadas depois da leitura chegam
+    aos caches pelo buffer de ingestão, como antes.
+
+    Cada cache usa a sua visão (`consumer`), e uma leitura pronta é entregue
+    no máximo uma vez a cada consumidor: quem relê um usuário (estado
+    descartado numa recarga do banco ou num despejo do LRU) já perdeu as
+    respostas recebidas desde a leitura e precisa de uma nova. Sem
+    consumidor, só leituras ainda em andamento são compartilhadas.
+    """
+
+    def __init__(self, loader: HistoryLoader, ttl: float = SHARED_HISTORY_TTL_SECONDS,
+                 max_users: int = SHARED_HISTORY_USERS, clock: Callable[[], float] = time.monotonic):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_users = max_users
+        self.clock = clock
+        self._reads: "OrderedDict[str, _SharedRead]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def consumer(self, name: Hashable) -> HistoryLoader:
+        """Loader de um cache: recebe cada leitura compartilhada uma única vez"""
+        return functools.partial(self, consumer=name)
+
+    def __call__(self, user_id: str, consumer: Optional[Hashable] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            read = self._reads.get(user_id)
+            stale = read is not None and read.done.is_set() and (
+                read.error is not None
+                or consumer is None
+                or consumer in read.served
+                or self.clock() - read.read_at >= self.ttl
+            )
+            leader = read is None or stale
+            if leader:
+                read = self._reads[user_id] = _SharedRead()
+                while len(self._reads) > self.max_users:
+                    self._reads.popitem(last=False)
+                self.reads += 1
+            else:
+                self._reads.move_to_end(user_id)
+            if consumer is not None:
+                read.served.add(consumer)
+        if leader:
+            try:
+                read.rows = list(self.loader(user_id))
+            except BaseException as e:
+                read.error = e
+                raise
+            finally:
+                read.read_at = self.clock()
+                read.done.set()
+        read.done.wait()
+        if read.error is not None:
+            raise read.error
+        return read.rows
+
+
+class Bitset:
+    """Conjunto de ordinais em bits compactados (little-endian por byte)"""
+
+    __slots__ = ("bits", "size")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+
+    def add(self, ordinal: int):
+        self.bits[ordinal >> 3] |= np.uint8(1 << (ordinal & 7))
+
+    def discard(self, ordinal: int):
+        self.bits[ordinal >> 3] &= np.uint8(~(1 << (ordinal & 7)) & 0xFF)
+
+    def __contains__(self, ordinal) -> bool:
+        ordinal = int(ordinal)
+        return 0 <= ordinal < self.size and bool((self.bits[ordinal >> 3] >> (ordinal & 7)) & 1)
+
+    def __len__(self) -> int:
+        return int(np.unpackbits(self.bits).sum())
+
+    def __iter__(self):
+        return iter(self.ordinals().tolist())
+
+    def contains(self, ordinals: np.ndarray) -> np.ndarray:
+        """Máscara booleana de pertinência para um array de ordinais"""
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        return ((self.bits[ordinals >> 3] >> (ordinals & 7).astype(np.uint8)) & 1).astype(bool)
+
+    def ordinals(self) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.bits, bitorder="little")[: self.size]).astype(np.int32)
+
+
+class _UserBits:
+    __slots__ = ("answered", "wrong", "version", "loaded", "pending")
+
+    def __init__(self, size: int, version: int):
+        self.answered = Bitset(size)
+        self.wrong = Bitset(size)
+        self.version = version
+        self.loaded = False
+        # Respostas observadas antes da carga, reaplicadas depois do histórico
+        self.pending: List[Tuple[int, bool]] = []
+
+    def add(self, ordinal: int, is_correct: bool):
+        self.answered.add(ordinal)
+        if is_correct:
+            self.wrong.discard(ordinal)
+        else:
+            self.wrong.add(ordinal)
+
+
+@dataclass
+class CategoryProgress:
+    """Progresso do usuário numa disciplina"""
+    category: str
+    total: int
+    answered: int
+    wrong: int
+
+
+class UserHistoryCache:
+    """
+    Bitsets de respondidas/erradas por usuário, em LRU
+
+    A primeira consulta de um usuário lê o histórico uma vez; depois disso
+    cada resposta (assinante do buffer de ingestão) atualiza os bits em O(1).
+    Excluir já vistas, listar erradas e contar progresso por disciplina são
+    operações sobre os bitsets e as listas do banco de questões, sem
+    consultar `user_question_history`.
+    """
+
+    def __init__(self, bank: Optional[QuestionBank] = None, history_loader: Optional[HistoryLoader] = None,
+                 max_users: int = MAX_USERS):
+        self.bank = bank or question_bank
+        self.history_loader = history_loader
+        self.max_users = max_users
+        self._users: "OrderedDict[str, _UserBits]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, history_loader: Optional[HistoryLoader]):
+        self.history_loader = history_loader
+
+    def _entry(self, user_id: str) -> _UserBits:
+        entry = self._users.get(user_id)
+        if entry is not None and entry.version == self.bank.version:
+            self._users.move_to_end(user_id)
+            return entry
+        entry = self._users[user_id] = _UserBits(self.bank.size, self.bank.version)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return entry
+
+    def _loaded(self, user_id: str) -> _UserBits:
+        with self._lock:
+            entry = self._entry(user_id)
+            if entry.loaded or self.history_loader is None:
+                entry.loaded = True
+                self.hits += 1
+                return entry
+            self.misses += 1
+        history = sorted(self.history_loader(user_id), key=lambda row: row.get("answered_at") or "")
+        with self._lock:
+            if entry.loaded:
+                return entry
+            for row in history:
+                ordinal = self.bank.ordinal(str(row["question_id"]))
+                if ordinal is not None:
+                    entry.add(ordinal, bool(row["is_correct"]))
+            for ordinal, is_correct in entry.pending:
+                entry.add(ordinal, is_correct)
+            entry.pending.clear()
+            entry.loaded = True
+        return entry
+
+    def observe(self, user_id: str, question_id: str, is_correct: bool):
+        ordinal = self.bank.ordinal(question_id)
+        if ordinal is None:
+            return
+        with self._lock:
+            # Um usuário ainda não carregado guarda a resposta como pendente:
+            # ela pode não estar gravada no histórico quando ele for lido
+            entry = self._entry(user_id)
+            entry.add(ordinal, is_correct)
+            if not entry.loaded:
+                entry.pending.append((ordinal, is_correct))
+
+    def observe_answer(self, answer: Dict[str, Any]):
+        """Assinante do buffer de ingestão de respostas"""
+        self.observe(answer["user_id"], answer["question_id"], answer["is_correct"])
+
+    def answered(self, user_id: str) -> Bitset:
+        return self._loaded(user_id).answered
+
+    def wrong(self, user_id: str) -> Bitset:
+        return self._loaded(user_id).wrong
+
+    def review(self, user_id: str, category: Optional[str] = None) -> np.ndarray:
+        """Ordinais das questões ativas cuja última resposta do usuário foi errada"""
+        wrong = self.wrong(user_id)
+        pool = self.bank.stratum(category) if category else self.bank.filter()
+        return pool[wrong.contains(pool)] if len(pool) else pool
+
+    def unseen(self, user_id: str, category: Optional[str] = None) -> np.ndarray:
+        """Ordinais das questões ativas que o usuário ainda não respondeu"""
+        answered = self.answered(user_id)
+        pool = self.bank.stratum(category) if category else self.bank.filter()
+        return pool[~answered.contains(pool)] if len(pool) else pool
+
+    def progress(self, user_id: str) -> List[CategoryProgress]:
+        entry = self._loaded(user_id)
+        result = []
+        for category in self.bank.categories():
+            pool = self.bank.stratum(category)
+            if not len(pool):
+                continue
+            result.append(CategoryProgress(
+                category=category,
+                total=len(pool),
+                answered=int(entry.answered.contains(pool).sum()),
+                wrong=int(entry.wrong.contains(pool).sum()),
+            ))
+        return result
+
+
+# Instância compartilhada pela API
+user_history = UserHistoryCache()
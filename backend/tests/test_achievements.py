@@ -0,0 +1,132 @@
+"""
+Test cases for the incremental achievement engine
+"""
+
+import pytest
+
+from services.achievements import AchievementEngine, compile_requirements
+from services.question_bank import QuestionBank
+
+ACHIEVEMENTS = [
+    {"id": "first", "name": "First Steps", "requirements": {"questions_answered": 1}},
+    {"id": "ten", "name": "Getting Started", "requirements": {"questions_answered": 10}},
+    {"id": "streak", "name": "Perfectionist", "requirements": {"correct_streak": 3}},
+    {"id": "week", "name": "Week Warrior", "requirements": {"daily_streak": 3}},
+    {"id": "speed", "name": "Speed Demon", "requirements": {"answer_time_seconds": 10}},
+    {"id": "civil", "name": "Civil Law Expert", "requirements": {"category_correct": {"Direito Civil": 2}}},
+    {"id": "off", "name": "Disabled", "requirements": {"questions_answered": 1}, "is_active": False},
+    {"id": "bad", "name": "Broken", "requirements": {"unknown_metric": 1}},
+]
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.rows = []
+
+    def __call__(self, rows):
+        self.rows.extend(rows)
+
+
+def make_engine(history=(), unlocked=()):
+    bank = QuestionBank()
+    bank.load([{"id": f"civ-{i}", "category": "Direito Civil"} for i in range(5)]
+              + [{"id": f"pen-{i}", "category": "Direito Penal"} for i in range(5)])
+    writer = RecordingWriter()
+    engine = AchievementEngine(
+        bank,
+        history_loader=lambda user_id: list(history),
+        unlocked_loader=lambda user_id: list(unlocked),
+        writer=writer,
+    )
+    engine.load(ACHIEVEMENTS)
+    return engine, writer
+
+
+def answer(question_id, is_correct=True, day="2026-05-01", time=None, answer_id=None):
+    return {"id": answer_id, "user_id": "u1", "question_id": question_id, "is_correct": is_correct,
+            "time_taken_seconds": time, "answered_at": f"{day}T12:00:00+00:00"}
+
+
+def unlocked_ids(writer):
+    return sorted(row["achievement_id"] for row in writer.rows)
+
+
+def test_compile_requirements():
+    assert compile_requirements({"category_correct": {"Direito Civil": 50}}) == [
+        ("category_correct:Direito Civil", 50.0)]
+    with pytest.raises(ValueError):
+        compile_requirements({"unknown_metric": 1})
+    # Um requisito desconhecido tira a conquista inteira, não só a condição
+    engine, _ = make_engine()
+    assert engine.load(ACHIEVEMENTS + [
+        {"id": "mixed", "name": "Mixed", "requirements": {"questions_answered": 1, "unknown_metric": 1}}
+    ]) == 6
+
+
+def test_rules_fire_as_counters_cross_thresholds():
+    engine, writer = make_engine()
+    engine.observe_answer(answer("civ-0", time=30))
+    assert engine.flush().users_loaded == 1
+    assert unlocked_ids(writer) == ["first"]
+
+    engine.observe_answer(answer("civ-1", day="2026-05-02", time=8))
+    engine.observe_answer(answer("pen-0", is_correct=False, day="2026-05-03"))
+    engine.observe_answer(answer("pen-1", day="2026-05-03"))
+    assert engine.flush().unlocked == 3
+    assert unlocked_ids(writer) == ["civil", "first", "speed", "week"]
+
+    # Sequência de acertos foi zerada pelo erro; mais dois acertos completam 3
+    engine.observe_answer(answer("pen-2", day="2026-05-03"))
+    assert engine.flush().unlocked == 0
+    engine.observe_answer(answer("pen-3", day="2026-05-03"))
+    engine.flush()
+    assert "streak" in unlocked_ids(writer) and len(writer.rows) == 5
+
+
+def test_history_seeds_counters_without_double_counting():
+    history = [answer(f"pen-{i % 5}", answer_id=f"h{i}") for i in range(9)]
+    engine, writer = make_engine(history=history, unlocked=[{"achievement_id": "first"}])
+    # h8 também chegou pelo buffer antes da leitura do histórico
+    engine.observe_answer(answer("pen-3", answer_id="h8"))
+    engine.flush()
+    # 9 respostas: "ten" ainda não; "first" já estava gravada
+    assert unlocked_ids(writer) == ["streak"]
+    engine.observe_answer(answer("pen-4"))
+    engine.flush()
+    assert unlocked_ids(writer) == ["streak", "ten"]
+
+
+def test_failed_write_keeps_unlocks():
+    engine, writer = make_engine()
+
+    def failing(rows):
+        raise RuntimeError("database unavailable")
+
+    engine.writer = failing
+    engine.observe_answer(answer("civ-0"))
+    with pytest.raises(RuntimeError):
+        engine.flush()
+    assert engine.pending_unlocks == 1
+    engine.writer = writer
+    assert engine.flush().unlocked == 1
+
+
+class RejectedRow(Exception):
+    code = "23503"
+
+
+def test_rejected_unlocks_are_dropped():
+    engine, writer = make_engine()
+
+    def rejecting(rows):
+        if any(row["user_id"] == "ghost" for row in rows):
+            raise RejectedRow("user_achievements_user_id_fkey")
+        writer(rows)
+
+    engine.writer = rejecting
+    engine.observe_answer(answer("civ-0"))
+    engine.observe_answer(dict(answer("civ-1"), user_id="ghost"))
+    assert engine.flush().unlocked == 1
+    assert engine.pending_unlocks == 0 and engine.rejected == 1
+    assert [row["user_id"] for row in writer.rows] == ["u1"]
+
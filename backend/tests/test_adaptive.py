@@ -0,0 +1,126 @@
+"""
+Test cases for adaptive (CAT) question selection
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from services.adaptive import AdaptiveSelector, adaptive_selector
+from services.irt import information
+from services.question_bank import QuestionBank, question_bank
+
+client = TestClient(app)
+
+
+def make_bank():
+    bank = QuestionBank()
+    rows = [{"id": f"civ-{i}", "category": "Direito Civil", "difficulty_level": "medium",
+             "correct_answer": "A"} for i in range(40)]
+    rows.append({"id": "pen-0", "category": "Direito Penal", "correct_answer": "B"})
+    bank.load(rows)
+    return bank
+
+
+def parameters():
+    # Dificuldades de -3.9 a 3.9, mesma discriminação
+    return [{"question_id": f"civ-{i}", "irt_discrimination": 1.5, "irt_difficulty": -3.9 + 0.2 * i}
+            for i in range(40)]
+
+
+def test_picks_most_informative_unseen_item():
+    selector = AdaptiveSelector(make_bank())
+    assert selector.load(parameters()) == 40
+    pick = selector.next_question("u1", "Direito Civil")
+    # Habilidade inicial 0: a questão mais próxima de b = 0 é civ-19/20 (b = -0.1 / 0.1)
+    assert selector.bank.question_id(pick.ordinal) in ("civ-19", "civ-20")
+    assert np.isclose(pick.information, information(1.5, 0.1, 0.0), atol=0.05)
+
+    selector.observe("u1", selector.bank.question_id(pick.ordinal), True)
+    second = selector.next_question("u1", "Direito Civil")
+    assert second.ordinal != pick.ordinal
+
+
+def test_ability_moves_with_answers():
+    selector = AdaptiveSelector(make_bank())
+    selector.load(parameters())
+    for i in range(15, 25):
+        selector.observe("strong", f"civ-{i}", True)
+        selector.observe("weak", f"civ-{i}", False)
+    strong = selector.ability("strong", "Direito Civil")
+    weak = selector.ability("weak", "Direito Civil")
+    assert strong.theta > 1.0 > -1.0 > weak.theta
+    assert strong.answered == 10 and strong.standard_error < 1.0
+
+    bank = selector.bank
+    hard_pick = bank.question_id(selector.next_question("strong", "Direito Civil").ordinal)
+    easy_pick = bank.question_id(selector.next_question("weak", "Direito Civil").ordinal)
+    assert int(hard_pick.split("-")[1]) > 24 and int(easy_pick.split("-")[1]) < 15
+    # A outra disciplina não é afetada
+    assert selector.ability("strong", "Direito Penal").answered == 0
+
+
+def test_history_is_loaded_once_without_double_counting():
+    calls = []
+
+    def loader(user_id):
+        calls.append(user_id)
+        return [{"id": "a1", "question_id": "civ-0", "is_correct": True},
+                {"id": "a2", "question_id": "civ-1", "is_correct": False},
+                {"id": "a3", "question_id": "pen-0", "is_correct": True}]
+
+    selector = AdaptiveSelector(make_bank(), history_loader=loader)
+    selector.load(parameters())
+    # a2 ainda estava no buffer de ingestão quando foi observada
+    selector.observe("u1", "civ-1", False, answer_id="a2")
+    assert selector.ability("u1", "Direito Civil").answered == 2
+    assert selector.ability("u1", "Direito Penal").answered == 1
+    assert calls == ["u1"]
+
+
+def test_seen_questions_survive_a_bank_reload():
+    bank = QuestionBank()
+    rows = [{"id": f"civ-{i}", "category": "Direito Civil"} for i in range(3)]
+    bank.load(rows)
+    selector = AdaptiveSelector(bank)
+    selector.load([])
+    for question_id in ("civ-0", "civ-1"):
+        selector.observe("u1", question_id, True)
+
+    # Uma prova mais recente entra na frente e desloca todos os ordinais
+    bank.load([{"id": "new", "category": "Direito Civil", "exam_year": 2025}] + rows)
+    # Antes de os pools serem refeitos, a escolha já usa os ordinais novos
+    pick = selector.next_question("u1", "Direito Civil")
+    assert bank.question_id(pick.ordinal) == "civ-2"
+    selector.load([])
+    assert bank.question_id(selector.next_question("u1", "Direito Civil").ordinal) == "new"
+    selector.observe("u1", "new", True)
+    assert bank.question_id(selector.next_question("u1", "Direito Civil").ordinal) == "civ-2"
+    assert selector.ability("u1", "Direito Civil").answered == 3
+
+
+def test_exhausted_category_returns_none():
+    selector = AdaptiveSelector(make_bank())
+    selector.load([])
+    selector.observe("u1", "pen-0", True)
+    assert selector.next_question("u1", "Direito Penal") is None
+    assert selector.next_question("u1", "Direito Tributário") is None
+
+
+def test_next_endpoint():
+    question_bank.load([{"id": "q-next", "category": "Direito Civil", "correct_answer": "C"}])
+    adaptive_selector.load([])
+    try:
+        response = client.get("/api/v1/questions/next",
+                              params={"user_id": "u-next", "category": "Direito Civil"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["question"]["id"] == "q-next" and body["ability"]["answered"] == 0
+
+        adaptive_selector.observe("u-next", "q-next", True)
+        done = client.get("/api/v1/questions/next",
+                          params={"user_id": "u-next", "category": "Direito Civil"})
+        assert done.status_code == 404
+    finally:
+        question_bank.load([])
+        adaptive_selector.load([])
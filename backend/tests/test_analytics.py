@@ -0,0 +1,110 @@
+"""
+Test cases for the daily-rollup analytics
+"""
+
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.analytics import (
+    CATEGORY_TABLE,
+    DAILY_TABLE,
+    AnalyticsService,
+    analytics_service,
+    period_start,
+)
+
+client = TestClient(app)
+
+TODAY = date(2026, 3, 10)
+
+BUCKETS = {
+    DAILY_TABLE: [
+        {"day": "2026-03-04", "answered": 4, "correct": 1, "time_spent_seconds": 200},
+        {"day": "2026-03-09", "answered": 10, "correct": 8, "time_spent_seconds": 600},
+        {"day": "2026-03-10", "answered": 3, "correct": 3, "time_spent_seconds": 90},
+    ],
+    CATEGORY_TABLE: [
+        {"day": "2026-03-04", "category": "Direito Penal", "answered": 4, "correct": 1, "time_spent_seconds": 200},
+        {"day": "2026-03-09", "category": "Direito Civil", "answered": 6, "correct": 5, "time_spent_seconds": 400},
+        {"day": "2026-03-09", "category": "Direito Penal", "answered": 4, "correct": 3, "time_spent_seconds": 200},
+        {"day": "2026-03-10", "category": "Direito Civil", "answered": 3, "correct": 3, "time_spent_seconds": 90},
+    ],
+}
+
+
+def make_loader(reads):
+    def loader(table, user_id, since):
+        reads.append((table, since))
+        return [row for row in BUCKETS[table] if row["day"] >= since.isoformat()]
+    return loader
+
+
+def test_period_start():
+    assert period_start("7d", TODAY) == date(2026, 3, 4)
+    assert period_start("1y", TODAY) == date(2025, 3, 11)
+    with pytest.raises(ValueError):
+        period_start("2w", TODAY)
+
+
+def test_activity_reads_one_row_per_day():
+    reads = []
+    service = AnalyticsService(loader=make_loader(reads))
+    days = service.activity("u1", "7d", today=TODAY)
+    assert reads == [(DAILY_TABLE, date(2026, 3, 4))]
+    assert [d.key for d in days][0] == "2026-03-04" and len(days) == 7
+    assert [d.answered for d in days] == [4, 0, 0, 0, 0, 10, 3]
+    assert days[-2].accuracy == 80 and days[1].accuracy == 0
+
+    civil = service.activity("u1", "7d", category="Direito Civil", today=TODAY)
+    assert [d.answered for d in civil] == [0, 0, 0, 0, 0, 6, 3]
+
+
+def test_overview_and_performance():
+    service = AnalyticsService(loader=make_loader([]))
+    overview = service.overview("u1", "30d", today=TODAY)
+    assert (overview.totals.answered, overview.totals.correct) == (17, 12)
+    assert overview.totals.time_spent_seconds == 890 and overview.totals.accuracy == 71
+    assert [(c.key, c.answered, c.correct) for c in overview.categories] == [
+        ("Direito Civil", 9, 8), ("Direito Penal", 8, 4)
+    ]
+    assert len(overview.activity) == 30
+
+    last_week = service.performance("u1", "7d", today=date(2026, 3, 11))
+    assert [(c.key, c.answered) for c in last_week] == [("Direito Civil", 9), ("Direito Penal", 4)]
+
+    filtered = service.overview("u1", "30d", category="Direito Penal", today=TODAY)
+    assert filtered.totals.answered == 8
+    assert [c.key for c in filtered.categories] == ["Direito Penal"]
+
+
+def test_analytics_without_loader_is_empty():
+    service = AnalyticsService()
+    assert service.performance("u1") == []
+    assert sum(d.answered for d in service.activity("u1", "7d")) == 0
+
+
+def test_analytics_endpoints():
+    analytics_service.configure(make_loader([]))
+    try:
+        overview = client.get("/api/v1/analytics/overview", params={"user_id": "u1", "period": "90d"})
+        assert overview.status_code == 200
+        body = overview.json()
+        assert set(body) >= {"totalQuestions", "answeredQuestions", "correctAnswers", "accuracyRate",
+                             "subjectPerformance", "recentActivity"}
+        assert len(body["recentActivity"]) == 90
+
+        performance = client.get("/api/v1/analytics/performance", params={"user_id": "u1", "period": "1y"})
+        assert performance.status_code == 200
+        assert {p["subject"] for p in performance.json()} == {"Direito Civil", "Direito Penal"}
+
+        activity = client.get("/api/v1/analytics/activity", params={"user_id": "u1", "limit": 5})
+        assert activity.status_code == 200 and len(activity.json()) == 5
+        assert set(activity.json()[0]) >= {"date", "questionsAnswered", "accuracy"}
+
+        invalid = client.get("/api/v1/analytics/activity", params={"user_id": "u1", "period": "2w"})
+        assert invalid.status_code == 422
+    finally:
+        analytics_service.configure(None)
@@ -0,0 +1,160 @@
+"""
+Test cases for the write-behind answer ingestion buffer
+"""
+
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.answer_ingestion import AnswerIngestionBuffer, AnswerJournal, answer_buffer
+from services.question_bank import question_bank
+
+client = TestClient(app)
+
+
+USER_ID = "8d5e2f0a-4b7c-4e1d-9a3f-2c6b1e0d7f45"
+
+
+class RecordingWriter:
+    def __init__(self, fail=False, poison=()):
+        self.batches = []
+        self.fail = fail
+        self.poison = set(poison)
+
+    def __call__(self, batch):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        if any(a["question_id"] in self.poison for a in batch):
+            raise RejectedBatch()
+        self.batches.append(batch)
+
+
+class RejectedBatch(Exception):
+    code = "23503"
+
+
+def test_flush_groups_answers_per_user():
+    writer = RecordingWriter()
+    buffer = AnswerIngestionBuffer(writer=writer, batch_rows=4)
+    for i in range(3):
+        buffer.record("u1", f"q{i}", "A", True)
+        buffer.record("u2", f"q{i}", "B", False)
+    buffer.record("u3", "q0", "C", True)
+
+    report = buffer.flush()
+    assert (report.answers, report.users) == (7, 3)
+    # u1's three answers stay together; u2 and u3 share the next batch
+    assert [[a["user_id"] for a in batch] for batch in writer.batches] == [
+        ["u1", "u1", "u1"], ["u2", "u2", "u2", "u3"]
+    ]
+    assert buffer.pending == 0
+    assert buffer.flush().answers == 0
+
+
+def test_failed_flush_keeps_answers_and_journal(tmp_path):
+    writer = RecordingWriter(fail=True)
+    buffer = AnswerIngestionBuffer(writer=writer, journal=AnswerJournal(tmp_path))
+    first = buffer.record("u1", "q1", "A", True)
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert buffer.pending == 1
+
+    second = buffer.record("u1", "q2", "B", False)
+    writer.fail = False
+    assert buffer.flush().answers == 2
+    assert [a["id"] for a in writer.batches[0]] == [first["id"], second["id"]]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rejected_rows_are_quarantined(tmp_path):
+    writer = RecordingWriter(poison={"q-missing"})
+    buffer = AnswerIngestionBuffer(writer=writer, journal=AnswerJournal(tmp_path))
+    for i in range(6):
+        buffer.record("u1", f"q{i}", "A", True)
+    poison = buffer.record("u2", "q-missing", "A", True)
+
+    report = buffer.flush()
+    assert (report.answers, report.rejected) == (6, 1)
+    assert buffer.pending == 0 and buffer.answers_rejected == 1
+    assert sorted(a["question_id"] for batch in writer.batches for a in batch) == [f"q{i}" for i in range(6)]
+    # Só a linha recusada fica guardada, fora dos segmentos reprocessados
+    assert [p.name for p in tmp_path.iterdir()] == [AnswerJournal.REJECTED]
+    assert poison["id"] in (tmp_path / AnswerJournal.REJECTED).read_text()
+    assert AnswerJournal(tmp_path).recover()[0] == []
+
+
+def test_recover_replays_unflushed_journal(tmp_path):
+    crashed = AnswerIngestionBuffer(writer=RecordingWriter(), journal=AnswerJournal(tmp_path))
+    answers = [crashed.record("u1", f"q{i}", "A", i % 2 == 0) for i in range(3)]
+    crashed.journal.close()
+
+    writer = RecordingWriter()
+    restarted = AnswerIngestionBuffer(writer=writer, journal=AnswerJournal(tmp_path))
+    seen, persisted = [], []
+    restarted.subscribe(seen.append)
+    restarted.subscribe(persisted.append, persisted=True)
+    assert restarted.recover() == 3
+    assert len(seen) == 3 and persisted == []
+    restarted.flush()
+    assert sorted(a["id"] for a in writer.batches[0]) == sorted(a["id"] for a in answers)
+    assert len(persisted) == 3
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_journal_syncs_once_per_group(tmp_path, monkeypatch):
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+    journal = AnswerJournal(tmp_path, sync=True)
+    buffer = AnswerIngestionBuffer(writer=RecordingWriter(), journal=journal)
+
+    for i in range(50):
+        buffer.record("u1", f"q{i}", "A", True)
+    # Registrar não faz fsync: um commit cobre as 50 respostas
+    assert fsyncs == [] and journal.dirty
+    assert journal.commit() and len(fsyncs) == 1
+    assert not journal.commit() and len(fsyncs) == 1
+
+    buffer.record("u1", "q50", "A", True)
+    assert buffer.flush().answers == 51
+    assert len(fsyncs) == 2 and not journal.dirty
+
+
+def test_run_loop_commits_the_journal(tmp_path):
+    journal = AnswerJournal(tmp_path, sync=True, sync_interval=0.01)
+    buffer = AnswerIngestionBuffer(journal=journal, flush_interval=60)
+
+    async def main():
+        task = asyncio.create_task(buffer.run())
+        await asyncio.sleep(0)
+        buffer.record("u1", "q1", "A", True)
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(main())
+    assert journal.syncs == 1 and not journal.dirty
+    journal.close()
+
+
+def test_answer_endpoint_grades_and_buffers():
+    question_bank.load([{"id": "q-answer", "category": "Direito Civil", "correct_answer": "C"}])
+    try:
+        before = answer_buffer.pending
+        response = client.post(
+            "/api/v1/questions/q-answer/answer",
+            json={"user_id": USER_ID, "selected_answer": "c", "time_taken_seconds": 42},
+        )
+        assert response.status_code == 202
+        body = response.json()
+        assert body["is_correct"] is True and body["correct_answer"] == "C"
+        assert answer_buffer.pending == before + 1
+
+        missing = client.post("/api/v1/questions/nope/answer", json={"user_id": USER_ID, "selected_answer": "A"})
+        assert missing.status_code == 404
+        invalid = client.post("/api/v1/questions/q-answer/answer", json={"user_id": "u1", "selected_answer": "A"})
+        assert invalid.status_code == 422
+    finally:
+        question_bank.load([])
@@ -0,0 +1,86 @@
+"""
+Test cases for stratified simulado assembly
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.assembly import (
+    OAB_PRIMEIRA_FASE,
+    Quota,
+    SimuladoAssembler,
+    apportion,
+    build_quotas,
+)
+from services.question_bank import QuestionBank, question_bank
+
+client = TestClient(app)
+
+
+def make_rows():
+    rows = []
+    for category in ("Direito Civil", "Direito Penal"):
+        for level in ("easy", "medium", "hard"):
+            for i in range(10):
+                rows.append({"id": f"{category[8:]}-{level}-{i}", "category": category,
+                             "exam_year": 2024, "difficulty_level": level, "tags": [],
+                             "is_active": True})
+    return rows
+
+
+@pytest.fixture
+def assembler():
+    bank = QuestionBank()
+    bank.load(make_rows())
+    return SimuladoAssembler(bank)
+
+
+def test_apportion_sums_to_total():
+    assert sum(apportion(80, list(OAB_PRIMEIRA_FASE.values()))) == 80
+    assert apportion(80, list(OAB_PRIMEIRA_FASE.values())) == list(OAB_PRIMEIRA_FASE.values())
+    assert apportion(10, [1, 1, 1]) == [4, 3, 3]
+
+
+def test_build_quotas_with_difficulty_mix():
+    quotas = build_quotas(20, ["Direito Civil"], "Difícil")
+    assert sum(q.count for q in quotas) == 20
+    assert {q.difficulty: q.count for q in quotas} == {"easy": 2, "medium": 6, "hard": 12}
+
+
+def test_assemble_fills_quotas_without_repeats(assembler):
+    result = assembler.assemble([Quota("Direito Civil", 5, "hard"), Quota("Direito Penal", 8)], seed=1)
+    assert len(result.question_ids) == 13
+    assert len(set(result.question_ids)) == 13
+    assert all(qid.startswith("Civil-hard") for qid in result.question_ids[:5])
+    assert result.shortfall == {}
+
+
+def test_assemble_excludes_seen_and_falls_back(assembler):
+    seen = [f"Civil-hard-{i}" for i in range(8)]
+    result = assembler.assemble([Quota("Direito Civil", 5, "hard")], exclude=seen, seed=2)
+    assert not set(seen) & set(result.question_ids)
+    assert len(result.question_ids) == 5
+    assert sum(qid.startswith("Civil-hard") for qid in result.question_ids) == 2
+
+
+def test_assemble_reports_shortfall(assembler):
+    result = assembler.assemble([Quota("Direito Civil", 40), Quota("Direito Tributário", 3)])
+    assert len(result.question_ids) == 30
+    assert result.shortfall == {"Direito Civil": 10, "Direito Tributário": 3}
+
+
+def test_montar_route():
+    question_bank.load(make_rows())
+    try:
+        response = client.post("/api/v1/simulados/montar", json={
+            "titulo": "Treino", "tipo": "Customizado", "questoes": 12, "tempo": 30,
+            "disciplinas": ["Direito Civil", "Direito Penal"], "dificuldade": "Média",
+            "descricao": "Treino rápido"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["questoes"]) == 12
+        assert data["faltantes"] == {}
+    finally:
+        question_bank.load([])
@@ -0,0 +1,50 @@
+"""
+Test cases for the periodic IRT calibration refresh
+"""
+
+from services.adaptive import AdaptiveSelector
+from services.calibration import CalibrationRefresher
+from services.question_bank import QuestionBank
+from services.question_stats import MIN_ATTEMPTS_FOR_LEVEL, QuestionStatsAggregator
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, rows, level_changes):
+        self.calls.append((rows, level_changes))
+
+
+def test_refresh_applies_calibration_to_every_service():
+    bank = QuestionBank()
+    bank.load([{"id": f"q{i}", "category": "Direito Civil", "difficulty_level": "medium"} for i in range(3)])
+    writer = RecordingWriter()
+    aggregator = QuestionStatsAggregator(writer=writer, bank=bank)
+    aggregator.load([], levels=bank.difficulty_levels())
+    selector = AdaptiveSelector(bank)
+    selector.load([])
+
+    rows = [{"question_id": "q0", "irt_discrimination": 1.5, "irt_difficulty": 2.0}]
+    refresher = CalibrationRefresher(bank, aggregator, selector, loader=lambda: rows)
+    assert refresher.refresh() == 1
+
+    assert bank.difficulty_levels()["q0"] == "hard"
+    assert selector._difficulty[bank.ordinal("q0")] == 2.0
+    # A questão calibrada não é mais reclassificada pelas estatísticas ao vivo
+    for _ in range(MIN_ATTEMPTS_FOR_LEVEL):
+        aggregator.observe("q0", True)
+        aggregator.observe("q1", True)
+    aggregator.flush()
+    assert writer.calls[-1][1] == {"easy": ["q1"]}
+
+    # Sem a calibração na próxima leitura, a questão volta às estatísticas ao vivo
+    rows.clear()
+    assert refresher.refresh() == 0
+    aggregator.observe("q0", True)
+    aggregator.flush()
+    assert writer.calls[-1][1] == {"easy": ["q0"]}
+
+
+def test_refresh_without_loader_is_noop():
+    assert CalibrationRefresher(QuestionBank(), QuestionStatsAggregator(), AdaptiveSelector(QuestionBank())).refresh() == 0
@@ -0,0 +1,99 @@
+"""
+Test cases for the SM-2 flashcard scheduler
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.flashcards import CardSchedule, FlashcardScheduler, flashcard_scheduler, sm2
+
+client = TestClient(app)
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def iso(days: float) -> str:
+    return (NOW + timedelta(days=days)).isoformat()
+
+
+def test_sm2_intervals():
+    card = CardSchedule("c1", due_at=0)
+    t = NOW.timestamp()
+    card = sm2(card, 5, t)
+    assert (card.interval_days, card.repetitions) == (1.0, 1)
+    card = sm2(card, 4, t)
+    assert card.interval_days == 6.0
+    card = sm2(card, 4, t)
+    assert card.interval_days == round(6 * card.ease_factor)
+    lapsed = sm2(card, 1, t)
+    assert (lapsed.interval_days, lapsed.repetitions, lapsed.lapses) == (1.0, 0, 1)
+    assert lapsed.ease_factor >= 1.3 and lapsed.review_count == 4
+
+
+def test_due_queue_and_forecast():
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return [
+            {"id": "new", "next_review_at": None},
+            {"id": "late", "next_review_at": iso(-3)},
+            {"id": "soon", "next_review_at": iso(0.25)},
+            {"id": "tomorrow", "next_review_at": iso(1)},
+            {"id": "later", "next_review_at": iso(1.1)},
+        ]
+
+    writes = []
+    scheduler = FlashcardScheduler(loader=loader, writer=lambda card_id, fields: writes.append(card_id))
+    summary = scheduler.due("u1", now=NOW)
+    assert summary.due_now == 2 and [c.card_id for c in summary.cards] == ["new", "late"]
+    assert summary.forecast["2026-03-10"] == 3 and summary.forecast["2026-03-11"] == 2
+
+    card = scheduler.review("u1", "late", 5, reviewed_at=NOW)
+    assert card.next_review_at == NOW + timedelta(days=1) and writes == ["late"]
+    summary = scheduler.due("u1", now=NOW)
+    assert summary.due_now == 1 and summary.forecast["2026-03-11"] == 3
+    assert scheduler.due("u1", now=NOW + timedelta(hours=7)).due_now == 2
+    assert scheduler.review("u1", "missing", 3) is None
+    assert loads == ["u1"]
+
+
+def test_add_and_remove_cards():
+    scheduler = FlashcardScheduler()
+    scheduler.add("u1", "a")
+    scheduler.add("u1", "b", due_at=NOW + timedelta(days=2))
+    assert scheduler.due("u1", now=NOW).due_now == 1
+    scheduler.remove("u1", "a")
+    summary = scheduler.due("u1", now=NOW, forecast_days=3)
+    assert summary.due_now == 0 and list(summary.forecast.values()) == [0, 0, 1]
+
+
+def test_deck_is_reloaded_after_ttl():
+    cards = [{"id": "a", "next_review_at": None}]
+    clock = [0.0]
+    scheduler = FlashcardScheduler(loader=lambda user_id: list(cards), deck_ttl=60, clock=lambda: clock[0])
+    assert scheduler.due("u1", now=NOW).due_now == 1
+    # Cartão criado direto no banco: só aparece quando a fila vence
+    cards.append({"id": "b", "next_review_at": None})
+    clock[0] = 59
+    assert scheduler.due("u1", now=NOW).due_now == 1
+    clock[0] = 60
+    assert scheduler.due("u1", now=NOW).due_now == 2
+
+
+def test_flashcard_endpoints():
+    flashcard_scheduler.load("u-cards", [{"id": "card-1", "category": "Direito Civil"}])
+    response = client.get("/api/v1/flashcards/due", params={"user_id": "u-cards"})
+    assert response.status_code == 200
+    assert response.json()["due_now"] == 1
+
+    reviewed = client.post("/api/v1/flashcards/card-1/review", json={"user_id": "u-cards", "grade": 4})
+    assert reviewed.status_code == 200 and reviewed.json()["interval_days"] == 1.0
+    assert client.get("/api/v1/flashcards/due", params={"user_id": "u-cards"}).json()["due_now"] == 0
+
+    missing = client.post("/api/v1/flashcards/nope/review", json={"user_id": "u-cards", "grade": 4})
+    assert missing.status_code == 404
+    invalid = client.post("/api/v1/flashcards/card-1/review", json={"user_id": "u-cards", "grade": 9})
+    assert invalid.status_code == 422
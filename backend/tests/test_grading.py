@@ -0,0 +1,69 @@
+"""
+Test cases for the vectorized grading engine
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.grading import GradingEngine, compile_answer_key
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def engine():
+    engine = GradingEngine()
+    engine.register(
+        1,
+        ["A", "B", "C", "D", "*"],
+        ["Civil", "Civil", "Penal", "Penal", "Ética"],
+    )
+    return engine
+
+
+def test_grade_counts_per_discipline(engine):
+    result = engine.grade(1, {"1": "A", "2": "C", "3": "c", 4: "D"})
+    assert result.acertos == 4  # 3 certas + 1 anulada
+    assert result.total == 5
+    assert result.nota == 80
+    assert result.por_disciplina == {
+        "Civil": {"acertos": 1, "total": 2},
+        "Penal": {"acertos": 2, "total": 2},
+        "Ética": {"acertos": 1, "total": 1},
+    }
+
+
+def test_blank_answers_are_wrong(engine):
+    result = engine.grade(1, {})
+    assert result.acertos == 1
+
+
+def test_invalid_submissions(engine):
+    with pytest.raises(ValueError):
+        engine.grade(1, {"6": "A"})
+    with pytest.raises(ValueError):
+        engine.grade(1, {"1": "Z"})
+    with pytest.raises(KeyError):
+        engine.grade(2, {})
+
+
+def test_compile_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        compile_answer_key(["A", "B"], ["Civil"])
+
+
+def test_submeter_route_grades_submission():
+    response = client.post("/api/v1/simulados/submeter", json={
+        "simulado_id": 9, "respostas": {"1": "A"}, "tempo_gasto": 30
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 15
+    assert 0 <= data["nota"] <= 100
+    assert "Ética Profissional" in data["disciplinas"]
+
+    response = client.post("/api/v1/simulados/submeter", json={
+        "simulado_id": 999, "respostas": {}, "tempo_gasto": 30
+    })
+    assert response.status_code == 404
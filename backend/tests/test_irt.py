@@ -0,0 +1,59 @@
+"""
+Test cases for the 2PL IRT calibration
+"""
+
+import numpy as np
+
+from services.irt import (
+    calibrate_2pl,
+    difficulty_level,
+    information,
+    probability,
+    response_matrices,
+)
+
+
+def simulate(n_users=3000, n_items=40, density=0.3, seed=3):
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(size=n_users)
+    a = rng.lognormal(0.0, 0.3, size=n_items)
+    b = rng.normal(size=n_items)
+    n = int(n_users * n_items * density)
+    users = rng.integers(0, n_users, n)
+    items = rng.integers(0, n_items, n)
+    correct = rng.random(n) < probability(a[items], b[items], theta[users])
+    right, wrong = response_matrices(users, items, correct, n_users, n_items)
+    return right, wrong, a, b
+
+
+def test_recovers_item_parameters():
+    right, wrong, a, b = simulate()
+    result = calibrate_2pl(right, wrong)
+    assert result.converged
+    assert np.corrcoef(result.difficulty, b)[0, 1] > 0.97
+    assert np.corrcoef(result.discrimination, a)[0, 1] > 0.8
+
+
+def test_partial_refit_keeps_fixed_items():
+    right, wrong, a, b = simulate()
+    fit = np.zeros(len(b), dtype=bool)
+    fit[:5] = True
+    start_b = b.copy()
+    start_b[:5] = 0.0
+    result = calibrate_2pl(right, wrong, discrimination=a, difficulty=start_b, fit=fit)
+    np.testing.assert_array_equal(result.difficulty[5:], b[5:])
+    np.testing.assert_array_equal(result.discrimination[5:], a[5:])
+    assert np.max(np.abs(result.difficulty[:5] - b[:5])) < 0.5
+
+
+def test_chunked_e_step_matches_single_chunk():
+    right, wrong, _, _ = simulate(n_users=500)
+    whole = calibrate_2pl(right, wrong, max_iter=5)
+    chunked = calibrate_2pl(right, wrong, max_iter=5, chunk_users=64)
+    np.testing.assert_allclose(whole.difficulty, chunked.difficulty)
+
+
+def test_information_peaks_at_difficulty():
+    thetas = np.linspace(-3, 3, 61)
+    assert abs(thetas[np.argmax(information(1.5, 0.4, thetas))] - 0.4) < 1e-9
+    assert difficulty_level(-1.0) == "easy" and difficulty_level(1.0) == "hard"
@@ -30,11 +30,12 @@ def test_api_status():
 
 
 def test_questions_endpoint():
-    """Test the questions endpoint placeholder"""
+    """Test the questions listing endpoint"""
     response = client.get("/api/v1/questions")
     assert response.status_code == 200
     data = response.json()
-    assert "message" in data
+    assert "data" in data
+    assert "meta" in data
 
 
 def test_login_endpoint():
@@ -59,3 +60,39 @@ def test_essay_correction_endpoint():
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
+
+
+def test_simulados_cursor_pagination():
+    """Test keyset pagination walks every item exactly once"""
+    seen = []
+    cursor = None
+    while True:
+        params = {"pagination": "cursor", "limit": 4, "include_total": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/simulados/disponiveis", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["meta"]["approximateTotal"] == 10
+        seen.extend(item["id"] for item in data["data"])
+        cursor = data["meta"]["nextCursor"]
+        if not data["meta"]["hasNextPage"]:
+            assert cursor is None
+            break
+    assert seen == list(range(1, 11))
+
+
+def test_simulados_realizados_cursor_descending():
+    """Test cursor pagination on the newest-first history"""
+    first = client.get("/api/v1/simulados/realizados", params={"pagination": "cursor", "limit": 2}).json()
+    assert [item["id"] for item in first["data"]] == [1, 2]
+    assert "approximateTotal" not in first["meta"] or first["meta"]["approximateTotal"] is None
+    second = client.get("/api/v1/simulados/realizados", params={"cursor": first["meta"]["nextCursor"], "limit": 2}).json()
+    assert [item["id"] for item in second["data"]] == [3, 4]
+    assert second["meta"]["hasPrevPage"] is True
+
+
+def test_simulados_invalid_cursor():
+    """Test an invalid cursor is rejected"""
+    response = client.get("/api/v1/simulados/realizados", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
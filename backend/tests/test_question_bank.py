@@ -0,0 +1,75 @@
+"""
+Test cases for the in-memory question bank
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.question_bank import QuestionBank, question_bank
+
+client = TestClient(app)
+
+ROWS = [
+    {"id": "q1", "category": "Direito Civil", "exam_year": 2023, "difficulty_level": "easy",
+     "tags": ["súmula"], "is_active": True},
+    {"id": "q2", "category": "Direito Penal", "exam_year": 2024, "difficulty_level": "hard",
+     "tags": ["lei"], "is_active": True},
+    {"id": "q3", "category": "Direito Civil", "exam_year": 2024, "difficulty_level": "medium",
+     "tags": ["lei", "súmula"], "is_active": True},
+    {"id": "q4", "category": "Direito Civil", "exam_year": 2024, "difficulty_level": "medium",
+     "tags": [], "is_active": False},
+    {"id": "q5", "category": None, "exam_year": None, "difficulty_level": None,
+     "tags": None, "is_active": True},
+]
+
+
+@pytest.fixture
+def bank():
+    bank = QuestionBank()
+    bank.load(ROWS)
+    return bank
+
+
+def ids(bank, ordinals):
+    return [row["id"] for row in bank.rows(ordinals)]
+
+
+def test_listing_order_and_inactive_filter(bank):
+    assert ids(bank, bank.filter()) == ["q2", "q3", "q1", "q5"]
+    assert "q4" in ids(bank, bank.filter(include_inactive=True))
+
+
+def test_combined_filters(bank):
+    assert ids(bank, bank.filter(category="Direito Civil")) == ["q3", "q1"]
+    assert ids(bank, bank.filter(category="Direito Civil", exam_year=2024)) == ["q3"]
+    assert ids(bank, bank.filter(tag="lei", difficulty="hard")) == ["q2"]
+    assert ids(bank, bank.filter(tag="súmula", exam_year=2023)) == ["q1"]
+
+
+def test_unknown_values_return_empty(bank):
+    assert len(bank.filter(category="Direito Espacial")) == 0
+    assert len(bank.filter(exam_year=1999)) == 0
+    assert len(bank.filter(difficulty="extreme")) == 0
+    assert len(bank.filter(tag="inexistente")) == 0
+
+
+def test_missing_columns_get_defaults(bank):
+    row = bank.rows([bank.ordinal("q5")])[0]
+    assert row["category"] is None
+    assert row["exam_year"] is None
+    assert row["difficulty_level"] == "medium"
+    assert row["tags"] == []
+
+
+def test_questions_route_filters_and_paginates():
+    question_bank.load(ROWS)
+    try:
+        response = client.get("/api/v1/questions", params={"category": "Direito Civil", "limit": 1})
+        assert response.status_code == 200
+        data = response.json()
+        assert [q["id"] for q in data["data"]] == ["q3"]
+        assert data["meta"]["totalItems"] == 2
+        assert data["meta"]["hasNextPage"] is True
+    finally:
+        question_bank.load([])
@@ -0,0 +1,144 @@
+"""
+Test cases for the incremental question_stats aggregator
+"""
+
+import pytest
+
+from services.answer_ingestion import AnswerIngestionBuffer
+from services.question_bank import QuestionBank
+from services.question_stats import (
+    MIN_ATTEMPTS_FOR_LEVEL,
+    QuestionStatsAggregator,
+    difficulty_level,
+    difficulty_rating,
+)
+
+
+class RecordingWriter:
+    def __init__(self, poison=()):
+        self.calls = []
+        self.fail = False
+        self.poison = set(poison)
+
+    def __call__(self, rows, level_changes):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        if any(row["question_id"] in self.poison for row in rows):
+            raise RejectedRow()
+        self.calls.append((rows, level_changes))
+
+
+def test_welford_mean_and_counts():
+    writer = RecordingWriter()
+    aggregator = QuestionStatsAggregator(writer=writer)
+    aggregator.load([{"question_id": "q1", "total_attempts": 4, "correct_attempts": 3,
+                      "average_time_seconds": 60}])
+    aggregator.observe("q1", True, 90)
+    aggregator.observe("q1", False, None)
+    aggregator.observe("q2", False, 30)
+
+    assert aggregator.flush().questions == 2
+    rows = {row["question_id"]: row for row in writer.calls[0][0]}
+    # (4 * 60 + 90) / 5 timed attempts
+    assert rows["q1"]["average_time_seconds"] == 66
+    assert (rows["q1"]["total_attempts"], rows["q1"]["correct_attempts"]) == (6, 4)
+    assert rows["q2"]["difficulty_rating"] == difficulty_rating(1, 0)
+    # Nothing dirty after a flush: no write
+    assert aggregator.flush().questions == 0 and len(writer.calls) == 1
+
+
+def test_difficulty_level_changes_only_after_enough_attempts():
+    writer = RecordingWriter()
+    aggregator = QuestionStatsAggregator(writer=writer)
+    aggregator.load([], levels={"q1": "medium"})
+    for _ in range(MIN_ATTEMPTS_FOR_LEVEL - 1):
+        aggregator.observe("q1", False)
+    aggregator.flush()
+    assert writer.calls[-1][1] == {}
+
+    aggregator.observe("q1", False)
+    report = aggregator.flush()
+    assert report.level_changes == 1 and writer.calls[-1][1] == {"hard": ["q1"]}
+    aggregator.observe("q1", False)
+    aggregator.flush()
+    assert writer.calls[-1][1] == {}
+
+
+def test_failed_flush_keeps_rows_dirty():
+    writer = RecordingWriter()
+    writer.fail = True
+    aggregator = QuestionStatsAggregator(writer=writer)
+    aggregator.observe("q1", True, 10)
+    with pytest.raises(RuntimeError):
+        aggregator.flush()
+    assert aggregator.dirty == 1
+    writer.fail = False
+    assert aggregator.flush().questions == 1
+
+
+class RejectedRow(Exception):
+    code = "23503"
+
+
+def test_rejected_rows_are_dropped_not_retried():
+    writer = RecordingWriter(poison={"q-deleted"})
+    aggregator = QuestionStatsAggregator(writer=writer)
+    for question_id in ("q1", "q2", "q-deleted", "q3"):
+        for _ in range(MIN_ATTEMPTS_FOR_LEVEL):
+            aggregator.observe(question_id, False)
+
+    report = aggregator.flush()
+    assert (report.questions, report.rejected, report.level_changes) == (3, 1, 3)
+    assert aggregator.dirty == 0 and aggregator.rejected == 1
+    written = sorted(row["question_id"] for rows, _ in writer.calls for row in rows)
+    assert written == ["q1", "q2", "q3"]
+    # Cada chamada leva só as mudanças de nível das próprias linhas
+    for rows, level_changes in writer.calls:
+        assert sorted(level_changes.get("hard", [])) == sorted(row["question_id"] for row in rows)
+    assert aggregator.flush().questions == 0
+
+def test_fed_by_answer_buffer_after_persistence():
+    def answer_writer(batch):
+        if any(a["user_id"] == "ghost" for a in batch):
+            raise RejectedRow()
+
+    aggregator = QuestionStatsAggregator()
+    buffer = AnswerIngestionBuffer(writer=answer_writer)
+    buffer.subscribe(aggregator.observe_answer, persisted=True)
+    buffer.record("u1", "q1", "A", True, time_taken_seconds=40)
+    buffer.record("u2", "q1", "B", False, time_taken_seconds=20)
+    buffer.record("ghost", "q1", "B", False, time_taken_seconds=20)
+    # Nada é contado antes da gravação
+    assert aggregator.snapshot("q1") is None
+    buffer.flush()
+    stats = aggregator.snapshot("q1")
+    assert (stats["total_attempts"], stats["correct_attempts"], stats["average_time_seconds"]) == (2, 1, 30)
+
+
+def test_level_change_reaches_question_bank():
+    bank = QuestionBank()
+    bank.load([{"id": "q1", "category": "Direito Civil", "difficulty_level": "medium"}])
+    aggregator = QuestionStatsAggregator(writer=RecordingWriter(), bank=bank)
+    aggregator.load([], levels=bank.difficulty_levels())
+    for _ in range(MIN_ATTEMPTS_FOR_LEVEL):
+        aggregator.observe("q1", False)
+    aggregator.flush()
+    assert bank.difficulty_levels() == {"q1": "hard"}
+    assert list(bank.stratum("Direito Civil", "hard")) == [0]
+    assert len(bank.stratum("Direito Civil", "medium")) == 0
+
+
+def test_rating_buckets():
+    assert difficulty_level(difficulty_rating(100, 90)) == "easy"
+    assert difficulty_level(difficulty_rating(100, 50)) == "medium"
+    assert difficulty_level(difficulty_rating(100, 10)) == "hard"
+    assert difficulty_rating(0, 0) == 0.5
+
+
+def test_calibrated_questions_keep_their_level():
+    writer = RecordingWriter()
+    aggregator = QuestionStatsAggregator(writer=writer)
+    aggregator.load([{"question_id": "q1", "total_attempts": 50, "correct_attempts": 45,
+                      "irt_difficulty": 0.8}], levels={"q1": "hard"})
+    aggregator.observe("q1", True)
+    assert aggregator.flush().level_changes == 0
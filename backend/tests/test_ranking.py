@@ -0,0 +1,80 @@
+"""
+Test cases for the Fenwick-tree ranking service
+"""
+
+import random
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.ranking import RankingService, ScoreRanking
+
+client = TestClient(app)
+
+
+def brute_force(scores, score):
+    higher = sum(1 for s in scores if round(s * 100) > round(score * 100))
+    return higher + 1
+
+
+def test_rank_matches_brute_force():
+    rng = random.Random(7)
+    scores = [round(rng.uniform(0, 100), 2) for _ in range(500)]
+    ranking = ScoreRanking()
+    for score in scores:
+        ranking.add(score)
+    for score in (0, 12.5, 50, 73.21, 100):
+        assert ranking.rank(score).posicao == brute_force(scores, score)
+    assert ranking.rank(100).total_participantes == 500
+
+
+def test_rebuild_equals_incremental():
+    scores = [10, 20, 20, 55.5, 99.99, 100]
+    incremental = ScoreRanking()
+    for score in scores:
+        incremental.add(score)
+    rebuilt = ScoreRanking()
+    rebuilt.rebuild(scores)
+    for score in (0, 20, 55.5, 100):
+        assert rebuilt.rank(score) == incremental.rank(score)
+
+
+def test_percentile_and_retake():
+    ranking = ScoreRanking()
+    for score in (40, 60, 80, 100):
+        ranking.add(score)
+    info = ranking.rank(80)
+    assert (info.posicao, info.total_participantes, info.percentil) == (2, 4, 50.0)
+
+    ranking.add(90, previous_score=40)
+    assert ranking.total == 4
+    assert ranking.rank(80).posicao == 3
+
+
+def test_service_rebuild_groups_by_simulado():
+    service = RankingService()
+    assert service.rebuild([("a", "u1", 50), ("a", "u2", 70), ("b", "u1", 10)]) == 3
+    assert service.rank("a", 60).posicao == 2
+    assert service.rank("b", 60).posicao == 1
+
+
+def test_one_attempt_per_user_and_shared_keys():
+    service = RankingService()
+    # Retake de u1 no simulado 3: só a última nota conta
+    service.rebuild([(3, "u1", 40), (3, "u2", 60), (3, "u1", 90)])
+    assert service.rank("3", 50).total_participantes == 2
+    assert service.rank(3, 80).posicao == 2
+
+    # Submissão ao vivo com id int cai no mesmo ranking e substitui a anterior
+    info = service.record(3, 30, user_id="u2")
+    assert (info.posicao, info.total_participantes) == (2, 2)
+    assert service.record("3", 95, user_id="u3").total_participantes == 3
+    assert service.record(3, 10).total_participantes == 4
+
+
+def test_ranking_route():
+    response = client.get("/api/v1/simulados/3/ranking", params={"nota": 50})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["posicao"] >= 1
+    assert "percentil" in data
@@ -0,0 +1,110 @@
+"""
+Test cases for the TTL+LRU response cache
+"""
+
+from fastapi.testclient import TestClient
+
+import routes.cache
+from main import app
+from services.question_bank import question_bank
+from services.response_cache import ENTRY_OVERHEAD_BYTES, ResponseCache, cache_key, response_cache
+from services.search import search_index
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_is_canonical():
+    a = cache_key("/x/{id}", {"id": "1"}, [("b", "2"), ("a", "1")])
+    b = cache_key("/x/{id}", {"id": "1"}, [("a", "1"), ("b", "2")])
+    assert a == b
+    assert a != cache_key("/x/{id}", {"id": "2"}, [("a", "1"), ("b", "2")])
+
+
+def test_ttl_and_counters():
+    clock = FakeClock()
+    cache = ResponseCache(default_ttl=10, clock=clock)
+    assert cache.get("k") is None
+    cache.set("k", b"{}")
+    assert cache.get("k").body == b"{}"
+    clock.now = 10
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations, stats.entries) == (1, 2, 1, 0)
+
+
+def test_lru_eviction_is_bounded_by_bytes():
+    entry = 100 + 1 + ENTRY_OVERHEAD_BYTES
+    cache = ResponseCache(max_bytes=entry * 2)
+    cache.set("a", b"x" * 100)
+    cache.set("b", b"x" * 100)
+    cache.get("a")
+    cache.set("c", b"x" * 100)
+    assert cache.get("b") is None and cache.get("a") is not None
+    stats = cache.stats()
+    assert stats.evictions == 1 and stats.bytes == entry * 2
+    assert not cache.set("big", b"x" * entry * 2)
+
+
+def test_tag_invalidation_and_generation():
+    cache = ResponseCache()
+    cache.set("list", b"[]", tags=["simulados"])
+    cache.set("one", b"{}", tags=["simulados", "simulado:1"])
+    cache.set("q", b"[]", tags=["questions"])
+    assert cache.invalidate("simulado:1") == 1
+    assert cache.get("one") is None and cache.get("list") is not None
+    generation = cache.generation
+    assert cache.invalidate("simulados") == 1
+    # Resposta calculada antes da invalidação não é gravada
+    assert not cache.set("list", b"[]", tags=["simulados"], generation=generation)
+    assert cache.get("q") is not None and cache.stats().invalidations == 2
+
+
+def test_catalog_routes_served_from_cache(monkeypatch):
+    response_cache.clear()
+    first = client.get("/api/v1/simulados/disponiveis", params={"limit": 2})
+    second = client.get("/api/v1/simulados/disponiveis", params={"limit": 2})
+    assert first.headers["X-Cache"] == "MISS" and second.headers["X-Cache"] == "HIT"
+    assert first.content == second.content
+    assert client.get("/api/v1/simulados/3").headers["X-Cache"] == "MISS"
+    assert client.get("/api/v1/simulados/3").headers["X-Cache"] == "HIT"
+    assert client.get("/api/v1/simulados/999").status_code == 404
+    assert client.get("/api/v1/simulados/999").status_code == 404
+
+    monkeypatch.setenv("CACHE_ADMIN_TOKEN", "secret")
+    denied = client.post("/api/v1/cache/invalidate", json={"tags": ["simulado:3"]})
+    assert denied.status_code == 403
+    invalidated = client.post(
+        "/api/v1/cache/invalidate", json={"tags": ["simulado:3"]}, headers={"X-Admin-Token": "secret"}
+    )
+    assert invalidated.json()["invalidated"] == 1
+    assert client.get("/api/v1/simulados/3").headers["X-Cache"] == "MISS"
+    assert client.get("/api/v1/simulados/disponiveis", params={"limit": 2}).headers["X-Cache"] == "HIT"
+
+    stats = client.get("/api/v1/cache/stats").json()
+    assert stats["hits"] >= 3 and stats["misses"] >= 3 and stats["entries"] >= 2
+    response_cache.clear()
+
+
+def test_questions_invalidation_reloads_bank(monkeypatch):
+    rows = [{"id": "q-new", "category": "Direito Civil", "correct_answer": "A", "is_active": True}]
+    monkeypatch.setenv("CACHE_ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(routes.cache, "get_supabase_client", lambda: object())
+    monkeypatch.setattr(question_bank, "load_from_supabase", lambda client: question_bank.load(rows))
+    monkeypatch.setattr(search_index, "refresh_from_supabase", lambda client: 0)
+    try:
+        response = client.post(
+            "/api/v1/cache/invalidate", json={"tags": ["questions"]}, headers={"X-Admin-Token": "secret"}
+        )
+        assert response.status_code == 200 and response.json()["reloaded_questions"] == 1
+        assert question_bank.ordinal("q-new") == 0
+    finally:
+        question_bank.load([])
+
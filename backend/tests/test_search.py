@@ -0,0 +1,100 @@
+"""
+Test cases for the Portuguese full-text search index
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.search import SearchIndex, analyze, fold_accents, search_index
+
+client = TestClient(app)
+
+ROWS = [
+    {"id": "q1", "question_text": "Sobre a usucapião extraordinária de bem imóvel",
+     "explanation": "Prazo da usucapião previsto no Código Civil", "category": "Direito Civil",
+     "exam_year": 2022, "updated_at": "2025-01-01T00:00:00"},
+    {"id": "q2", "question_text": "Cabe habeas corpus contra prisão ilegal?",
+     "explanation": None, "category": "Direito Processual Penal", "exam_year": 2023,
+     "updated_at": "2025-01-02T00:00:00"},
+    {"id": "q3", "question_text": "Usucapiões especiais urbanas e rurais",
+     "explanation": "", "category": "Direito Civil", "exam_year": 2023,
+     "updated_at": "2025-01-03T00:00:00"},
+]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.build(ROWS)
+    return index
+
+
+def test_analyzer_folds_accents_and_stems():
+    assert fold_accents("Usucapião") == "usucapiao"
+    assert analyze("usucapião") == analyze("Usucapiões")
+    assert analyze("a de o") == []
+
+
+def test_bm25_ranking_and_facets(index):
+    result = index.search("usucapiao")
+    assert [hit.id for hit in result.hits] == ["q1", "q3"]
+    assert result.facets["categories"] == {"Direito Civil": 2}
+    assert result.facets["years"] == {"2022": 1, "2023": 1}
+
+
+def test_facet_filters(index):
+    assert [hit.id for hit in index.search("usucapião", exam_year=2023).hits] == ["q3"]
+    assert index.search("usucapião", category="Direito Penal").total == 0
+
+
+def test_incremental_reindex_and_deactivate(index):
+    index.add_documents([
+        {"id": "q2", "question_text": "Mandado de segurança", "category": "Direito Constitucional",
+         "exam_year": 2024, "updated_at": "2025-02-01T00:00:00"},
+        {"id": "q3", "question_text": "Usucapião", "is_active": False},
+    ])
+    assert index.search("habeas corpus").total == 0
+    assert [hit.id for hit in index.search("mandado").hits] == ["q2"]
+    assert [hit.id for hit in index.search("usucapião").hits] == ["q1"]
+    assert index.size == 2
+    assert index.watermark == "2025-02-01T00:00:00"
+
+
+def test_search_during_reindex_sees_a_consistent_index(index):
+    # A busca segura o snapshot anterior enquanto uma carga monta o próximo
+    before = index._snapshot
+    index.add_documents([{"id": f"n{i}", "question_text": "Usucapião familiar"} for i in range(50)])
+    assert index._snapshot is not before
+    assert len(before.ids) == len(before.doc_norm) == 3 and before.alive.all()
+    assert index.search("usucapião", limit=100).total == 52
+
+    errors = []
+
+    def reindex():
+        try:
+            for i in range(30):
+                index.add_documents([{"id": f"n{i}", "question_text": f"Usucapião {i}"}])
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=reindex)
+    thread.start()
+    while thread.is_alive():
+        assert index.search("usucapião", limit=100).total == 52
+    thread.join()
+    assert not errors
+
+
+def test_search_route():
+    search_index.build(ROWS)
+    try:
+        response = client.get("/api/v1/questions/search", params={"q": "habeas corpus"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["data"][0]["id"] == "q2"
+        assert data["total"] == 1
+    finally:
+        search_index.clear()
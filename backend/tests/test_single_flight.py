@@ -0,0 +1,158 @@
+"""
+Test cases for single-flight request coalescing
+"""
+
+import asyncio
+
+import pytest
+
+from services.assembly import Quota, SimuladoAssembler
+from services.question_bank import QuestionBank
+from services.single_flight import SingleFlight, SingleFlightTimeout
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def main():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("k", compute) for _ in range(50)))
+        assert all(r is results[0] for r in results)
+        assert len(flights) == 0
+        # Terminada a execução, a próxima chamada calcula de novo
+        await flights.do("k", compute)
+        return flights.stats()
+
+    stats = asyncio.run(main())
+    assert len(calls) == 2
+    assert (stats.leaders, stats.followers) == (2, 49)
+
+
+def test_errors_propagate_to_every_caller():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(main()))
+
+
+def test_timeout_releases_only_the_slow_caller():
+    async def main():
+        flights = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flights.do("k", slow))
+        await started.wait()
+        with pytest.raises(SingleFlightTimeout):
+            await flights.do("k", slow, timeout=0.001)
+        # O líder não é afetado pela desistência do seguidor
+        assert await leader == "done"
+        assert flights.stats().timeouts == 1
+
+    asyncio.run(main())
+
+
+def test_leader_ignores_timeout():
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        flights = SingleFlight()
+        assert await flights.do("k", slow, timeout=0.001) == "done"
+        assert flights.stats().timeouts == 0
+
+    asyncio.run(main())
+
+
+def test_timed_out_follower_does_not_cancel_the_flight():
+    async def main():
+        flights = SingleFlight()
+        state = {"finished": False}
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            state["finished"] = True
+
+        leader = asyncio.create_task(flights.do("k", slow))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flights.do("k", slow, timeout=0.01))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(SingleFlightTimeout):
+            await follower
+        # Ninguém mais espera, mas a execução termina (ex.: para gravar no cache)
+        await asyncio.sleep(0.06)
+        assert state["finished"] and len(flights) == 0
+
+    asyncio.run(main())
+
+
+def test_cancellation_propagates_when_nobody_waits():
+    async def main():
+        flights = SingleFlight()
+        state = {"cancelled": False}
+
+        async def slow():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        a = asyncio.create_task(flights.do("k", slow))
+        b = asyncio.create_task(flights.do("k", slow))
+        await asyncio.sleep(0.01)
+        a.cancel()
+        await asyncio.sleep(0.01)
+        # Ainda há quem espere: a execução continua
+        assert not state["cancelled"] and len(flights) == 1
+        b.cancel()
+        await asyncio.sleep(0.01)
+        assert state["cancelled"] and len(flights) == 0
+
+    asyncio.run(main())
+
+
+def test_assembly_coalesced_returns_same_simulado():
+    bank = QuestionBank()
+    bank.load([{"id": f"q{i}", "category": "Direito Civil", "difficulty_level": "medium"} for i in range(30)])
+    assembler = SimuladoAssembler(bank)
+    quotas = [Quota("Direito Civil", 5)]
+
+    async def main():
+        return await asyncio.gather(
+            *(assembler.assemble_coalesced(("u1", tuple(quotas)), quotas) for _ in range(5))
+        )
+
+    results = asyncio.run(main())
+    assert len({tuple(r.question_ids) for r in results}) == 1
+    assert assembler.flights.stats().leaders == 1
+
+
+def test_assembly_without_key_is_not_coalesced():
+    bank = QuestionBank()
+    bank.load([{"id": f"q{i}", "category": "Direito Civil", "difficulty_level": "medium"} for i in range(30)])
+    assembler = SimuladoAssembler(bank)
+    quotas = [Quota("Direito Civil", 5)]
+
+    async def main():
+        return await asyncio.gather(*(assembler.assemble_coalesced(None, quotas) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(results) == 5 and all(len(r.question_ids) == 5 for r in results)
+    assert assembler.flights.stats().leaders == 0
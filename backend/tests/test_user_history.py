@@ -0,0 +1,145 @@
+"""
+Test cases for the per-user answered/wrong bitsets
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from services.assembly import Quota, SimuladoAssembler
+from services.question_bank import QuestionBank, question_bank
+from services.adaptive import AdaptiveSelector
+from services.user_history import Bitset, SharedHistoryLoader, UserHistoryCache, user_history
+
+client = TestClient(app)
+
+
+def make_bank():
+    bank = QuestionBank()
+    bank.load([{"id": f"{cat}-{i}", "category": cat, "exam_year": 2024}
+               for cat in ("Direito Civil", "Direito Penal") for i in range(20)])
+    return bank
+
+
+def test_bitset_operations():
+    bits = Bitset(20)
+    for ordinal in (0, 7, 8, 19):
+        bits.add(ordinal)
+    bits.discard(7)
+    assert 8 in bits and 7 not in bits and 25 not in bits
+    assert len(bits) == 3 and list(bits) == [0, 8, 19]
+    np.testing.assert_array_equal(bits.contains(np.array([0, 1, 19])), [True, False, True])
+
+
+def test_history_loaded_once_and_latest_answer_wins():
+    calls = []
+
+    def loader(user_id):
+        calls.append(user_id)
+        return [
+            {"question_id": "Direito Civil-1", "is_correct": True, "answered_at": "2026-01-02"},
+            {"question_id": "Direito Civil-1", "is_correct": False, "answered_at": "2026-01-01"},
+            {"question_id": "Direito Civil-2", "is_correct": False, "answered_at": "2026-01-01"},
+        ]
+
+    cache = UserHistoryCache(make_bank(), history_loader=loader)
+    # Resposta ainda no buffer de ingestão: corrige a questão 2
+    cache.observe("u1", "Direito Civil-2", True)
+    cache.observe("u1", "Direito Penal-0", False)
+    bank = cache.bank
+    assert sorted(bank.question_id(o) for o in cache.answered("u1")) == [
+        "Direito Civil-1", "Direito Civil-2", "Direito Penal-0"]
+    assert [bank.question_id(o) for o in cache.review("u1")] == ["Direito Penal-0"]
+    assert len(cache.review("u1", "Direito Civil")) == 0
+    cache.observe("u1", "Direito Civil-1", False)
+    assert [bank.question_id(o) for o in cache.review("u1", "Direito Civil")] == ["Direito Civil-1"]
+    assert calls == ["u1"]
+
+    progress = {p.category: p for p in cache.progress("u1")}
+    assert (progress["Direito Civil"].answered, progress["Direito Civil"].wrong) == (2, 1)
+    assert progress["Direito Penal"].total == 20 and len(cache.unseen("u1", "Direito Penal")) == 19
+
+
+def test_shared_loader_reads_history_once_per_user():
+    bank = QuestionBank()
+    bank.load([{"id": f"q{i}", "category": "Direito Civil"} for i in range(4)])
+    reads = []
+
+    def loader(user_id):
+        reads.append(user_id)
+        return [{"id": "h1", "question_id": "q1", "is_correct": False, "answered_at": "2026-01-01"}]
+
+    clock = [0.0]
+    shared = SharedHistoryLoader(loader, ttl=60, clock=lambda: clock[0])
+    cache = UserHistoryCache(bank, history_loader=shared.consumer("history"))
+    selector = AdaptiveSelector(bank, history_loader=shared.consumer("adaptive"))
+    selector.load([])
+    assert list(cache.review("u1")) == [1]
+    selector.ability("u1", "Direito Civil")
+    assert reads == ["u1"]
+    clock[0] = 60
+    shared("u1")
+    assert reads == ["u1", "u1"]
+    # Sem consumidor, uma leitura já terminada não é reaproveitada
+    shared("u1")
+    assert reads == ["u1", "u1", "u1"]
+
+
+def test_shared_loader_rereads_for_a_consumer_that_lost_its_state():
+    bank = QuestionBank()
+    bank.load([{"id": f"q{i}", "category": "Direito Civil"} for i in range(4)])
+    history = [{"id": "h1", "question_id": "q1", "is_correct": False, "answered_at": "2026-01-01"}]
+    reads = []
+
+    def loader(user_id):
+        reads.append(user_id)
+        return list(history)
+
+    shared = SharedHistoryLoader(loader, ttl=60, clock=lambda: 0.0)
+    cache = UserHistoryCache(bank, history_loader=shared.consumer("history"))
+    assert list(cache.review("u1")) == [1]
+    # Resposta gravada depois da leitura: chega ao cache pelo buffer
+    cache.observe("u1", "q2", False)
+    history.append({"id": "h2", "question_id": "q2", "is_correct": False, "answered_at": "2026-01-02"})
+
+    # A recarga do banco descarta os bitsets; a releitura não pode usar a leitura antiga
+    bank.load([{"id": f"q{i}", "category": "Direito Civil"} for i in range(4)])
+    assert list(cache.review("u1")) == [1, 2]
+    assert reads == ["u1", "u1"]
+
+
+def test_lru_evicts_and_bank_reload_invalidates():
+    cache = UserHistoryCache(make_bank(), max_users=2)
+    for user in ("a", "b", "c"):
+        cache.observe(user, "Direito Civil-0", True)
+    assert len(cache.answered("a")) == 0 and len(cache.answered("c")) == 1
+    cache.bank.load([{"id": "Direito Civil-0", "category": "Direito Civil"}])
+    assert len(cache.answered("c")) == 0
+
+
+def test_assembler_excludes_answered_bitset():
+    bank = make_bank()
+    cache = UserHistoryCache(bank)
+    for i in range(18):
+        cache.observe("u1", f"Direito Civil-{i}", True)
+    result = SimuladoAssembler(bank).assemble(
+        [Quota("Direito Civil", 5)], exclude=cache.answered("u1"), seed=1
+    )
+    assert sorted(result.question_ids) == ["Direito Civil-18", "Direito Civil-19"]
+    assert result.shortfall == {"Direito Civil": 3}
+
+
+def test_review_and_progress_endpoints():
+    question_bank.load([{"id": f"q{i}", "category": "Direito Civil"} for i in range(3)])
+    try:
+        user_history.observe("u-review", "q1", False)
+        user_history.observe("u-review", "q2", True)
+        review = client.get("/api/v1/questions/review", params={"user_id": "u-review"})
+        assert review.status_code == 200
+        assert [q["id"] for q in review.json()["data"]] == ["q1"]
+
+        progress = client.get("/api/v1/questions/progress", params={"user_id": "u-review"}).json()
+        assert (progress["answered"], progress["wrong"]) == (2, 1)
+        assert progress["categories"][0]["total"] == 3
+    finally:
+        question_bank.load([])
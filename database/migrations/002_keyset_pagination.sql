@@ -0,0 +1,25 @@
+-- Migration: Keyset (cursor) pagination support
+-- Cursor pages are served with WHERE (sort key) < (:cursor) ORDER BY ... LIMIT,
+-- so every page is an index range scan regardless of depth.
+
+-- /simulados/realizados: user's completed attempts, newest first
+CREATE INDEX IF NOT EXISTS idx_user_simulations_user_completed_keyset
+    ON public.user_simulations(user_id, completed_at DESC, id DESC)
+    WHERE status = 'completed';
+
+-- /simulados/disponiveis: public simulations ordered by creation
+CREATE INDEX IF NOT EXISTS idx_simulations_public_keyset
+    ON public.simulations(created_at, id)
+    WHERE is_public = true;
+
+-- Approximate row count from planner statistics (replaces COUNT(*) for the
+-- approximateTotal of cursor pages)
+CREATE OR REPLACE FUNCTION approximate_row_count(table_name TEXT)
+RETURNS BIGINT AS $$
+    SELECT GREATEST(c.reltuples, 0)::BIGINT
+    FROM pg_catalog.pg_class c
+    WHERE c.oid = to_regclass(table_name);
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION approximate_row_count(TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION approximate_row_count(TEXT) TO service_role;
@@ -0,0 +1,25 @@
+-- Migration: Server-side question_stats seeding
+-- Creates the missing question_stats rows with one INSERT ... SELECT instead of
+-- reading every question id into the client and inserting it back in batches.
+-- Called through PostgREST as rpc('seed_question_stats').
+
+CREATE OR REPLACE FUNCTION seed_question_stats()
+RETURNS INTEGER AS $$
+DECLARE
+    created INTEGER;
+BEGIN
+    INSERT INTO public.question_stats (question_id)
+    SELECT q.id
+    FROM public.questions q
+    WHERE NOT EXISTS (
+        SELECT 1 FROM public.question_stats s WHERE s.question_id = q.id
+    )
+    ON CONFLICT (question_id) DO NOTHING;
+
+    GET DIAGNOSTICS created = ROW_COUNT;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION seed_question_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION seed_question_stats() TO service_role;
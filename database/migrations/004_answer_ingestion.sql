@@ -0,0 +1,85 @@
+-- Migration: Write-behind answer ingestion
+-- The API buffers answers per user and sends them in batches to
+-- ingest_answers(): one multi-row INSERT into user_question_history and one
+-- user_stats upsert per user per batch, instead of an INSERT plus a row-level
+-- trigger upsert for every answer.
+
+-- Rows inserted by ingest_answers() already have their stats applied in bulk
+CREATE OR REPLACE FUNCTION update_user_stats_after_answer()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('simulai.batch_ingestion', true) = 'on' THEN
+        RETURN NEW;
+    END IF;
+
+    -- Update user stats
+    INSERT INTO public.user_stats (user_id, total_questions_answered, correct_answers, last_activity_at)
+    VALUES (NEW.user_id, 1, CASE WHEN NEW.is_correct THEN 1 ELSE 0 END, NOW())
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_questions_answered = user_stats.total_questions_answered + 1,
+        correct_answers = user_stats.correct_answers + CASE WHEN NEW.is_correct THEN 1 ELSE 0 END,
+        experience_points = user_stats.experience_points + CASE WHEN NEW.is_correct THEN 10 ELSE 2 END,
+        level = calculate_user_level(user_stats.experience_points + CASE WHEN NEW.is_correct THEN 10 ELSE 2 END),
+        last_activity_at = NOW(),
+        updated_at = NOW();
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Answers carry an id generated by the API, so replaying a batch after a
+-- crash is a no-op: only rows actually inserted are folded into user_stats.
+CREATE OR REPLACE FUNCTION ingest_answers(answers JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    inserted_count INTEGER;
+BEGIN
+    PERFORM set_config('simulai.batch_ingestion', 'on', true);
+
+    WITH inserted AS (
+        INSERT INTO public.user_question_history (
+            id, user_id, question_id, simulation_id, selected_answer, is_correct,
+            time_taken_seconds, confidence_level, answered_at
+        )
+        SELECT a.id, a.user_id, a.question_id, a.simulation_id, a.selected_answer, a.is_correct,
+               a.time_taken_seconds, a.confidence_level, COALESCE(a.answered_at, NOW())
+        FROM jsonb_to_recordset(answers) AS a(
+            id UUID, user_id UUID, question_id UUID, simulation_id UUID,
+            selected_answer TEXT, is_correct BOOLEAN, time_taken_seconds INTEGER,
+            confidence_level INTEGER, answered_at TIMESTAMPTZ
+        )
+        ON CONFLICT (id) DO NOTHING
+        RETURNING user_id, is_correct, answered_at
+    ),
+    deltas AS (
+        SELECT user_id,
+               COUNT(*) AS answered,
+               COUNT(*) FILTER (WHERE is_correct) AS correct,
+               SUM(CASE WHEN is_correct THEN 10 ELSE 2 END) AS xp,
+               MAX(answered_at) AS last_activity
+        FROM inserted
+        GROUP BY user_id
+    ),
+    upserted AS (
+        INSERT INTO public.user_stats AS us (
+            user_id, total_questions_answered, correct_answers, experience_points, level, last_activity_at
+        )
+        SELECT user_id, answered, correct, xp, calculate_user_level(xp::INTEGER), last_activity
+        FROM deltas
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_questions_answered = us.total_questions_answered + EXCLUDED.total_questions_answered,
+            correct_answers = us.correct_answers + EXCLUDED.correct_answers,
+            experience_points = us.experience_points + EXCLUDED.experience_points,
+            level = calculate_user_level(us.experience_points + EXCLUDED.experience_points),
+            last_activity_at = GREATEST(us.last_activity_at, EXCLUDED.last_activity_at),
+            updated_at = NOW()
+        RETURNING us.user_id
+    )
+    SELECT COALESCE(SUM(answered), 0) INTO inserted_count FROM deltas;
+
+    RETURN inserted_count;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION ingest_answers(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION ingest_answers(JSONB) TO service_role;
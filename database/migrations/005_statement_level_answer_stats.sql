@@ -0,0 +1,65 @@
+-- Migration: Statement-level user_stats trigger
+-- Replaces the FOR EACH ROW trigger on user_question_history (one user_stats
+-- upsert and one calculate_user_level call per answer) with a FOR EACH
+-- STATEMENT trigger that reads the inserted rows from a transition table and
+-- applies one upsert per user per INSERT statement.
+-- Benchmark against the row-level version: backend/benchmark_stats_trigger.py
+
+CREATE OR REPLACE FUNCTION update_user_stats_after_answers()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.user_stats AS us (
+        user_id, total_questions_answered, correct_answers, experience_points, level, last_activity_at
+    )
+    SELECT user_id,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE is_correct),
+           SUM(CASE WHEN is_correct THEN 10 ELSE 2 END),
+           calculate_user_level(SUM(CASE WHEN is_correct THEN 10 ELSE 2 END)::INTEGER),
+           COALESCE(MAX(answered_at), NOW())
+    FROM new_answers
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_questions_answered = us.total_questions_answered + EXCLUDED.total_questions_answered,
+        correct_answers = us.correct_answers + EXCLUDED.correct_answers,
+        experience_points = us.experience_points + EXCLUDED.experience_points,
+        level = calculate_user_level(us.experience_points + EXCLUDED.experience_points),
+        last_activity_at = GREATEST(us.last_activity_at, EXCLUDED.last_activity_at),
+        updated_at = NOW();
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_stats_after_answer ON public.user_question_history;
+DROP TRIGGER IF EXISTS update_stats_after_answers ON public.user_question_history;
+
+CREATE TRIGGER update_stats_after_answers
+    AFTER INSERT ON public.user_question_history
+    REFERENCING NEW TABLE AS new_answers
+    FOR EACH STATEMENT EXECUTE FUNCTION update_user_stats_after_answers();
+
+-- The trigger now folds each batch itself; ingest_answers() only inserts.
+-- ON CONFLICT DO NOTHING keeps replays out of the transition table.
+CREATE OR REPLACE FUNCTION ingest_answers(answers JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    inserted_count INTEGER;
+BEGIN
+    INSERT INTO public.user_question_history (
+        id, user_id, question_id, simulation_id, selected_answer, is_correct,
+        time_taken_seconds, confidence_level, answered_at
+    )
+    SELECT a.id, a.user_id, a.question_id, a.simulation_id, a.selected_answer, a.is_correct,
+           a.time_taken_seconds, a.confidence_level, COALESCE(a.answered_at, NOW())
+    FROM jsonb_to_recordset(answers) AS a(
+        id UUID, user_id UUID, question_id UUID, simulation_id UUID,
+        selected_answer TEXT, is_correct BOOLEAN, time_taken_seconds INTEGER,
+        confidence_level INTEGER, answered_at TIMESTAMPTZ
+    )
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS inserted_count = ROW_COUNT;
+    RETURN inserted_count;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
@@ -0,0 +1,19 @@
+-- Migration: IRT (2PL) item parameters
+-- Written by the nightly calibration job (backend/calibrate_irt.py).
+
+ALTER TABLE public.question_stats
+    ADD COLUMN IF NOT EXISTS irt_discrimination REAL,   -- a
+    ADD COLUMN IF NOT EXISTS irt_difficulty REAL,       -- b, on the ability (theta) scale
+    ADD COLUMN IF NOT EXISTS irt_responses INTEGER DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS irt_calibrated_at TIMESTAMPTZ;
+
+-- Last history row (created_at) seen by each incremental job
+CREATE TABLE IF NOT EXISTS public.calibration_watermarks (
+    job TEXT PRIMARY KEY,
+    watermark TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Questions answered since the watermark (user_id/question_id are already indexed)
+CREATE INDEX IF NOT EXISTS idx_user_history_created_at
+    ON public.user_question_history(created_at);
@@ -0,0 +1,29 @@
+-- Migration: Spaced-repetition state for flashcards
+-- SM-2 scheduling state (ease factor, current interval, consecutive
+-- successful reviews, lapses) used by backend/services/flashcards.py.
+-- The per-user due queue lives in memory; a user's active cards are read
+-- once with the (user_id, next_review_at) index, which also serves "due
+-- before" range queries run directly against the table.
+
+ALTER TABLE public.flashcards
+    ADD COLUMN IF NOT EXISTS ease_factor REAL DEFAULT 2.5,
+    ADD COLUMN IF NOT EXISTS interval_days REAL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS repetitions INTEGER DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS lapses INTEGER DEFAULT 0;
+
+-- Replaces the older index of the same name; skipped once the partial
+-- index exists, so re-running the migration does not rebuild it
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'public'
+          AND indexname = 'idx_flashcards_next_review'
+          AND indexdef LIKE '%(user_id, next_review_at) WHERE is_active'
+    ) THEN
+        DROP INDEX IF EXISTS public.idx_flashcards_next_review;
+        CREATE INDEX idx_flashcards_next_review
+            ON public.flashcards(user_id, next_review_at)
+            WHERE is_active;
+    END IF;
+END $$;
@@ -0,0 +1,176 @@
+-- Migration: Materialized per-user performance summary
+-- The user_performance view ran three correlated COUNT(*) subqueries per
+-- profile (flashcards, study_notes, user_achievements) and referenced
+-- user_stats columns that do not exist. The counts now live in
+-- user_performance_summary, kept current by statement-level triggers on the
+-- three tables (one upsert per user per statement, as in migration 005), and
+-- the view becomes primary-key joins.
+-- repair_user_performance_summary() recomputes the counts with grouped scans
+-- and fixes any drift (scripts/repair_user_performance.py, run nightly).
+-- Safe to re-run: triggers, backfill and the view rebuild are skipped once
+-- in place.
+
+CREATE TABLE IF NOT EXISTS public.user_performance_summary (
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE PRIMARY KEY,
+    total_flashcards INTEGER NOT NULL DEFAULT 0,
+    total_notes INTEGER NOT NULL DEFAULT 0,
+    total_achievements INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE public.user_performance_summary ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own performance summary" ON public.user_performance_summary;
+CREATE POLICY "Users can view own performance summary" ON public.user_performance_summary
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- TG_ARGV[0] is the summary column; affected rows arrive in the changed_rows
+-- transition table (NEW TABLE on INSERT, OLD TABLE on DELETE)
+CREATE OR REPLACE FUNCTION bump_user_performance_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format(
+            'INSERT INTO public.user_performance_summary AS s (user_id, %1$I)
+             SELECT user_id, COUNT(*) FROM changed_rows GROUP BY user_id
+             ON CONFLICT (user_id) DO UPDATE SET
+                 %1$I = s.%1$I + EXCLUDED.%1$I,
+                 updated_at = NOW()',
+            TG_ARGV[0]
+        );
+    ELSE
+        EXECUTE format(
+            'UPDATE public.user_performance_summary s SET
+                 %1$I = GREATEST(s.%1$I - d.n, 0),
+                 updated_at = NOW()
+             FROM (SELECT user_id, COUNT(*) AS n FROM changed_rows GROUP BY user_id) d
+             WHERE s.user_id = d.user_id',
+            TG_ARGV[0]
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Created only when missing: re-running the migration takes no table locks
+DO $$
+DECLARE
+    spec RECORD;
+BEGIN
+    FOR spec IN
+        SELECT * FROM (VALUES
+            ('flashcards', 'INSERT', 'NEW', 'total_flashcards'),
+            ('flashcards', 'DELETE', 'OLD', 'total_flashcards'),
+            ('study_notes', 'INSERT', 'NEW', 'total_notes'),
+            ('study_notes', 'DELETE', 'OLD', 'total_notes'),
+            ('user_achievements', 'INSERT', 'NEW', 'total_achievements'),
+            ('user_achievements', 'DELETE', 'OLD', 'total_achievements')
+        ) AS t(table_name, event, transition, summary_column)
+    LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgrelid = format('public.%I', spec.table_name)::regclass
+              AND tgname = format('%s_summary_%s', spec.table_name, lower(spec.event))
+        ) THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER %s ON public.%I REFERENCING %s TABLE AS changed_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION bump_user_performance_summary(%L)',
+                format('%s_summary_%s', spec.table_name, lower(spec.event)),
+                spec.event, spec.table_name, spec.transition, spec.summary_column
+            );
+        END IF;
+    END LOOP;
+END $$;
+
+-- Recomputes the counts with grouped aggregates (one scan per table) and
+-- writes only the rows that drifted; returns how many were fixed
+CREATE OR REPLACE FUNCTION repair_user_performance_summary()
+RETURNS INTEGER AS $$
+DECLARE
+    repaired INTEGER;
+BEGIN
+    -- Waits for transactions whose triggers already bumped a summary row and
+    -- blocks new bumps until commit; under READ COMMITTED the counts below
+    -- then see every committed row, so absolute values cannot overwrite a
+    -- concurrent increment
+    LOCK TABLE public.user_performance_summary IN SHARE ROW EXCLUSIVE MODE;
+
+    WITH actual AS (
+        SELECT p.id AS user_id,
+               COALESCE(f.n, 0)::INTEGER AS total_flashcards,
+               COALESCE(n.n, 0)::INTEGER AS total_notes,
+               COALESCE(a.n, 0)::INTEGER AS total_achievements
+        FROM public.profiles p
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM public.flashcards GROUP BY user_id) f ON f.user_id = p.id
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM public.study_notes GROUP BY user_id) n ON n.user_id = p.id
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM public.user_achievements GROUP BY user_id) a ON a.user_id = p.id
+    ), fixed AS (
+        INSERT INTO public.user_performance_summary AS s
+            (user_id, total_flashcards, total_notes, total_achievements)
+        SELECT a.user_id, a.total_flashcards, a.total_notes, a.total_achievements
+        FROM actual a
+        LEFT JOIN public.user_performance_summary cur ON cur.user_id = a.user_id
+        WHERE cur.user_id IS NULL
+           OR (cur.total_flashcards, cur.total_notes, cur.total_achievements)
+              IS DISTINCT FROM (a.total_flashcards, a.total_notes, a.total_achievements)
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_flashcards = EXCLUDED.total_flashcards,
+            total_notes = EXCLUDED.total_notes,
+            total_achievements = EXCLUDED.total_achievements,
+            updated_at = NOW()
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO repaired FROM fixed;
+    RETURN repaired;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION repair_user_performance_summary() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION repair_user_performance_summary() TO service_role;
+
+-- Initial backfill, only while the summary is still empty; afterwards the
+-- triggers keep it current and scripts/repair_user_performance.py fixes drift
+SELECT repair_user_performance_summary()
+WHERE NOT EXISTS (SELECT 1 FROM public.user_performance_summary);
+
+-- The previous view had different columns, so it is dropped once; later
+-- runs (or added columns at the end) go through CREATE OR REPLACE
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_views
+        WHERE schemaname = 'public' AND viewname = 'user_performance'
+          AND definition NOT LIKE '%user_performance_summary%'
+    ) THEN
+        DROP VIEW public.user_performance;
+    END IF;
+END $$;
+
+CREATE OR REPLACE VIEW user_performance AS
+SELECT
+    u.id as user_id,
+    u.email,
+    u.full_name,
+    u.subscription_tier,
+    COALESCE(us.total_questions_answered, 0) as total_questions_answered,
+    COALESCE(us.correct_answers, 0) as correct_answers,
+    COALESCE(us.total_questions_answered, 0) - COALESCE(us.correct_answers, 0) as incorrect_answers,
+    ROUND((us.correct_answers::DECIMAL / NULLIF(us.total_questions_answered, 0)) * 100, 2) as success_rate,
+    COALESCE(us.current_streak, 0) as streak_days,
+    COALESCE(us.longest_streak, 0) as longest_streak,
+    COALESCE(us.total_study_time_minutes, 0) as total_study_time_minutes,
+    COALESCE(ps.total_flashcards, 0) as total_flashcards,
+    COALESCE(ps.total_notes, 0) as total_notes,
+    COALESCE(ps.total_achievements, 0) as total_achievements,
+    -- Columns of the previous scripts/supabase_schema_to_copy.sql view
+    ROUND((us.correct_answers::DECIMAL / NULLIF(us.total_questions_answered, 0)) * 100, 2) as accuracy_percentage,
+    us.current_streak,
+    us.level,
+    us.experience_points,
+    us.last_activity_at
+FROM
+    public.profiles u
+LEFT JOIN
+    public.user_stats us ON u.id = us.user_id
+LEFT JOIN
+    public.user_performance_summary ps ON u.id = ps.user_id;
@@ -0,0 +1,145 @@
+-- Migration: Daily answer rollups for the analytics endpoints
+-- user_daily_stats keeps one row per user per day and user_daily_category_stats
+-- one row per user, day and category (answered, correct, time spent). Both are
+-- updated by a statement-level trigger on user_question_history, i.e. from the
+-- same batched INSERTs that ingest_answers performs (migration 004), so the
+-- /api/v1/analytics endpoints read at most one row per day in the period
+-- instead of aggregating the raw answers.
+-- Days are calendar days in America/Sao_Paulo (backend/services/analytics.py
+-- uses the same zone).
+-- backfill_daily_rollups(since) rebuilds both tables from the history for
+-- days >= since (NULL rebuilds everything). Safe to re-run: the trigger and
+-- the initial backfill are skipped once in place.
+
+CREATE TABLE IF NOT EXISTS public.user_daily_stats (
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    day DATE NOT NULL,
+    answered INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    time_spent_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS public.user_daily_category_stats (
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    day DATE NOT NULL,
+    category TEXT NOT NULL,
+    answered INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    time_spent_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, category)
+);
+
+ALTER TABLE public.user_daily_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.user_daily_category_stats ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own daily stats" ON public.user_daily_stats;
+CREATE POLICY "Users can view own daily stats" ON public.user_daily_stats
+    FOR SELECT USING (auth.uid() = user_id);
+DROP POLICY IF EXISTS "Users can view own daily category stats" ON public.user_daily_category_stats;
+CREATE POLICY "Users can view own daily category stats" ON public.user_daily_category_stats
+    FOR SELECT USING (auth.uid() = user_id);
+
+CREATE OR REPLACE FUNCTION rollup_daily_answers()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.user_daily_category_stats AS s
+        (user_id, day, category, answered, correct, time_spent_seconds)
+    SELECT a.user_id,
+           (a.answered_at AT TIME ZONE 'America/Sao_Paulo')::DATE,
+           COALESCE(q.category, ''),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE a.is_correct),
+           COALESCE(SUM(a.time_taken_seconds), 0)
+    FROM new_answers a
+    LEFT JOIN public.questions q ON q.id = a.question_id
+    GROUP BY 1, 2, 3
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+        answered = s.answered + EXCLUDED.answered,
+        correct = s.correct + EXCLUDED.correct,
+        time_spent_seconds = s.time_spent_seconds + EXCLUDED.time_spent_seconds;
+
+    INSERT INTO public.user_daily_stats AS s
+        (user_id, day, answered, correct, time_spent_seconds)
+    SELECT a.user_id,
+           (a.answered_at AT TIME ZONE 'America/Sao_Paulo')::DATE,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE a.is_correct),
+           COALESCE(SUM(a.time_taken_seconds), 0)
+    FROM new_answers a
+    GROUP BY 1, 2
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        answered = s.answered + EXCLUDED.answered,
+        correct = s.correct + EXCLUDED.correct,
+        time_spent_seconds = s.time_spent_seconds + EXCLUDED.time_spent_seconds;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Created only when missing: re-running the migration takes no table locks
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'public.user_question_history'::regclass
+          AND tgname = 'rollup_daily_answers'
+    ) THEN
+        CREATE TRIGGER rollup_daily_answers
+            AFTER INSERT ON public.user_question_history
+            REFERENCING NEW TABLE AS new_answers
+            FOR EACH STATEMENT EXECUTE FUNCTION rollup_daily_answers();
+    END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION backfill_daily_rollups(since DATE DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    days INTEGER;
+BEGIN
+    -- Blocks the rollup trigger until commit, so answers ingested meanwhile
+    -- are either counted below or added on top of the rebuilt rows
+    LOCK TABLE public.user_daily_category_stats, public.user_daily_stats IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM public.user_daily_category_stats WHERE since IS NULL OR day >= since;
+    DELETE FROM public.user_daily_stats WHERE since IS NULL OR day >= since;
+
+    INSERT INTO public.user_daily_category_stats
+        (user_id, day, category, answered, correct, time_spent_seconds)
+    SELECT a.user_id,
+           (a.answered_at AT TIME ZONE 'America/Sao_Paulo')::DATE,
+           COALESCE(q.category, ''),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE a.is_correct),
+           COALESCE(SUM(a.time_taken_seconds), 0)
+    FROM public.user_question_history a
+    LEFT JOIN public.questions q ON q.id = a.question_id
+    WHERE since IS NULL OR a.answered_at >= (since::TIMESTAMP AT TIME ZONE 'America/Sao_Paulo')
+    GROUP BY 1, 2, 3
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+        answered = EXCLUDED.answered,
+        correct = EXCLUDED.correct,
+        time_spent_seconds = EXCLUDED.time_spent_seconds;
+
+    INSERT INTO public.user_daily_stats (user_id, day, answered, correct, time_spent_seconds)
+    SELECT user_id, day, SUM(answered), SUM(correct), SUM(time_spent_seconds)
+    FROM public.user_daily_category_stats
+    WHERE since IS NULL OR day >= since
+    GROUP BY user_id, day
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        answered = EXCLUDED.answered,
+        correct = EXCLUDED.correct,
+        time_spent_seconds = EXCLUDED.time_spent_seconds;
+
+    GET DIAGNOSTICS days = ROW_COUNT;
+    RETURN days;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION backfill_daily_rollups(DATE) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION backfill_daily_rollups(DATE) TO service_role;
+
+-- Initial backfill, only while the rollups are still empty; full or partial
+-- rebuilds afterwards go through scripts/backfill_daily_rollups.py
+SELECT backfill_daily_rollups(NULL)
+WHERE NOT EXISTS (SELECT 1 FROM public.user_daily_stats);
@@ -74,10 +74,21 @@ CREATE TABLE public.question_stats (
     correct_attempts INTEGER DEFAULT 0,
     average_time_seconds INTEGER DEFAULT 0,
     difficulty_rating DECIMAL(3,2) DEFAULT 0.0, -- Calculated difficulty
+    irt_discrimination REAL,   -- a
+    irt_difficulty REAL,       -- b, on the ability (theta) scale
+    irt_responses INTEGER DEFAULT 0,
+    irt_calibrated_at TIMESTAMPTZ,
     last_updated TIMESTAMPTZ DEFAULT NOW(),
     UNIQUE(question_id)
 );
 
+-- Last history row (created_at) seen by each incremental job
+CREATE TABLE public.calibration_watermarks (
+    job TEXT PRIMARY KEY,
+    watermark TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
 -- =====================================================
 -- SIMULATIONS & EXAMS
 -- =====================================================
@@ -144,6 +155,10 @@ CREATE TABLE public.flashcards (
     review_count INTEGER DEFAULT 0,
     last_reviewed_at TIMESTAMPTZ,
     next_review_at TIMESTAMPTZ,
+    ease_factor REAL DEFAULT 2.5,
+    interval_days REAL DEFAULT 0,
+    repetitions INTEGER DEFAULT 0,
+    lapses INTEGER DEFAULT 0,
     is_active BOOLEAN DEFAULT true,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
@@ -214,6 +229,7 @@ CREATE INDEX idx_questions_active ON public.questions(is_active);
 CREATE INDEX idx_user_history_user_id ON public.user_question_history(user_id);
 CREATE INDEX idx_user_history_question_id ON public.user_question_history(question_id);
 CREATE INDEX idx_user_history_answered_at ON public.user_question_history(answered_at);
+CREATE INDEX idx_user_history_created_at ON public.user_question_history(created_at);
 
 -- Simulations indexes
 CREATE INDEX idx_user_simulations_user_id ON public.user_simulations(user_id);
@@ -222,7 +238,7 @@ CREATE INDEX idx_user_simulations_completed_at ON public.user_simulations(comple
 
 -- Flashcards indexes
 CREATE INDEX idx_flashcards_user_id ON public.flashcards(user_id);
-CREATE INDEX idx_flashcards_next_review ON public.flashcards(next_review_at);
+CREATE INDEX idx_flashcards_next_review ON public.flashcards(user_id, next_review_at) WHERE is_active;
 
 -- =====================================================
 -- ROW LEVEL SECURITY (RLS)
@@ -311,29 +327,67 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Function to update user stats after question answer
-CREATE OR REPLACE FUNCTION update_user_stats_after_answer()
+-- Function to update user stats after question answers (one upsert per user per statement)
+CREATE OR REPLACE FUNCTION update_user_stats_after_answers()
 RETURNS TRIGGER AS $$
 BEGIN
-    -- Update user stats
-    INSERT INTO public.user_stats (user_id, total_questions_answered, correct_answers, last_activity_at)
-    VALUES (NEW.user_id, 1, CASE WHEN NEW.is_correct THEN 1 ELSE 0 END, NOW())
+    INSERT INTO public.user_stats AS us (
+        user_id, total_questions_answered, correct_answers, experience_points, level, last_activity_at
+    )
+    SELECT user_id,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE is_correct),
+           SUM(CASE WHEN is_correct THEN 10 ELSE 2 END),
+           calculate_user_level(SUM(CASE WHEN is_correct THEN 10 ELSE 2 END)::INTEGER),
+           COALESCE(MAX(answered_at), NOW())
+    FROM new_answers
+    GROUP BY user_id
     ON CONFLICT (user_id) DO UPDATE SET
-        total_questions_answered = user_stats.total_questions_answered + 1,
-        correct_answers = user_stats.correct_answers + CASE WHEN NEW.is_correct THEN 1 ELSE 0 END,
-        experience_points = user_stats.experience_points + CASE WHEN NEW.is_correct THEN 10 ELSE 2 END,
-        level = calculate_user_level(user_stats.experience_points + CASE WHEN NEW.is_correct THEN 10 ELSE 2 END),
-        last_activity_at = NOW(),
+        total_questions_answered = us.total_questions_answered + EXCLUDED.total_questions_answered,
+        correct_answers = us.correct_answers + EXCLUDED.correct_answers,
+        experience_points = us.experience_points + EXCLUDED.experience_points,
+        level = calculate_user_level(us.experience_points + EXCLUDED.experience_points),
+        last_activity_at = GREATEST(us.last_activity_at, EXCLUDED.last_activity_at),
         updated_at = NOW();
     
-    RETURN NEW;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
 -- Trigger to update stats after answering questions
-CREATE TRIGGER update_stats_after_answer
+CREATE TRIGGER update_stats_after_answers
     AFTER INSERT ON public.user_question_history
-    FOR EACH ROW EXECUTE FUNCTION update_user_stats_after_answer();
+    REFERENCING NEW TABLE AS new_answers
+    FOR EACH STATEMENT EXECUTE FUNCTION update_user_stats_after_answers();
+
+-- Batched answer ingestion used by the API's write-behind buffer. Answers
+-- carry an id generated by the API, so replaying a batch after a crash is a
+-- no-op; the statement trigger folds the inserted rows into user_stats.
+CREATE OR REPLACE FUNCTION ingest_answers(answers JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    inserted_count INTEGER;
+BEGIN
+    INSERT INTO public.user_question_history (
+        id, user_id, question_id, simulation_id, selected_answer, is_correct,
+        time_taken_seconds, confidence_level, answered_at
+    )
+    SELECT a.id, a.user_id, a.question_id, a.simulation_id, a.selected_answer, a.is_correct,
+           a.time_taken_seconds, a.confidence_level, COALESCE(a.answered_at, NOW())
+    FROM jsonb_to_recordset(answers) AS a(
+        id UUID, user_id UUID, question_id UUID, simulation_id UUID,
+        selected_answer TEXT, is_correct BOOLEAN, time_taken_seconds INTEGER,
+        confidence_level INTEGER, answered_at TIMESTAMPTZ
+    )
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS inserted_count = ROW_COUNT;
+    RETURN inserted_count;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION ingest_answers(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION ingest_answers(JSONB) TO service_role;
 
 -- =====================================================
 -- INITIAL DATA
@@ -352,31 +406,276 @@ INSERT INTO public.achievements (name, description, icon, category, points, requ
 ('Civil Law Expert', 'Get 50 Civil Law questions correct', '⚖️', 'subject', 200, '{"category_correct": {"Direito Civil": 50}}'),
 ('Criminal Law Expert', 'Get 50 Criminal Law questions correct', '🚔', 'subject', 200, '{"category_correct": {"Direito Penal": 50}}');
 
+-- =====================================================
+-- USER PERFORMANCE SUMMARY
+-- =====================================================
+
+-- Per-user counts behind the user_performance view, kept current by
+-- statement-level triggers; repair_user_performance_summary() fixes drift
+
+CREATE TABLE public.user_performance_summary (
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE PRIMARY KEY,
+    total_flashcards INTEGER NOT NULL DEFAULT 0,
+    total_notes INTEGER NOT NULL DEFAULT 0,
+    total_achievements INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE public.user_performance_summary ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own performance summary" ON public.user_performance_summary
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- TG_ARGV[0] is the summary column; affected rows arrive in the changed_rows
+-- transition table (NEW TABLE on INSERT, OLD TABLE on DELETE)
+CREATE OR REPLACE FUNCTION bump_user_performance_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format(
+            'INSERT INTO public.user_performance_summary AS s (user_id, %1$I)
+             SELECT user_id, COUNT(*) FROM changed_rows GROUP BY user_id
+             ON CONFLICT (user_id) DO UPDATE SET
+                 %1$I = s.%1$I + EXCLUDED.%1$I,
+                 updated_at = NOW()',
+            TG_ARGV[0]
+        );
+    ELSE
+        EXECUTE format(
+            'UPDATE public.user_performance_summary s SET
+                 %1$I = GREATEST(s.%1$I - d.n, 0),
+                 updated_at = NOW()
+             FROM (SELECT user_id, COUNT(*) AS n FROM changed_rows GROUP BY user_id) d
+             WHERE s.user_id = d.user_id',
+            TG_ARGV[0]
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER flashcards_summary_insert
+    AFTER INSERT ON public.flashcards REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_performance_summary('total_flashcards');
+CREATE TRIGGER flashcards_summary_delete
+    AFTER DELETE ON public.flashcards REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_performance_summary('total_flashcards');
+CREATE TRIGGER study_notes_summary_insert
+    AFTER INSERT ON public.study_notes REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_performance_summary('total_notes');
+CREATE TRIGGER study_notes_summary_delete
+    AFTER DELETE ON public.study_notes REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_performance_summary('total_notes');
+CREATE TRIGGER user_achievements_summary_insert
+    AFTER INSERT ON public.user_achievements REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_performance_summary('total_achievements');
+CREATE TRIGGER user_achievements_summary_delete
+    AFTER DELETE ON public.user_achievements REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_performance_summary('total_achievements');
+
+-- Recomputes the counts with grouped aggregates (one scan per table) and
+-- writes only the rows that drifted; returns how many were fixed
+CREATE OR REPLACE FUNCTION repair_user_performance_summary()
+RETURNS INTEGER AS $$
+DECLARE
+    repaired INTEGER;
+BEGIN
+    -- Waits for transactions whose triggers already bumped a summary row and
+    -- blocks new bumps until commit; under READ COMMITTED the counts below
+    -- then see every committed row, so absolute values cannot overwrite a
+    -- concurrent increment
+    LOCK TABLE public.user_performance_summary IN SHARE ROW EXCLUSIVE MODE;
+
+    WITH actual AS (
+        SELECT p.id AS user_id,
+               COALESCE(f.n, 0)::INTEGER AS total_flashcards,
+               COALESCE(n.n, 0)::INTEGER AS total_notes,
+               COALESCE(a.n, 0)::INTEGER AS total_achievements
+        FROM public.profiles p
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM public.flashcards GROUP BY user_id) f ON f.user_id = p.id
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM public.study_notes GROUP BY user_id) n ON n.user_id = p.id
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM public.user_achievements GROUP BY user_id) a ON a.user_id = p.id
+    ), fixed AS (
+        INSERT INTO public.user_performance_summary AS s
+            (user_id, total_flashcards, total_notes, total_achievements)
+        SELECT a.user_id, a.total_flashcards, a.total_notes, a.total_achievements
+        FROM actual a
+        LEFT JOIN public.user_performance_summary cur ON cur.user_id = a.user_id
+        WHERE cur.user_id IS NULL
+           OR (cur.total_flashcards, cur.total_notes, cur.total_achievements)
+              IS DISTINCT FROM (a.total_flashcards, a.total_notes, a.total_achievements)
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_flashcards = EXCLUDED.total_flashcards,
+            total_notes = EXCLUDED.total_notes,
+            total_achievements = EXCLUDED.total_achievements,
+            updated_at = NOW()
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO repaired FROM fixed;
+    RETURN repaired;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION repair_user_performance_summary() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION repair_user_performance_summary() TO service_role;
+
+-- =====================================================
+-- DAILY ANSWER ROLLUPS
+-- =====================================================
+
+-- Per-user daily totals (overall and per category) read by /api/v1/analytics,
+-- kept current by a statement-level trigger on user_question_history;
+-- backfill_daily_rollups(since) rebuilds them from the history
+
+CREATE TABLE public.user_daily_stats (
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    day DATE NOT NULL,
+    answered INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    time_spent_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+CREATE TABLE public.user_daily_category_stats (
+    user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    day DATE NOT NULL,
+    category TEXT NOT NULL,
+    answered INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    time_spent_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, category)
+);
+
+ALTER TABLE public.user_daily_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.user_daily_category_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own daily stats" ON public.user_daily_stats
+    FOR SELECT USING (auth.uid() = user_id);
+CREATE POLICY "Users can view own daily category stats" ON public.user_daily_category_stats
+    FOR SELECT USING (auth.uid() = user_id);
+
+CREATE OR REPLACE FUNCTION rollup_daily_answers()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.user_daily_category_stats AS s
+        (user_id, day, category, answered, correct, time_spent_seconds)
+    SELECT a.user_id,
+           (a.answered_at AT TIME ZONE 'America/Sao_Paulo')::DATE,
+           COALESCE(q.category, ''),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE a.is_correct),
+           COALESCE(SUM(a.time_taken_seconds), 0)
+    FROM new_answers a
+    LEFT JOIN public.questions q ON q.id = a.question_id
+    GROUP BY 1, 2, 3
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+        answered = s.answered + EXCLUDED.answered,
+        correct = s.correct + EXCLUDED.correct,
+        time_spent_seconds = s.time_spent_seconds + EXCLUDED.time_spent_seconds;
+
+    INSERT INTO public.user_daily_stats AS s
+        (user_id, day, answered, correct, time_spent_seconds)
+    SELECT a.user_id,
+           (a.answered_at AT TIME ZONE 'America/Sao_Paulo')::DATE,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE a.is_correct),
+           COALESCE(SUM(a.time_taken_seconds), 0)
+    FROM new_answers a
+    GROUP BY 1, 2
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        answered = s.answered + EXCLUDED.answered,
+        correct = s.correct + EXCLUDED.correct,
+        time_spent_seconds = s.time_spent_seconds + EXCLUDED.time_spent_seconds;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER rollup_daily_answers
+    AFTER INSERT ON public.user_question_history
+    REFERENCING NEW TABLE AS new_answers
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_daily_answers();
+
+CREATE OR REPLACE FUNCTION backfill_daily_rollups(since DATE DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    days INTEGER;
+BEGIN
+    -- Blocks the rollup trigger until commit, so answers ingested meanwhile
+    -- are either counted below or added on top of the rebuilt rows
+    LOCK TABLE public.user_daily_category_stats, public.user_daily_stats IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM public.user_daily_category_stats WHERE since IS NULL OR day >= since;
+    DELETE FROM public.user_daily_stats WHERE since IS NULL OR day >= since;
+
+    INSERT INTO public.user_daily_category_stats
+        (user_id, day, category, answered, correct, time_spent_seconds)
+    SELECT a.user_id,
+           (a.answered_at AT TIME ZONE 'America/Sao_Paulo')::DATE,
+           COALESCE(q.category, ''),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE a.is_correct),
+           COALESCE(SUM(a.time_taken_seconds), 0)
+    FROM public.user_question_history a
+    LEFT JOIN public.questions q ON q.id = a.question_id
+    WHERE since IS NULL OR a.answered_at >= (since::TIMESTAMP AT TIME ZONE 'America/Sao_Paulo')
+    GROUP BY 1, 2, 3
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+        answered = EXCLUDED.answered,
+        correct = EXCLUDED.correct,
+        time_spent_seconds = EXCLUDED.time_spent_seconds;
+
+    INSERT INTO public.user_daily_stats (user_id, day, answered, correct, time_spent_seconds)
+    SELECT user_id, day, SUM(answered), SUM(correct), SUM(time_spent_seconds)
+    FROM public.user_daily_category_stats
+    WHERE since IS NULL OR day >= since
+    GROUP BY user_id, day
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        answered = EXCLUDED.answered,
+        correct = EXCLUDED.correct,
+        time_spent_seconds = EXCLUDED.time_spent_seconds;
+
+    GET DIAGNOSTICS days = ROW_COUNT;
+    RETURN days;
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION backfill_daily_rollups(DATE) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION backfill_daily_rollups(DATE) TO service_role;
+
 -- =====================================================
 -- VIEWS FOR COMMON QUERIES
 -- =====================================================
 
 -- User performance view
 CREATE VIEW user_performance AS
-SELECT 
+SELECT
     u.id as user_id,
     u.email,
     u.full_name,
     u.subscription_tier,
-    us.total_questions_answered,
-    us.correct_answers,
-    us.incorrect_answers,
+    COALESCE(us.total_questions_answered, 0) as total_questions_answered,
+    COALESCE(us.correct_answers, 0) as correct_answers,
+    COALESCE(us.total_questions_answered, 0) - COALESCE(us.correct_answers, 0) as incorrect_answers,
     ROUND((us.correct_answers::DECIMAL / NULLIF(us.total_questions_answered, 0)) * 100, 2) as success_rate,
-    us.average_time_per_question,
-    us.streak_days,
-    us.total_study_time_minutes,
-    (SELECT COUNT(*) FROM public.flashcards f WHERE f.user_id = u.id) as total_flashcards,
-    (SELECT COUNT(*) FROM public.study_notes n WHERE n.user_id = u.id) as total_notes,
-    (SELECT COUNT(*) FROM public.user_achievements ua WHERE ua.user_id = u.id) as total_achievements
-FROM 
+    COALESCE(us.current_streak, 0) as streak_days,
+    COALESCE(us.longest_streak, 0) as longest_streak,
+    COALESCE(us.total_study_time_minutes, 0) as total_study_time_minutes,
+    COALESCE(ps.total_flashcards, 0) as total_flashcards,
+    COALESCE(ps.total_notes, 0) as total_notes,
+    COALESCE(ps.total_achievements, 0) as total_achievements,
+    -- Columns of the previous scripts/supabase_schema_to_copy.sql view
+    ROUND((us.correct_answers::DECIMAL / NULLIF(us.total_questions_answered, 0)) * 100, 2) as accuracy_percentage,
+    us.current_streak,
+    us.level,
+    us.experience_points,
+    us.last_activity_at
+FROM
     public.profiles u
-LEFT JOIN 
-    public.user_stats us ON u.id = us.user_id;
+LEFT JOIN
+    public.user_stats us ON u.id = us.user_id
+LEFT JOIN
+    public.user_performance_summary ps ON u.id = ps.user_id;
 
 -- =====================================================
 -- DATABASE MAINTENANCE FUNCTIONS
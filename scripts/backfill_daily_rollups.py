@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily answer rollups used by /api/v1/analytics.
+
+user_daily_stats and user_daily_category_stats are maintained by a trigger on
+user_question_history (migration 009); this job recomputes them server-side
+from the history, either entirely or from a given day onwards (e.g. after
+importing old answers or fixing question categories).
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from supabase import create_client
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(dotenv_path='../.env')
+
+BACKFILL_FUNCTION = 'backfill_daily_rollups'
+
+
+def backfill_daily_rollups(supabase, since: date = None) -> int:
+    """Run the backfill RPC and return how many user-days were rebuilt."""
+    params = {'since': since.isoformat() if since else None}
+    result = supabase.rpc(BACKFILL_FUNCTION, params).execute()
+    return int(result.data or 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--since', type=date.fromisoformat,
+                        help='first day to rebuild (YYYY-MM-DD); default rebuilds everything')
+    args = parser.parse_args()
+
+    scope = f"from {args.since.isoformat()}" if args.since else "entire history"
+    print(f"📊 Rebuilding daily rollups ({scope})...")
+    supabase = create_client(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_SERVICE_KEY")
+    )
+    started = time.perf_counter()
+    try:
+        days = backfill_daily_rollups(supabase, args.since)
+    except Exception as e:
+        print(f"❌ RPC {BACKFILL_FUNCTION}() failed: {e}")
+        print("   Apply database/migrations/009_daily_rollups.sql first")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {days} user-days rebuilt ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Concurrent, bounded-parallel batch uploader for Supabase/PostgREST inserts
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class UploadReport:
+    """Summary of an upload run."""
+    rows_sent: int = 0
+    batches_sent: int = 0
+    retries: int = 0
+    failed_batches: List[Tuple[int, int, str]] = field(default_factory=list)  # (first row, size, error)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def failed_rows(self) -> int:
+        return sum(size for _, size, _ in self.failed_batches)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_sent / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def print_summary(self, label: str):
+        print(f"   - {label}: {self.rows_sent} rows in {self.batches_sent} batches "
+              f"({self.elapsed_seconds:.1f}s, {self.rows_per_second:.0f} rows/s, {self.retries} retries)")
+        for first_row, size, error in self.failed_batches:
+            print(f"   ❌ Rows {first_row}-{first_row + size - 1} failed: {error}")
+
+
+class BatchUploader:
+    """Upload rows with a bounded number of in-flight batches.
+
+    - Up to `concurrency` batches are in flight at once; the blocking
+      `send(batch)` call runs in a worker thread.
+    - Each batch is retried with full-jitter exponential backoff; a batch that
+      exhausts its retries is recorded in the report instead of aborting the run.
+    - Batch size adapts: it is capped by `target_batch_bytes` of JSON payload,
+      grows while batches finish well under `target_latency` seconds and
+      shrinks when they are slower.
+    - `on_batch_committed(batch_index, batch)` runs on the event loop after
+      each successful batch (used for import checkpoints).
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Dict[str, Any]]], Any],
+        concurrency: int = 4,
+        initial_batch_size: int = 100,
+        min_batch_size: int = 10,
+        max_batch_size: int = 1000,
+        target_batch_bytes: int = 512 * 1024,
+        target_latency: float = 1.0,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        on_batch_committed: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+    ):
+        self.send = send
+        self.on_batch_committed = on_batch_committed
+        self.concurrency = max(1, concurrency)
+        self.batch_size = initial_batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_batch_bytes = target_batch_bytes
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _cut_batch(self, rows: Sequence[Dict[str, Any]], start: int) -> int:
+        """Number of rows for the next batch, bounded by size and payload bytes."""
+        limit = min(self.batch_size, len(rows) - start)
+        payload = 2  # []
+        for offset in range(limit):
+            payload += len(json.dumps(rows[start + offset], default=str, ensure_ascii=False)) + 1
+            if payload > self.target_batch_bytes and offset > 0:
+                return offset
+        return limit
+
+    def _observe(self, latency: float):
+        """Adapt the batch size to the observed request latency."""
+        if latency < self.target_latency / 2:
+            self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5) + 1)
+        elif latency > self.target_latency:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+
+    async def _send_batch(self, batch, batch_index: int, first_row: int,
+                          report: UploadReport, slots: asyncio.Semaphore):
+        try:
+            for attempt in range(self.max_retries + 1):
+                started = time.perf_counter()
+                try:
+                    await asyncio.to_thread(self.send, batch)
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        report.failed_batches.append((first_row, len(batch), str(e)))
+                        return
+                    report.retries += 1
+                    await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+                    continue
+                self._observe(time.perf_counter() - started)
+                report.rows_sent += len(batch)
+                report.batches_sent += 1
+                if self.on_batch_committed is not None:
+                    self.on_batch_committed(batch_index, batch)
+                return
+        finally:
+            slots.release()
+
+    async def upload(self, rows: Sequence[Dict[str, Any]]) -> UploadReport:
+        report = UploadReport()
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        started = time.perf_counter()
+
+        position = 0
+        while position < len(rows):
+            await slots.acquire()
+            size = self._cut_batch(rows, position)
+            batch = list(rows[position:position + size])
+            tasks.append(asyncio.create_task(
+                self._send_batch(batch, len(tasks), position, report, slots)
+            ))
+            position += size
+
+        await asyncio.gather(*tasks)
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    def run(self, rows: Sequence[Dict[str, Any]]) -> UploadReport:
+        """Synchronous entry point for the import scripts."""
+        return asyncio.run(self.upload(rows))
@@ -7,11 +7,17 @@ import os
 from supabase import create_client
 from dotenv import load_dotenv
 
+from keyset_reconciler import reconcile_question_stats
+
 # Load environment variables
 load_dotenv(dotenv_path='../.env')
 
-def clean_orphaned_stats():
-    """Clean up orphaned records in question_stats table."""
+def clean_orphaned_stats(batch_size: int = 500):
+    """Clean up orphaned records in question_stats table.
+    
+    questions and question_stats are streamed in id order and merge-joined
+    (see keyset_reconciler), so memory use does not grow with the tables.
+    """
     print("🔍 Starting orphaned stats cleanup...")
     
     # Initialize Supabase client
@@ -20,50 +26,34 @@ def clean_orphaned_stats():
         os.getenv("SUPABASE_SERVICE_KEY")
     )
     
+    deleted = {'rows': 0, 'batches': 0}
+    
+    def delete_orphans(question_ids):
+        # Delete records where question_id is in the current batch
+        result = supabase.table('question_stats') \
+            .delete() \
+            .in_('question_id', question_ids) \
+            .execute()
+        
+        if hasattr(result, 'data') and result.data:
+            deleted['rows'] += len(result.data)
+        deleted['batches'] += 1
+        print(f"   - Deleted batch {deleted['batches']} ({len(question_ids)} records)")
+    
     try:
         # Find orphaned records (question_stats without a matching question)
         print("🔎 Finding orphaned records in question_stats...")
+        report = reconcile_question_stats(supabase, on_orphans=delete_orphans, batch_size=batch_size)
         
-        # Get all question_ids from questions table
-        questions_result = supabase.table('questions').select('id').execute()
-        question_ids = {q['id'] for q in questions_result.data}
-        print(f"   - Found {len(question_ids)} valid questions")
-        
-        # Get all question_ids from question_stats
-        stats_result = supabase.table('question_stats').select('question_id').execute()
-        stats_question_ids = {s['question_id'] for s in stats_result.data if s.get('question_id')}
-        print(f"   - Found {len(stats_question_ids)} question references in question_stats")
+        print(f"   - Scanned {report.left_scanned} questions and "
+              f"{report.right_scanned} question_stats rows ({report.elapsed_seconds:.1f}s)")
+        print(f"   - Found {report.right_only} orphaned records")
         
-        # Find orphaned question_ids (in stats but not in questions)
-        orphaned_ids = stats_question_ids - question_ids
-        print(f"   - Found {len(orphaned_ids)} orphaned records")
-        
-        if not orphaned_ids:
+        if not report.right_only:
             print("✅ No orphaned records found")
             return
         
-        # Delete orphaned records in batches
-        print(f"🗑️  Deleting {len(orphaned_ids)} orphaned records...")
-        batch_size = 100
-        deleted_count = 0
-        
-        # Convert to list for batching
-        orphaned_list = list(orphaned_ids)
-        
-        for i in range(0, len(orphaned_list), batch_size):
-            batch = orphaned_list[i:i + batch_size]
-            # Delete records where question_id is in the current batch
-            result = supabase.table('question_stats') \
-                .delete() \
-                .in_('question_id', batch) \
-                .execute()
-            
-            if hasattr(result, 'data') and result.data:
-                deleted_count += len(result.data)
-            
-            print(f"   - Deleted batch {i//batch_size + 1}/{(len(orphaned_list)-1)//batch_size + 1} ({len(batch)} records)")
-        
-        print(f"✅ Successfully deleted {deleted_count} orphaned records")
+        print(f"✅ Successfully deleted {deleted['rows']} orphaned records")
         
     except Exception as e:
         print(f"❌ Error during cleanup: {e}")
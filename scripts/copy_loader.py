@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for questions and question_stats over a direct PostgreSQL
+connection (COPY FROM STDIN into a staging table, merged in one transaction)
+"""
+
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+# Columns written by the importer; id and created_at keep their database defaults
+QUESTION_COLUMNS = (
+    'external_id', 'question_text', 'options', 'correct_answer', 'explanation',
+    'category', 'subcategory', 'difficulty_level', 'exam_year', 'exam_edition',
+    'source', 'tags', 'is_active', 'updated_at',
+)
+
+# Set only when a question is first inserted: afterwards the stats aggregator
+# and the IRT calibration own it, so a re-import must not reset it
+INSERT_ONLY_COLUMNS = ('difficulty_level',)
+
+STAGING_TABLE = 'questions_staging'
+
+_TEXT_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _array_literal(values: Sequence[Any]) -> str:
+    """PostgreSQL array literal for a TEXT[] column: {"a","b"}"""
+    items = []
+    for value in values:
+        if value is None:
+            items.append('NULL')
+        else:
+            items.append('"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"')
+    return '{' + ','.join(items) + '}'
+
+
+def copy_value(column: str, value: Any) -> str:
+    """Encode one field in COPY text format (tab separated, \\N for NULL)"""
+    if value is None:
+        return '\\N'
+    if column == 'options':
+        text = json.dumps(value, ensure_ascii=False)
+    elif column == 'tags':
+        text = _array_literal(value)
+    elif isinstance(value, bool):
+        text = 't' if value else 'f'
+    else:
+        text = str(value)
+    return text.translate(_TEXT_ESCAPES)
+
+
+def copy_lines(rows: Iterable[Dict[str, Any]], columns: Sequence[str] = QUESTION_COLUMNS) -> Iterator[str]:
+    for row in rows:
+        yield '\t'.join(copy_value(column, row.get(column)) for column in columns) + '\n'
+
+
+class CopyStream(io.TextIOBase):
+    """Read-only file object producing COPY lines on demand.
+
+    `cursor.copy_expert` pulls fixed-size chunks, so only one chunk of the
+    encoded dataset is held in memory at a time.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self._buffer = ''
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            chunk = self._buffer + ''.join(self._count(self._lines))
+            self._buffer = ''
+            return chunk
+        parts = [self._buffer]
+        length = len(self._buffer)
+        for line in self._count(self._lines):
+            parts.append(line)
+            length += len(line)
+            if length >= size:
+                break
+        data = ''.join(parts)
+        self._buffer = data[size:]
+        return data[:size]
+
+    def _count(self, lines: Iterator[str]) -> Iterator[str]:
+        for line in lines:
+            self.rows += 1
+            yield line
+
+
+@dataclass
+class BulkLoadReport:
+    """Row counts of one COPY load."""
+    rows_staged: int = 0
+    inserted: int = 0
+    updated: int = 0
+    stats_created: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def unchanged(self) -> int:
+        return self.rows_staged - self.inserted - self.updated
+
+    def print_summary(self):
+        rate = self.rows_staged / self.elapsed_seconds if self.elapsed_seconds else 0.0
+        print(f"   - questions: {self.rows_staged} rows streamed, {self.inserted} inserted, "
+              f"{self.updated} updated, {self.unchanged} unchanged "
+              f"({self.elapsed_seconds:.1f}s, {rate:.0f} rows/s)")
+        print(f"   - question_stats: {self.stats_created} rows created")
+
+
+class CopyBulkLoader:
+    """Load questions with `COPY FROM STDIN` and merge them into the live tables.
+
+    All rows are streamed into a temporary staging table, then a single
+    transaction upserts them into `questions` on `external_id` (rows whose
+    content did not change are left untouched) and seeds `question_stats`
+    for the affected questions. A failure at any step rolls everything back.
+    """
+
+    def __init__(self, database_url: str, columns: Sequence[str] = QUESTION_COLUMNS):
+        self.database_url = database_url
+        self.columns = tuple(columns)
+
+    def _merge_sql(self) -> str:
+        columns = ', '.join(self.columns)
+        updated = [c for c in self.columns
+                   if c not in ('external_id', 'updated_at') + INSERT_ONLY_COLUMNS]
+        assignments = ', '.join(f"{c} = EXCLUDED.{c}" for c in updated + ['updated_at'])
+        current = ', '.join(f"q.{c}" for c in updated)
+        incoming = ', '.join(f"EXCLUDED.{c}" for c in updated)
+        return f"""
+            WITH merged AS (
+                INSERT INTO public.questions AS q ({columns})
+                SELECT DISTINCT ON (external_id) {columns}
+                FROM {STAGING_TABLE}
+                ORDER BY external_id
+                ON CONFLICT (external_id) DO UPDATE SET {assignments}
+                WHERE ({current}) IS DISTINCT FROM ({incoming})
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+            FROM merged
+        """
+
+    def load_questions(self, rows: Iterable[Dict[str, Any]]) -> BulkLoadReport:
+        import psycopg2
+
+        report = BulkLoadReport()
+        started = time.perf_counter()
+        stream = CopyStream(copy_lines(rows, self.columns))
+        columns = ', '.join(self.columns)
+
+        conn = psycopg2.connect(self.database_url)
+        try:
+            # The connection context manager commits on success and rolls back on error
+            with conn, conn.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {STAGING_TABLE} ON COMMIT DROP AS "
+                    f"SELECT {columns} FROM public.questions WITH NO DATA"
+                )
+                cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN", stream)
+                report.rows_staged = stream.rows
+
+                cursor.execute(self._merge_sql())
+                report.inserted, report.updated = cursor.fetchone()
+
+                cursor.execute(f"""
+                    INSERT INTO public.question_stats (question_id)
+                    SELECT q.id
+                    FROM public.questions q
+                    JOIN {STAGING_TABLE} s ON s.external_id = q.external_id
+                    ON CONFLICT (question_id) DO NOTHING
+                """)
+                report.stats_created = cursor.rowcount
+        finally:
+            conn.close()
+
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Local checkpoint manifest for resumable, idempotent dataset imports
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from copy_loader import INSERT_ONLY_COLUMNS
+
+# Fields that change on every run and must not affect the content hash
+VOLATILE_FIELDS = ('id', 'created_at', 'updated_at')
+# Also left out: insert-only columns are not sent on re-import, so the
+# committed payload and the transformed rows hash the same
+HASH_EXCLUDED_FIELDS = VOLATILE_FIELDS + INSERT_ONLY_COLUMNS
+
+
+class ImportManifest:
+    """Content hash of every committed row, keyed by external_id.
+
+    Rows whose hash matches the manifest are skipped on the next run; new or
+    changed rows are upserted on `external_id`. The manifest is written
+    atomically (temp file + rename) at most every `checkpoint_interval`
+    seconds while batches commit, and once more at the end of the run, so a
+    crash only costs re-upserting the rows committed since the last checkpoint.
+    """
+
+    def __init__(self, path: Path, dataset: str, checkpoint_interval: float = 5.0):
+        self.path = Path(path)
+        self.dataset = dataset
+        self.checkpoint_interval = checkpoint_interval
+        self.hashes: Dict[str, str] = {}
+        self.last_committed_batch = -1
+        self._committed_batches = set()
+        self._dirty = False
+        self._last_checkpoint = time.monotonic()
+
+    @staticmethod
+    def content_hash(row: Dict[str, Any]) -> str:
+        content = {k: v for k, v in row.items() if k not in HASH_EXCLUDED_FIELDS}
+        encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def load(self) -> 'ImportManifest':
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('dataset') == self.dataset:
+                self.hashes = data.get('rows', {})
+                self.last_committed_batch = data.get('last_committed_batch', -1)
+            else:
+                print(f"⚠️  Manifest {self.path} belongs to {data.get('dataset')}, ignoring it")
+        return self
+
+    def pending(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Rows that are new or changed since the last committed import."""
+        changed = [row for row in rows if self.hashes.get(row['external_id']) != self.content_hash(row)]
+        return changed, len(rows) - len(changed)
+
+    def mark_committed(self, batch_index: int, rows: List[Dict[str, Any]]):
+        for row in rows:
+            self.hashes[row['external_id']] = self.content_hash(row)
+        self._committed_batches.add(batch_index)
+        while self.last_committed_batch + 1 in self._committed_batches:
+            self.last_committed_batch += 1
+        self._dirty = True
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def reset_batches(self):
+        """Start batch numbering for a new run (row hashes are kept)."""
+        self.last_committed_batch = -1
+        self._committed_batches.clear()
+
+    def checkpoint(self):
+        """Atomically persist the manifest if anything changed."""
+        self._last_checkpoint = time.monotonic()
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'dataset': self.dataset,
+                'updated_at': datetime.utcnow().isoformat(),
+                'last_committed_batch': self.last_committed_batch,
+                'rows': self.hashes,
+            }, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Streaming reconciliation between questions and question_stats
+
+Both tables are paged in id order with keyset cursors and merge-joined as
+sorted streams, so memory stays at one page per table regardless of size and
+no read is silently truncated by the PostgREST row cap.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+LEFT_ONLY = 'left_only'
+RIGHT_ONLY = 'right_only'
+
+BatchHandler = Callable[[List[str]], None]
+
+
+def iter_column(supabase, table: str, column: str, page_size: int = 1000) -> Iterator[str]:
+    """Yield the non-null values of `column` in ascending order, one page at a time.
+
+    Postgres orders UUIDs byte-wise, which matches the order of their
+    lowercase hex strings, so the values can be compared as Python strings.
+    """
+    last: Optional[str] = None
+    while True:
+        query = (
+            supabase.table(table)
+            .select(column)
+            .order(column)
+            .limit(page_size)
+        )
+        if last is not None:
+            query = query.gt(column, last)
+        page = query.execute().data or []
+        for row in page:
+            value = row.get(column)
+            if value is not None:
+                yield value
+        if len(page) < page_size:
+            return
+        last = page[-1][column]
+
+
+def anti_join(left: Iterable[str], right: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Merge two ascending streams, yielding values present on only one side.
+
+    Yields `(LEFT_ONLY, value)` or `(RIGHT_ONLY, value)`; duplicates within a
+    stream are collapsed.
+    """
+    sentinel = object()
+    left, right = iter(left), iter(right)
+    a, b = next(left, sentinel), next(right, sentinel)
+    while a is not sentinel or b is not sentinel:
+        if b is sentinel or (a is not sentinel and a < b):
+            value, side = a, LEFT_ONLY
+        elif a is sentinel or b < a:
+            value, side = b, RIGHT_ONLY
+        else:
+            value, side = a, None
+        if side is not None:
+            yield side, value
+        if side in (LEFT_ONLY, None):
+            while a is not sentinel and a == value:
+                a = next(left, sentinel)
+        if side in (RIGHT_ONLY, None):
+            while b is not sentinel and b == value:
+                b = next(right, sentinel)
+
+
+class _Counted:
+    def __init__(self, values: Iterable[str]):
+        self._values = values
+        self.count = 0
+
+    def __iter__(self):
+        for value in self._values:
+            self.count += 1
+            yield value
+
+
+@dataclass
+class ReconcileReport:
+    """Result of one reconciliation pass."""
+    left_scanned: int = 0
+    right_scanned: int = 0
+    left_only: int = 0
+    right_only: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def reconcile(
+    left: Iterable[str],
+    right: Iterable[str],
+    on_left_only: Optional[BatchHandler] = None,
+    on_right_only: Optional[BatchHandler] = None,
+    batch_size: int = 500,
+) -> ReconcileReport:
+    """Stream the anti-join of `left` and `right`, handing each side's gaps out in batches.
+
+    A handler may write to the tables being read: keyset cursors only move
+    forward, and every emitted value is behind both cursors.
+    """
+    report = ReconcileReport()
+    started = time.perf_counter()
+    left, right = _Counted(left), _Counted(right)
+    pending = {LEFT_ONLY: [], RIGHT_ONLY: []}
+    handlers = {LEFT_ONLY: on_left_only, RIGHT_ONLY: on_right_only}
+
+    for side, value in anti_join(left, right):
+        if side == LEFT_ONLY:
+            report.left_only += 1
+        else:
+            report.right_only += 1
+        if handlers[side] is None:
+            continue
+        pending[side].append(value)
+        if len(pending[side]) >= batch_size:
+            handlers[side](pending[side])
+            pending[side] = []
+
+    for side, values in pending.items():
+        if values:
+            handlers[side](values)
+
+    report.left_scanned, report.right_scanned = left.count, right.count
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+def reconcile_question_stats(
+    supabase,
+    on_missing: Optional[BatchHandler] = None,
+    on_orphans: Optional[BatchHandler] = None,
+    page_size: int = 1000,
+    batch_size: int = 500,
+) -> ReconcileReport:
+    """Questions without stats (`on_missing`) and stats without a question (`on_orphans`)."""
+    return reconcile(
+        iter_column(supabase, 'questions', 'id', page_size),
+        iter_column(supabase, 'question_stats', 'question_id', page_size),
+        on_left_only=on_missing,
+        on_right_only=on_orphans,
+        batch_size=batch_size,
+    )
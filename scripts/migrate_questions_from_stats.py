@@ -4,137 +4,180 @@ Migrate questions from question_stats to questions table.
 """
 
 import os
-import json
+import time
 from supabase import create_client
 from dotenv import load_dotenv
 from datetime import datetime
+from typing import Any, Dict, List, Set
 import uuid
 
 # Load environment variables
 load_dotenv(dotenv_path='../.env')
 
+PAGE_SIZE = 500          # legacy question_stats rows read per keyset page
+LOOKUP_CHUNK_SIZE = 200  # external_ids per in_() existence check (URL length bound)
+INSERT_BATCH_SIZE = 50
+
+# Question columns stored in legacy question_stats rows, cleared after migration
+LEGACY_QUESTION_COLUMNS = (
+    'question_text', 'options', 'correct_answer', 'explanation', 'category',
+    'subcategory', 'difficulty_level', 'exam_year', 'exam_edition', 'source',
+    'tags', 'is_active',
+)
+
+def iter_legacy_pages(supabase, page_size: int = PAGE_SIZE):
+    """question_stats rows that still carry question data, in id order."""
+    last_id = None
+    while True:
+        query = supabase.table('question_stats') \
+            .select('*') \
+            .not_.is_('question_text', 'null') \
+            .order('id') \
+            .limit(page_size)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        page = query.execute().data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]['id']
+
+def existing_external_ids(supabase, external_ids: List[str]) -> Set[str]:
+    """external_ids already in questions, checked with chunked in_() lookups."""
+    existing = set()
+    for i in range(0, len(external_ids), LOOKUP_CHUNK_SIZE):
+        chunk = external_ids[i:i + LOOKUP_CHUNK_SIZE]
+        result = supabase.table('questions') \
+            .select('external_id') \
+            .in_('external_id', chunk) \
+            .execute()
+        existing.update(row['external_id'] for row in result.data or [])
+    return existing
+
+def to_question(record: Dict[str, Any], external_id: str, now: str) -> Dict[str, Any]:
+    return {
+        'id': record.get('question_id', str(uuid.uuid4())),
+        'external_id': external_id,
+        'question_text': record.get('question_text', ''),
+        'options': record.get('options', []),
+        'correct_answer': record.get('correct_answer', ''),
+        'explanation': record.get('explanation', ''),
+        'category': record.get('category', 'Geral'),
+        'subcategory': record.get('subcategory'),
+        'difficulty_level': record.get('difficulty_level', 'medium'),
+        'exam_year': record.get('exam_year'),
+        'exam_edition': record.get('exam_edition'),
+        'source': record.get('source', 'FGV'),
+        'tags': record.get('tags', []),
+        'is_active': True,
+        'created_at': record.get('created_at', now),
+        'updated_at': now
+    }
+
+def id_ranges(page: List[Dict[str, Any]], selected: Set[str]):
+    """Contiguous runs of selected rows in the (id-ordered) page as (first_id, last_id)."""
+    run = []
+    for record in page:
+        if record['id'] in selected:
+            run.append(record['id'])
+        elif run:
+            yield run[0], run[-1]
+            run = []
+    if run:
+        yield run[0], run[-1]
+
+def clear_legacy_columns(supabase, page: List[Dict[str, Any]], migrated: Set[str], now: str) -> int:
+    """Null out question data of migrated rows with one update per id range.
+
+    The update repeats the `question_text IS NOT NULL` filter of the page
+    query, so each range touches exactly the rows of its run.
+    """
+    cleared = {column: None for column in LEGACY_QUESTION_COLUMNS}
+    cleared['updated_at'] = now
+    updates = 0
+    for first_id, last_id in id_ranges(page, migrated):
+        supabase.table('question_stats') \
+            .update(cleared) \
+            .gte('id', first_id) \
+            .lte('id', last_id) \
+            .not_.is_('question_text', 'null') \
+            .execute()
+        updates += 1
+    return updates
+
 def migrate_questions():
-    """Migrate questions from question_stats to questions table."""
+    """Migrate questions from question_stats to questions table.
+
+    Runs as a batch pipeline over keyset pages of legacy rows: one chunked
+    existence lookup per page, batched inserts, and cleanup updates keyed by
+    id ranges instead of 2 round trips per row.
+    """
     print("🚀 Starting migration of questions from question_stats to questions table...")
-    
+
     # Initialize Supabase client
     supabase = create_client(
         os.getenv("SUPABASE_URL"),
         os.getenv("SUPABASE_SERVICE_KEY")
     )
-    
+
+    started = time.perf_counter()
+    scanned = migrated_count = skipped = failed = cleanup_updates = 0
+
     try:
-        # Get all records from question_stats that have question data
-        result = supabase.table('question_stats') \
-            .select('*') \
-            .not_.is_('question_text', 'null') \
-            .execute()
-        
-        if not result.data:
-            print("✅ No questions found in question_stats table")
-            return
-        
-        print(f"🔍 Found {len(result.data)} questions in question_stats table")
-        
-        # Prepare questions for migration
-        questions_to_insert = []
-        stats_to_update = []
-        
-        for record in result.data:
-            try:
-                # Check if this question already exists in questions table
-                existing_question = supabase.table('questions') \
-                    .select('id') \
-                    .eq('external_id', record.get('external_id', '')) \
-                    .execute()
-                
-                if existing_question.data:
-                    print(f"   ⚠️  Question with external_id {record.get('external_id')} already exists in questions table")
+        for page_number, page in enumerate(iter_legacy_pages(supabase), start=1):
+            now = datetime.utcnow().isoformat()
+            scanned += len(page)
+
+            # Prepare questions for migration
+            candidates = {}
+            for record in page:
+                external_id = record.get('external_id') or f'migrated_{record.get("id")}'
+                candidates.setdefault(external_id, record)
+
+            existing = existing_external_ids(supabase, list(candidates))
+            skipped += len(page) - len(candidates) + len(existing)
+            to_insert = [
+                (record, to_question(record, external_id, now))
+                for external_id, record in candidates.items()
+                if external_id not in existing
+            ]
+
+            # Insert questions in batches; only committed rows are cleaned up
+            migrated_ids = set()
+            for i in range(0, len(to_insert), INSERT_BATCH_SIZE):
+                batch = to_insert[i:i + INSERT_BATCH_SIZE]
+                try:
+                    result = supabase.table('questions').insert([q for _, q in batch]).execute()
+                except Exception as e:
+                    print(f"   ❌ Failed to migrate batch of {len(batch)} questions: {e}")
+                    failed += len(batch)
                     continue
-                
-                # Create question data
-                question_data = {
-                    'id': record.get('question_id', str(uuid.uuid4())),
-                    'external_id': record.get('external_id', f'migrated_{record.get("id")}'),
-                    'question_text': record.get('question_text', ''),
-                    'options': record.get('options', []),
-                    'correct_answer': record.get('correct_answer', ''),
-                    'explanation': record.get('explanation', ''),
-                    'category': record.get('category', 'Geral'),
-                    'subcategory': record.get('subcategory'),
-                    'difficulty_level': record.get('difficulty_level', 'medium'),
-                    'exam_year': record.get('exam_year'),
-                    'exam_edition': record.get('exam_edition'),
-                    'source': record.get('source', 'FGV'),
-                    'tags': record.get('tags', []),
-                    'is_active': True,
-                    'created_at': record.get('created_at', datetime.utcnow().isoformat()),
-                    'updated_at': datetime.utcnow().isoformat()
-                }
-                
-                questions_to_insert.append(question_data)
-                
-                # Keep track of the mapping between old and new IDs
-                stats_to_update.append({
-                    'old_id': record['id'],
-                    'new_question_id': question_data['id']
-                })
-                
-            except Exception as e:
-                print(f"⚠️  Error processing record {record.get('id')}: {e}")
-                continue
-        
-        if not questions_to_insert:
-            print("ℹ️  No questions to migrate")
+                if hasattr(result, 'data') and result.data:
+                    migrated_count += len(result.data)
+                    migrated_ids.update(record['id'] for record, _ in batch)
+                else:
+                    failed += len(batch)
+
+            # Update question_stats to remove question data and keep only stats
+            if migrated_ids:
+                cleanup_updates += clear_legacy_columns(supabase, page, migrated_ids, now)
+
+            elapsed = time.perf_counter() - started
+            print(f"   ✅ Page {page_number}: {scanned} scanned, {migrated_count} migrated, "
+                  f"{skipped} already present ({scanned / elapsed:.0f} rows/s)")
+
+        if not scanned:
+            print("✅ No questions found in question_stats table")
             return
-        
-        print(f"📥 Preparing to migrate {len(questions_to_insert)} questions...")
-        
-        # Insert questions in batches
-        batch_size = 50
-        migrated_count = 0
-        
-        for i in range(0, len(questions_to_insert), batch_size):
-            batch = questions_to_insert[i:i + batch_size]
-            result = supabase.table('questions').insert(batch).execute()
-            
-            if hasattr(result, 'data') and result.data:
-                migrated_count += len(result.data)
-                print(f"   ✅ Migrated batch {i//batch_size + 1}/{(len(questions_to_insert)-1)//batch_size + 1} ({len(batch)} questions)")
-            else:
-                print(f"   ❌ Failed to migrate batch {i//batch_size + 1}")
-        
+
+        elapsed = time.perf_counter() - started
         print(f"\n🎉 Successfully migrated {migrated_count} questions to questions table")
-        
-        # Update question_stats to remove question data and keep only stats
-        print("\n🧹 Cleaning up question_stats table...")
-        
-        for stat in stats_to_update:
-            try:
-                supabase.table('question_stats') \
-                    .update({
-                        'question_text': None,
-                        'options': None,
-                        'correct_answer': None,
-                        'explanation': None,
-                        'category': None,
-                        'subcategory': None,
-                        'difficulty_level': None,
-                        'exam_year': None,
-                        'exam_edition': None,
-                        'source': None,
-                        'tags': None,
-                        'is_active': None,
-                        'updated_at': datetime.utcnow().isoformat()
-                    }) \
-                    .eq('id', stat['old_id']) \
-                    .execute()
-                
-            except Exception as e:
-                print(f"⚠️  Error cleaning up question_stats record {stat['old_id']}: {e}")
-        
-        print("✅ Cleanup completed")
-        
+        print(f"   - Scanned: {scanned} legacy rows in {elapsed:.1f}s ({scanned / elapsed:.0f} rows/s)")
+        print(f"   - Skipped (already in questions): {skipped}")
+        print(f"   - Failed: {failed}")
+        print(f"   - Cleanup: {cleanup_updates} range updates on question_stats")
+
     except Exception as e:
         print(f"❌ Error during migration: {e}")
         raise
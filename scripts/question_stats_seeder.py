@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Seed missing question_stats rows, server-side when possible
+"""
+
+import time
+from typing import List
+
+from keyset_reconciler import reconcile_question_stats
+
+SEED_FUNCTION = 'seed_question_stats'
+
+
+def seed_via_rpc(supabase) -> int:
+    """Run the INSERT ... SELECT from migration 003 inside the database."""
+    result = supabase.rpc(SEED_FUNCTION).execute()
+    return int(result.data or 0)
+
+
+def seed_via_keyset(supabase, chunk_size: int = 1000) -> int:
+    """REST-only fallback: stream the anti-join of questions and question_stats.
+
+    Both tables are read once in id order, one page at a time, and only the
+    missing rows are written back, in batches of `chunk_size`.
+    """
+    def insert_missing(question_ids: List[str]):
+        supabase.table('question_stats').upsert(
+            [{'question_id': question_id} for question_id in question_ids],
+            on_conflict='question_id',
+            ignore_duplicates=True,
+        ).execute()
+
+    report = reconcile_question_stats(
+        supabase, on_missing=insert_missing, page_size=chunk_size, batch_size=chunk_size
+    )
+    return report.left_only
+
+
+def seed_question_stats(supabase, chunk_size: int = 1000) -> int:
+    """Create question_stats for every question that has none.
+
+    Uses the `seed_question_stats()` RPC and falls back to chunked keyset
+    upserts when the function is not installed.
+    """
+    started = time.perf_counter()
+    try:
+        created = seed_via_rpc(supabase)
+        print(f"   - question_stats: {created} rows created server-side "
+              f"({time.perf_counter() - started:.1f}s)")
+        return created
+    except Exception as e:
+        print(f"⚠️  RPC {SEED_FUNCTION}() unavailable ({e}); falling back to keyset batches")
+
+    created = seed_via_keyset(supabase, chunk_size)
+    print(f"   - question_stats: {created} rows created in batches of {chunk_size} "
+          f"({time.perf_counter() - started:.1f}s)")
+    return created
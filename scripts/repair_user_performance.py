@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Repair drift in user_performance_summary.
+
+The summary counts (flashcards, notes, achievements per user) are maintained
+by triggers (migration 008); this job recomputes them server-side with
+grouped aggregates and rewrites only the rows that differ. Meant to run
+nightly, e.g. from cron.
+"""
+
+import os
+import sys
+import time
+from supabase import create_client
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(dotenv_path='../.env')
+
+REPAIR_FUNCTION = 'repair_user_performance_summary'
+
+
+def repair_user_performance(supabase) -> int:
+    """Run the repair RPC and return how many summary rows were fixed."""
+    result = supabase.rpc(REPAIR_FUNCTION).execute()
+    return int(result.data or 0)
+
+
+def main():
+    print("🔧 Repairing user_performance_summary...")
+    supabase = create_client(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_SERVICE_KEY")
+    )
+    started = time.perf_counter()
+    try:
+        repaired = repair_user_performance(supabase)
+    except Exception as e:
+        print(f"❌ RPC {REPAIR_FUNCTION}() failed: {e}")
+        print("   Apply database/migrations/008_user_performance_summary.sql first")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    if repaired:
+        print(f"✅ {repaired} summary rows repaired ({elapsed:.1f}s)")
+    else:
+        print(f"✅ No drift found ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Test cases for the concurrent batch uploader
+"""
+
+import threading
+
+from batch_uploader import BatchUploader
+
+
+def rows(n):
+    return [{"external_id": f"q{i}", "question_text": "x" * 20} for i in range(n)]
+
+
+def test_every_row_is_sent_once_in_order_of_batches():
+    sent, committed = [], []
+    lock = threading.Lock()
+
+    def send(batch):
+        with lock:
+            sent.extend(row["external_id"] for row in batch)
+
+    uploader = BatchUploader(send, concurrency=3, initial_batch_size=7,
+                             on_batch_committed=lambda index, batch: committed.append((index, len(batch))))
+    report = uploader.run(rows(50))
+
+    assert sorted(sent) == sorted(f"q{i}" for i in range(50)) and len(sent) == 50
+    assert report.rows_sent == 50 and report.batches_sent == len(committed)
+    assert sorted(index for index, _ in committed) == list(range(len(committed)))
+    assert not report.failed_batches
+
+
+def test_failed_attempts_are_retried():
+    attempts = []
+
+    def flaky(batch):
+        attempts.append(len(batch))
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+
+    report = BatchUploader(flaky, initial_batch_size=10, base_delay=0).run(rows(10))
+    assert report.rows_sent == 10 and report.retries == 2 and not report.failed_batches
+
+
+def test_batch_that_exhausts_retries_is_reported_without_aborting():
+    def send(batch):
+        if batch[0]["external_id"] == "q0":
+            raise ValueError("rejected")
+
+    uploader = BatchUploader(send, initial_batch_size=5, max_batch_size=5, max_retries=2, base_delay=0)
+    report = uploader.run(rows(15))
+    assert report.failed_batches == [(0, 5, "rejected")]
+    assert report.failed_rows == 5 and report.rows_sent == 10 and report.retries == 2
+
+
+def test_batches_are_cut_by_payload_bytes():
+    uploader = BatchUploader(lambda batch: None, initial_batch_size=100, target_batch_bytes=200)
+    data = rows(10)
+    size = uploader._cut_batch(data, 0)
+    assert 1 <= size < 10
+    # A single row larger than the target still goes out on its own
+    assert uploader._cut_batch([{"text": "x" * 1000}] * 3, 0) == 1
+
+
+def test_batch_size_adapts_to_latency():
+    uploader = BatchUploader(lambda batch: None, initial_batch_size=100, min_batch_size=10,
+                             max_batch_size=160, target_latency=1.0)
+    uploader._observe(0.1)
+    assert uploader.batch_size == 151
+    uploader._observe(0.1)
+    assert uploader.batch_size == 160
+    uploader._observe(2.0)
+    assert uploader.batch_size == 80
+    for _ in range(5):
+        uploader._observe(2.0)
+    assert uploader.batch_size == 10
@@ -0,0 +1,92 @@
+"""
+Test cases for the COPY text-format encoder used by the bulk loader
+"""
+
+import json
+
+from copy_loader import QUESTION_COLUMNS, CopyStream, _array_literal, copy_lines, copy_value
+
+_UNESCAPES = {'\\': '\\', 't': '\t', 'n': '\n', 'r': '\r'}
+
+
+def decode_field(field: str):
+    """What PostgreSQL's COPY text parser reads back from one field"""
+    if field == '\\N':
+        return None
+    out, chars = [], iter(field)
+    for char in chars:
+        out.append(_UNESCAPES[next(chars)] if char == '\\' else char)
+    return ''.join(out)
+
+
+def decode_array(literal: str):
+    """Elements of a TEXT[] literal written by `_array_literal`"""
+    assert literal[0] == '{' and literal[-1] == '}'
+    items, i, body = [], 0, literal[1:-1]
+    while i < len(body):
+        if body.startswith('NULL', i):
+            items.append(None)
+            i += 4
+        else:
+            assert body[i] == '"'
+            i += 1
+            value = []
+            while body[i] != '"':
+                if body[i] == '\\':
+                    i += 1
+                value.append(body[i])
+                i += 1
+            items.append(''.join(value))
+            i += 1
+        i += 1  # comma
+    return items
+
+
+TRICKY = 'tab\there\nnew line\r\\back\\slash "quoted" {braces},comma \\N ção'
+
+
+def test_copy_round_trip_of_special_characters():
+    row = {
+        'external_id': 'hf_1',
+        'question_text': TRICKY,
+        'options': [{'key': 'A', 'text': TRICKY}],
+        'correct_answer': 'A',
+        'explanation': None,
+        'tags': ['direito_civil', TRICKY, None, ''],
+        'exam_year': 2020,
+        'is_active': False,
+    }
+    (line,) = copy_lines([row])
+    assert line.endswith('\n') and line.count('\n') == 1
+    fields = line[:-1].split('\t')
+    assert len(fields) == len(QUESTION_COLUMNS)
+    decoded = dict(zip(QUESTION_COLUMNS, map(decode_field, fields)))
+
+    assert decoded['question_text'] == TRICKY
+    assert json.loads(decoded['options']) == row['options']
+    assert decode_array(decoded['tags']) == row['tags']
+    assert decoded['explanation'] is None and decoded['subcategory'] is None
+    assert decoded['exam_year'] == '2020' and decoded['is_active'] == 'f'
+
+
+def test_null_and_literal_backslash_n_are_distinct():
+    assert copy_value('question_text', None) == '\\N'
+    assert decode_field(copy_value('question_text', '\\N')) == '\\N'
+    assert _array_literal([]) == '{}'
+
+
+def test_copy_stream_serves_exact_chunks():
+    lines = [f"{i}\t{'x' * i}\n" for i in range(50)]
+    stream = CopyStream(iter(lines))
+    chunks = []
+    while True:
+        chunk = stream.read(17)
+        if not chunk:
+            break
+        assert len(chunk) <= 17
+        chunks.append(chunk)
+    assert ''.join(chunks) == ''.join(lines)
+    assert stream.rows == 50
+
+    rest = CopyStream(iter(lines))
+    assert rest.read(5) + rest.read() == ''.join(lines)
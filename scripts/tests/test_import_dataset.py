@@ -0,0 +1,164 @@
+"""
+Test cases for the vectorized transform stage of the dataset importer
+"""
+
+import re
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("datasets")
+pytest.importorskip("supabase")
+pytest.importorskip("dotenv")
+
+import import_dataset
+from import_dataset import DATASET_NAME, OABDatasetImporter
+from import_manifest import ImportManifest
+
+VOLATILE = ('id', 'created_at', 'updated_at')
+
+
+@pytest.fixture
+def importer(monkeypatch):
+    monkeypatch.setattr(import_dataset, "SUPABASE_URL", None)
+    return OABDatasetImporter(database_url="postgresql://unused")
+
+
+def _find_column_value(row: pd.Series, possible_columns):
+    """The previous per-row lookup; list values no longer raise in pd.notna."""
+    for col in possible_columns:
+        for actual_col in row.index:
+            if col.lower() in str(actual_col).lower():
+                value = row[actual_col]
+                present = not pd.api.types.is_scalar(value) or pd.notna(value)
+                if present and str(value).strip():
+                    return value
+    return None
+
+
+def row_wise(importer: OABDatasetImporter, df: pd.DataFrame):
+    """Reference: the iterrows() implementation the vectorized transform replaced.
+
+    Tags are built from the stripped category, as in the new version.
+    """
+    mappings = OABDatasetImporter.COLUMN_MAPPINGS
+    questions = []
+    for idx, row in df.iterrows():
+        question_text = _find_column_value(row, mappings['question'])
+        options = _find_column_value(row, mappings['options'])
+        correct_answer = _find_column_value(row, mappings['answer'])
+        explanation = _find_column_value(row, mappings['explanation'])
+        category = _find_column_value(row, mappings['category'])
+        year = _find_column_value(row, mappings['year'])
+        phase = _find_column_value(row, mappings['phase'])
+        if not question_text or not correct_answer:
+            continue
+        processed_options = importer._process_options(options)
+        if not processed_options:
+            continue
+        if not year and question_text:
+            year_match = re.search(r'20\d{2}', str(question_text))
+            if year_match:
+                year = int(year_match.group())
+        if not category:
+            category = importer._infer_category(question_text)
+        category = str(category).strip() if category else 'Geral'
+        questions.append({
+            'external_id': f"hf_{DATASET_NAME.split('/')[-1]}_{idx}",
+            'question_text': str(question_text).strip(),
+            'options': processed_options,
+            'correct_answer': str(correct_answer).strip().upper(),
+            'explanation': str(explanation).strip() if explanation else None,
+            'category': category,
+            'subcategory': None,
+            'difficulty_level': 'medium',
+            'exam_year': int(year) if year and str(year).isdigit() else None,
+            'exam_edition': str(phase).strip() if phase else None,
+            'source': 'FGV',
+            'tags': importer._extract_tags(question_text, category),
+            'is_active': True,
+        })
+    return questions
+
+
+def synthetic_frame() -> pd.DataFrame:
+    rows = [
+        # Hugging Face options, year in its own column
+        dict(question="Sobre o contrato de compra e venda, segundo a lei:",
+             options={'label': ['a', 'b', 'c'], 'text': [' um ', 'dois', 'três']},
+             answer=" b ", explanation=" Art. 481 ", category="Direito Civil ", year=2019, phase="XXIX"),
+        # List options, year only in the text, blank category
+        dict(question="Exame 2021: o crime de furto admite a súmula?", options=['sim', 'não'],
+             answer="a", explanation=None, category="   ", year=None, phase=None),
+        # Structured text options, question from the fallback column
+        dict(question="  ", pergunta="Qual princípio rege a licitação?", options="(A) um (B) dois (C) três",
+             answer="c", explanation="", category=None, year="2018", phase=" 1ª fase "),
+        # JSON options, non-numeric year in the column, no category keyword
+        dict(question="Questão sem tema conhecido", options='{"A": " x ", "B": "y"}',
+             answer="A", explanation="ok", category=None, year="XX", phase=None),
+        # Delimited options, no year anywhere
+        dict(question="O advogado e o estatuto da OAB", options="primeira;segunda;terceira",
+             answer="b", explanation=None, category="Ética Profissional", year=None, phase="2"),
+        # Skipped: no answer
+        dict(question="Sem gabarito", options=['a', 'b'], answer=None),
+        # Skipped: options that cannot be parsed
+        dict(question="Opções ilegíveis", options="nada aqui", answer="a"),
+        # Skipped: no question at all
+        dict(question=None, options=['a', 'b'], answer="a"),
+    ]
+    columns = ['question', 'pergunta', 'options', 'answer', 'explanation', 'category', 'year', 'phase']
+    return pd.DataFrame(rows, columns=columns, dtype=object)
+
+
+def test_transform_matches_row_wise_version(importer):
+    df = synthetic_frame()
+    vectorized = importer.clean_and_transform_data(df)
+    expected = row_wise(importer, df)
+
+    assert len(vectorized) == len(expected) == 5
+    for row, reference in zip(vectorized, expected):
+        assert {k: v for k, v in row.items() if k not in VOLATILE} == reference
+        assert row['created_at'] == row['updated_at']
+
+    by_id = {row['external_id'].rsplit('_', 1)[1]: row for row in vectorized}
+    assert by_id['0']['exam_year'] == 2019 and by_id['0']['category'] == 'Direito Civil'
+    assert by_id['1']['exam_year'] == 2021 and by_id['1']['category'] == 'Direito Penal'
+    assert by_id['2']['question_text'] == "Qual princípio rege a licitação?"
+    assert by_id['3']['exam_year'] is None and by_id['3']['category'] == 'Geral'
+    assert by_id['4']['exam_year'] is None
+
+
+def test_column_mapping_is_cached_per_schema(importer):
+    df = synthetic_frame()
+    first = importer._resolve_column_mapping(df.columns)
+    assert importer._resolve_column_mapping(df.columns) is first
+    assert first['question'] == ['question', 'pergunta']
+
+
+class FakeSupabase:
+    """Records upserted batches; every write succeeds"""
+
+    def __init__(self):
+        self.batches = []
+
+    def table(self, name):
+        return self
+
+    def upsert(self, batch, **kwargs):
+        self.batches.append(batch)
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": self.batches[-1]})()
+
+
+def test_rest_import_commits_rows_the_manifest_then_skips(importer, tmp_path):
+    questions = importer.clean_and_transform_data(synthetic_frame())
+    importer.supabase = FakeSupabase()
+    manifest = ImportManifest(tmp_path / "manifest.json", DATASET_NAME)
+
+    assert importer.import_to_supabase(questions, manifest)
+    assert all('difficulty_level' not in row for batch in importer.supabase.batches for row in batch)
+    # A re-run transforms the rows again (new ids and timestamps) and sends nothing
+    rerun = importer.clean_and_transform_data(synthetic_frame())
+    assert ImportManifest(tmp_path / "manifest.json", DATASET_NAME).load().pending(rerun) == ([], len(rerun))
@@ -0,0 +1,63 @@
+"""
+Test cases for the resumable import manifest
+"""
+
+import json
+
+from import_manifest import ImportManifest
+
+
+def question(external_id, text="Enunciado", **extra):
+    return {"id": f"uuid-{external_id}", "external_id": external_id, "question_text": text,
+            "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00", **extra}
+
+
+def test_committed_rows_are_skipped_until_they_change(tmp_path):
+    manifest = ImportManifest(tmp_path / "manifest.json", "dataset")
+    rows = [question("a"), question("b")]
+    manifest.mark_committed(0, rows)
+
+    # New uuids and timestamps on every run do not count as changes
+    rerun = [question("a", id="other", updated_at="later"), question("b", text="Editado"), question("c")]
+    pending, unchanged = manifest.pending(rerun)
+    assert [row["external_id"] for row in pending] == ["b", "c"] and unchanged == 1
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = tmp_path / "logs" / "manifest.json"
+    manifest = ImportManifest(path, "dataset", checkpoint_interval=3600)
+    manifest.mark_committed(1, [question("b")])
+    manifest.mark_committed(0, [question("a")])
+    manifest.mark_committed(3, [question("d")])
+    assert manifest.last_committed_batch == 1
+    assert not path.exists()  # Interval not reached yet
+    manifest.checkpoint()
+    assert not path.with_suffix(".json.tmp").exists()
+
+    loaded = ImportManifest(path, "dataset").load()
+    assert loaded.last_committed_batch == 1
+    assert loaded.pending([question("a"), question("d")]) == ([], 2)
+
+
+def test_manifest_of_another_dataset_is_ignored(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({"dataset": "other", "rows": {"a": "hash"}, "last_committed_batch": 4}))
+    manifest = ImportManifest(path, "dataset").load()
+    assert manifest.hashes == {} and manifest.last_committed_batch == -1
+
+
+def test_reset_batches_keeps_row_hashes(tmp_path):
+    manifest = ImportManifest(tmp_path / "manifest.json", "dataset")
+    manifest.mark_committed(0, [question("a")])
+    manifest.reset_batches()
+    assert manifest.last_committed_batch == -1
+    assert manifest.pending([question("a")]) == ([], 1)
+
+
+def test_rows_committed_without_insert_only_columns_are_not_pending(tmp_path):
+    manifest = ImportManifest(tmp_path / "manifest.json", "dataset")
+    rows = [question("a", difficulty_level="medium"), question("b", difficulty_level="hard")]
+    # The REST import sends (and commits) rows without id, created_at and difficulty_level
+    payload = [{k: v for k, v in row.items() if k not in ("id", "created_at", "difficulty_level")} for row in rows]
+    manifest.mark_committed(0, payload)
+    assert manifest.pending(rows) == ([], 2)
@@ -0,0 +1,91 @@
+"""
+Test cases for the streaming keyset reconciliation
+"""
+
+from keyset_reconciler import LEFT_ONLY, RIGHT_ONLY, anti_join, iter_column, reconcile
+
+
+class FakeQuery:
+    """Enough of the PostgREST query builder for keyset paging"""
+
+    def __init__(self, table):
+        self.table = table
+        self.filters = []
+        self.limit_rows = None
+
+    def select(self, column):
+        self.column = column
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, rows):
+        self.limit_rows = rows
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(value)
+        return self
+
+    def execute(self):
+        self.table.requests += 1
+        values = sorted(v for v in self.table.values if v is not None)
+        if self.filters:
+            values = [v for v in values if v > self.filters[-1]]
+        # NULLs sort last in Postgres ascending order
+        values += [None] * self.table.values.count(None)
+        return type("Result", (), {"data": [{self.column: v} for v in values[:self.limit_rows]]})()
+
+
+class FakeTable:
+    def __init__(self, values):
+        self.values = values
+        self.requests = 0
+
+
+class FakeClient:
+    def __init__(self, **tables):
+        self.tables = {name: FakeTable(values) for name, values in tables.items()}
+
+    def table(self, name):
+        return FakeQuery(self.tables[name])
+
+
+def test_anti_join_yields_each_side_once():
+    left = ["a", "b", "b", "d", "f"]
+    right = ["b", "c", "c", "d", "g"]
+    assert list(anti_join(left, right)) == [
+        (LEFT_ONLY, "a"), (RIGHT_ONLY, "c"), (LEFT_ONLY, "f"), (RIGHT_ONLY, "g"),
+    ]
+    assert list(anti_join([], ["x"])) == [(RIGHT_ONLY, "x")]
+    assert list(anti_join(["x"], [])) == [(LEFT_ONLY, "x")]
+    assert list(anti_join([], [])) == []
+
+
+def test_reconcile_hands_out_batches():
+    left = [f"{i:03d}" for i in range(0, 100)]
+    right = [f"{i:03d}" for i in range(0, 100, 2)] + ["200", "201"]
+    missing, orphans = [], []
+    report = reconcile(left, right, on_left_only=missing.append, on_right_only=orphans.append, batch_size=20)
+
+    assert [len(batch) for batch in missing] == [20, 20, 10]
+    assert sum(missing, []) == [f"{i:03d}" for i in range(1, 100, 2)]
+    assert orphans == [["200", "201"]]
+    assert (report.left_scanned, report.right_scanned) == (100, 52)
+    assert (report.left_only, report.right_only) == (50, 2)
+
+
+def test_iter_column_pages_with_keyset_cursor():
+    ids = [f"{i:04x}" for i in range(25)]
+    client = FakeClient(questions=list(reversed(ids)) + [None])
+    assert list(iter_column(client, "questions", "id", page_size=10)) == ids
+    assert client.tables["questions"].requests == 3
+
+
+def test_iter_column_exact_multiple_of_page_size():
+    ids = [f"{i:04x}" for i in range(20)]
+    client = FakeClient(questions=ids)
+    assert list(iter_column(client, "questions", "id", page_size=10)) == ids
+    # The last full page needs one more (empty) read to know the table ended
+    assert client.tables["questions"].requests == 3
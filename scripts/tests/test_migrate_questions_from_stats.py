@@ -0,0 +1,24 @@
+"""
+Test cases for the question_stats -> questions migration helpers
+"""
+
+import pytest
+
+pytest.importorskip("supabase")
+pytest.importorskip("dotenv")
+
+from migrate_questions_from_stats import id_ranges, to_question
+
+
+def test_id_ranges_cover_only_selected_runs():
+    page = [{"id": f"{i:02d}"} for i in range(10)]
+    selected = {"00", "01", "02", "04", "07", "08", "09"}
+    assert list(id_ranges(page, selected)) == [("00", "02"), ("04", "04"), ("07", "09")]
+    assert list(id_ranges(page, set())) == []
+    assert list(id_ranges(page, {p["id"] for p in page})) == [("00", "09")]
+
+
+def test_to_question_keeps_the_stats_question_id():
+    question = to_question({"question_id": "q-1", "question_text": "Enunciado"}, "legacy_1", "now")
+    assert question["id"] == "q-1" and question["external_id"] == "legacy_1"
+    assert question["category"] == "Geral" and question["created_at"] == "now"